@@ -0,0 +1,163 @@
+# benchmarks/bench_encodings.py
+"""Latência ponta a ponta por codificação: JSON x MessagePack x Arrow IPC.
+
+Uso:
+    python -m benchmarks.bench_encodings --rows 2000 --repeat 30 --model none
+    python -m benchmarks.bench_encodings --url http://localhost:8000 --rows 5000
+
+Para /score-batch e /rank-candidates com `--rows` itens, mede em cada formato:
+codificação no cliente, tamanho do corpo, latência da chamada (envio, decode e
+validação no servidor, score, resposta) e decode da resposta no cliente.
+Sem `--url` roda em processo (TestClient) com cache de resultados e sketches
+desligados e MONITORING_DIR temporário; `--model none` tira o score da conta (só transporte,
+decode e validação), `--model synthetic` treina uma pipeline pequena. Com
+`--url` usa o modelo que o servidor tiver carregado.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import msgspec
+import pyarrow as pa
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+_WORDS = "python java sql docker aws dados etl spark api rest backend analista sênior".split()
+_JOB = {"titulo_vaga": "backend python", "principais_atividades": "apis rest", "competencias": "python sql", "observacoes": ""}
+
+
+def _text(rng, n):
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+def _payloads(rows: int, seed: int = 0):
+    rng = random.Random(seed)
+    cands = [
+        {"id": str(i), "name": f"Candidato {i}", "cv_pt": _text(rng, rng.randint(40, 120)),
+         "competencias": _text(rng, 4), "observacoes": ""}
+        for i in range(rows)
+    ]
+    batch = [{**_JOB, "cv_pt": c["cv_pt"]} for c in cands]
+    rank = {**_JOB, "k": 20, "use_threshold": False, "candidates": cands}
+    return batch, rank
+
+
+def _arrow(rows, meta=None) -> bytes:
+    table = pa.Table.from_pylist(rows)
+    if meta:
+        table = table.replace_schema_metadata({k: str(v) for k, v in meta.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _encode(fmt: str, endpoint: str, batch, rank) -> bytes:
+    if fmt == JSON:
+        return json.dumps(batch if endpoint == "/score-batch" else rank).encode("utf-8")
+    if fmt == MSGPACK:
+        return msgspec.msgpack.encode(batch if endpoint == "/score-batch" else rank)
+    if endpoint == "/score-batch":
+        return _arrow(batch)
+    meta = {k: v for k, v in rank.items() if k != "candidates"}
+    return _arrow(rank["candidates"], meta)
+
+
+def _decode(fmt: str, content: bytes):
+    if fmt == JSON:
+        return json.loads(content)
+    if fmt == MSGPACK:
+        return msgspec.msgpack.decode(content)
+    return pa.ipc.open_stream(pa.BufferReader(content)).read_all()
+
+
+def _client(url, model: str):
+    if url:
+        import httpx
+
+        return httpx.Client(base_url=url, timeout=300.0)
+    # em processo: sem cache de scores e com logs num diretório temporário
+    os.environ.setdefault("MONITORING_DIR", tempfile.mkdtemp(prefix="dm_bench_"))
+    os.environ["RESULT_CACHE_MAX_MB"] = "0"
+    # sketches crescem a cada chamada e mascarariam a diferença entre formatos
+    os.environ.setdefault("SKETCH_FLUSH_SECONDS", "0")
+    from fastapi.testclient import TestClient
+
+    import src.api.main as m
+    if model == "none":
+        m._model = None
+    elif m._model is None:
+        import pandas as pd
+        from src.modeling.pipeline import TEXT_COLS, build_pipeline
+
+        rng = random.Random(1)
+        df = pd.DataFrame({c: [_text(rng, 30) for _ in range(400)] for c in TEXT_COLS})
+        m._model = build_pipeline().fit(df, [i % 2 for i in range(400)])
+    m._stage1_model = None
+    return TestClient(m.app)
+
+
+def _pct(xs, q):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(q * (len(xs) - 1))))]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2000)
+    ap.add_argument("--repeat", type=int, default=30)
+    ap.add_argument("--warmup", type=int, default=3)
+    ap.add_argument("--url", default=None, help="API já no ar (senão roda em processo)")
+    ap.add_argument("--model", choices=("synthetic", "none"), default="synthetic",
+                    help="em processo: pipeline sintética ou sem modelo (scores zerados)")
+    args = ap.parse_args(argv)
+
+    client = _client(args.url, args.model)
+    batch, rank = _payloads(args.rows)
+    results = []
+    for endpoint in ("/score-batch", "/rank-candidates"):
+        for fmt in (JSON, MSGPACK, ARROW):
+            t0 = time.perf_counter()
+            body = _encode(fmt, endpoint, batch, rank)
+            encode_ms = (time.perf_counter() - t0) * 1e3
+            headers = {"Content-Type": fmt, "Accept": fmt}
+            lat, dec = [], []
+            for i in range(args.warmup + args.repeat):
+                t0 = time.perf_counter()
+                r = client.post(endpoint, content=body, headers=headers)
+                t1 = time.perf_counter()
+                r.raise_for_status()
+                _decode(fmt, r.content)
+                t2 = time.perf_counter()
+                if i >= args.warmup:
+                    lat.append((t1 - t0) * 1e3)
+                    dec.append((t2 - t1) * 1e3)
+            results.append({
+                "endpoint": endpoint,
+                "encoding": fmt,
+                "request_bytes": len(body),
+                "response_bytes": len(r.content),
+                "client_encode_ms": round(encode_ms, 2),
+                "p50_ms": round(statistics.median(lat), 2),
+                "p95_ms": round(_pct(lat, 0.95), 2),
+                "client_decode_ms": round(statistics.median(dec), 3),
+            })
+
+    for endpoint in ("/score-batch", "/rank-candidates"):
+        base = next(x for x in results if x["endpoint"] == endpoint and x["encoding"] == JSON)
+        for x in results:
+            if x["endpoint"] == endpoint:
+                x["speedup_p50_vs_json"] = round(base["p50_ms"] / x["p50_ms"], 2)
+    print(json.dumps({"rows": args.rows, "repeat": args.repeat, "model": None if args.url else args.model,
+                      "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
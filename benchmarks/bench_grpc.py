@@ -0,0 +1,216 @@
+# benchmarks/bench_grpc.py
+"""gRPC x FastAPI (HTTP/JSON) no mesmo processo da API, com lotes pequenos.
+
+Uso:
+    python -m benchmarks.bench_grpc --calls 500 --rows 1 --rows 10 --rows 100
+    python -m benchmarks.bench_grpc --model synthetic --concurrency 8 --duration 10
+
+Sobe um processo com a API (uvicorn, 1 worker) e o gRPC no lifespan
+(GRPC_PORT), ambos servindo o mesmo modelo. Para cada método (score,
+score-batch e rank com `--rows` itens) mede, em sequência, a latência
+(p50/p95) de: HTTP com conexão reaproveitada, HTTP com conexão nova por
+chamada e gRPC num canal único. Depois, a vazão com `--concurrency` clientes
+por `--duration` segundos. `--model none` (padrão) mede só o transporte e a
+(de)serialização; `--model synthetic` inclui o score de uma pipeline pequena.
+O cache de resultados fica desligado.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+from src.api import grpc_server as gs
+
+_WORDS = "python java sql docker aws dados etl spark api rest backend analista sênior".split()
+
+_CHILD = """
+import os, random, sys
+import pandas as pd
+import uvicorn
+import src.api.main as m
+
+if sys.argv[1] == "synthetic":
+    from src.modeling.pipeline import TEXT_COLS, build_pipeline
+    words = "python java sql docker aws dados etl spark api rest backend analista".split()
+    rng = random.Random(1)
+    df = pd.DataFrame({c: [" ".join(rng.choice(words) for _ in range(30)) for _ in range(400)] for c in TEXT_COLS})
+    pipe = build_pipeline().fit(df, [i % 2 for i in range(400)])
+    _load = m.load_model
+
+    def load_model():
+        _load()
+        s = m._snapshot()
+        m._swap_state(pipe, "bench-synthetic", s.threshold_topk, s.target_k)
+
+    m.load_model = load_model
+uvicorn.run(m.app, host="127.0.0.1", port=int(sys.argv[2]), log_level="warning")
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start(model: str):
+    http_port, grpc_port = _free_port(), _free_port()
+    env = dict(
+        os.environ,
+        GRPC_PORT=str(grpc_port),
+        GRPC_HOST="127.0.0.1",
+        RESULT_CACHE_MAX_MB="0",
+        MONITORING_DIR=os.environ.get("MONITORING_DIR") or tempfile.mkdtemp(prefix="dm_bench_"),
+    )
+    proc = subprocess.Popen([sys.executable, "-c", _CHILD, model, str(http_port)], env=env, stdout=sys.stderr)
+    url = f"http://127.0.0.1:{http_port}"
+    for _ in range(300):
+        try:
+            if httpx.get(url + "/health", timeout=1.0).status_code == 200:
+                return proc, url, f"127.0.0.1:{grpc_port}"
+        except httpx.HTTPError:
+            pass
+        if proc.poll() is not None:
+            raise SystemExit("a API encerrou durante a inicialização")
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("a API não respondeu /health a tempo")
+
+
+def _text(rng, n):
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+def _cases(rows_list, seed: int = 0):
+    """(nome, rota HTTP, corpo JSON, método gRPC, mensagem) por caso."""
+    rng = random.Random(seed)
+    M = gs.MESSAGES
+    job = {"titulo_vaga": "backend python", "principais_atividades": _text(rng, 30),
+           "competencias": _text(rng, 8), "observacoes": ""}
+    one = {**job, "cv_pt": _text(rng, 150)}
+    cases = [("score", "/score", one, "Score", M["ScoreRequest"](**one))]
+    for n in rows_list:
+        batch = [{**job, "cv_pt": _text(rng, rng.randint(50, 300))} for _ in range(n)]
+        cases.append((f"score-batch[{n}]", "/score-batch", batch, "ScoreBatch",
+                      M["ScoreBatchRequest"](items=[M["ScoreRequest"](**b) for b in batch])))
+        cands = [{"id": str(i), "name": f"c{i}", "cv_pt": _text(rng, rng.randint(50, 300)),
+                  "competencias": _text(rng, 4), "observacoes": ""} for i in range(n)]
+        rank = {**job, "k": 10, "use_threshold": False, "candidates": cands}
+        msg = M["RankRequest"](**{k: v for k, v in rank.items() if k != "candidates"},
+                               candidates=[M["Candidate"](**c) for c in cands])
+        cases.append((f"rank[{n}]", "/rank-candidates", rank, "RankCandidates", msg))
+    return cases
+
+
+def _latency(fn, calls: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        fn()
+    lat = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        fn()
+        lat.append((time.perf_counter() - t0) * 1e3)
+    lat.sort()
+    return {
+        "p50_ms": round(statistics.median(lat), 3),
+        "p95_ms": round(lat[min(len(lat) - 1, int(0.95 * len(lat)))], 3),
+        "mean_ms": round(statistics.fmean(lat), 3),
+    }
+
+
+def _throughput(make_fn, concurrency: int, seconds: float) -> float:
+    """Chamadas/s com `concurrency` threads (cada uma com o próprio cliente)."""
+    stop = time.perf_counter() + seconds
+    counts = [0] * concurrency
+
+    def worker(i):
+        fn = make_fn()
+        while time.perf_counter() < stop:
+            fn()
+            counts[i] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return round(sum(counts) / (time.perf_counter() - t0), 1)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, action="append", help="itens por lote (repetir); padrão 1, 10, 100")
+    ap.add_argument("--calls", type=int, default=300)
+    ap.add_argument("--warmup", type=int, default=20)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--duration", type=float, default=5.0, help="segundos por medida de vazão (0 pula)")
+    ap.add_argument("--model", choices=("none", "synthetic"), default="none")
+    args = ap.parse_args(argv)
+
+    proc, url, target = _start(args.model)
+    results = []
+    try:
+        http = httpx.Client(base_url=url, timeout=60.0)
+        channel = gs.channel(target)
+        stub = gs.ScoringStub(channel)
+        for name, route, body, method, msg in _cases(args.rows or [1, 10, 100]):
+            rpc = getattr(stub, method)
+
+            def http_keepalive(c=http):
+                c.post(route, json=body).raise_for_status()
+
+            def http_new_conn():
+                httpx.post(url + route, json=body, timeout=60.0).raise_for_status()
+
+            def grpc_call(r=rpc):
+                r(msg)
+
+            row = {
+                "case": name,
+                "http_json_bytes": len(json.dumps(body).encode("utf-8")),
+                "grpc_bytes": msg.ByteSize(),
+                "http_keepalive": _latency(http_keepalive, args.calls, args.warmup),
+                "http_new_connection": _latency(http_new_conn, max(1, args.calls // 3), args.warmup // 2),
+                "grpc": _latency(grpc_call, args.calls, args.warmup),
+            }
+            row["speedup_p50_vs_keepalive"] = round(
+                row["http_keepalive"]["p50_ms"] / row["grpc"]["p50_ms"], 2
+            )
+            if args.duration > 0:
+                def make_http():
+                    c = httpx.Client(base_url=url, timeout=60.0)
+                    return lambda: c.post(route, json=body).raise_for_status()
+
+                def make_grpc():
+                    r = getattr(gs.ScoringStub(gs.channel(target)), method)
+                    return lambda: r(msg)
+
+                row["throughput_rps"] = {
+                    "concurrency": args.concurrency,
+                    "http_keepalive": _throughput(make_http, args.concurrency, args.duration),
+                    "grpc": _throughput(make_grpc, args.concurrency, args.duration),
+                }
+            results.append(row)
+        channel.close()
+        http.close()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    print(json.dumps({"model": args.model, "calls": args.calls, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_log_tail.py
+"""Compara o ciclo do drift service: pd.read_csv do log inteiro x LogTail incremental.
+
+Uso:
+    python -m benchmarks.bench_log_tail --size-gb 2 --dir /tmp/dm_bench
+    python -m benchmarks.bench_log_tail --size-gb 2 --skip-full   # pula o read_csv completo
+
+Gera um requests_log.csv sintético do tamanho pedido (reaproveitado se já
+existir), mede o cold start e ciclos com 1000 linhas novas, e imprime JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.monitoring.log_tail import LogTail
+
+HEADER = "ts,endpoint,cv_len,job_len,score\n"
+
+
+def _block(start: int, n: int) -> str:
+    return "".join(
+        f"{1.7e9 + i:.3f},/rank-candidates,{800 + i % 900},{1500 + i % 700},{(i % 1000) / 1000:.4f}\n"
+        for i in range(start, start + n)
+    )
+
+
+def _generate(path: Path, size_bytes: int):
+    if path.exists() and path.stat().st_size >= size_bytes:
+        return
+    block = _block(0, 20_000).encode("utf-8")
+    with path.open("wb") as f:
+        f.write(HEADER.encode("utf-8"))
+        written = 0
+        while written < size_bytes:
+            f.write(block)
+            written += len(block)
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size-gb", type=float, default=2.0)
+    ap.add_argument("--dir", default="/tmp/dm_bench")
+    ap.add_argument("--window", type=int, default=5000)
+    ap.add_argument("--cycles", type=int, default=20)
+    ap.add_argument("--skip-full", action="store_true")
+    args = ap.parse_args(argv)
+
+    d = Path(args.dir)
+    d.mkdir(parents=True, exist_ok=True)
+    log = d / "requests_log.csv"
+    t_gen, _ = _timed(lambda: _generate(log, int(args.size_gb * 1024**3)))
+
+    result = {"log_bytes": os.path.getsize(log), "generate_s": t_gen, "window": args.window}
+
+    if not args.skip_full:
+        # caminho antigo: parse completo + tail(window) em todo ciclo
+        result["full_read_csv_s"], _ = _timed(lambda: pd.read_csv(log).tail(args.window))
+
+    tail = LogTail(log, max_rows=args.window)
+    result["tail_cold_start_s"], n = _timed(tail.refresh)
+    result["tail_cold_start_rows"] = n
+
+    cycles = []
+    for c in range(args.cycles):
+        with log.open("a", encoding="utf-8") as f:
+            f.write(_block(10_000_000 + c * 1000, 1000))
+        t, n = _timed(lambda: (tail.refresh(), tail.frame())[0])
+        cycles.append(t)
+    cycles.sort()
+    result["tail_cycle_s"] = {
+        "p50": cycles[len(cycles) // 2],
+        "max": cycles[-1],
+        "rows_per_cycle": 1000,
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_metrics_multiproc.py
+"""Custo por requisição das métricas: registry em memória x modo multiprocess.
+
+Uso:
+    python -m benchmarks.bench_metrics_multiproc --requests 200000
+
+Cada "requisição" faz o mesmo que o middleware da API (LATENCY.observe +
+REQUESTS.inc). O modo multiprocess roda num subprocesso com
+PROMETHEUS_MULTIPROC_DIR definido (o modo é escolhido no import do
+prometheus_client). Também mede o scrape (/metrics) com N arquivos de worker.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+_CHILD = """
+import json, sys, time
+n = int(sys.argv[1])
+from src.api.metrics import LATENCY, REQUESTS, metrics_payload
+t0 = time.perf_counter()
+for i in range(n):
+    LATENCY.labels(endpoint="/score").observe(0.001 * (i % 50))
+    REQUESTS.labels(endpoint="/score", method="POST", status="200").inc()
+per_req = (time.perf_counter() - t0) / n
+t0 = time.perf_counter()
+payload = metrics_payload()
+scrape = time.perf_counter() - t0
+print(json.dumps({
+    "per_request_us": per_req * 1e6, "scrape_ms": scrape * 1e3, "bytes": len(payload),
+}))
+"""
+
+
+def _run(n: int, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, str(n)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=200_000)
+    ap.add_argument(
+        "--workers", type=int, default=4,
+        help="processos gravando no diretório antes do scrape final",
+    )
+    args = ap.parse_args()
+
+    env = {k: v for k, v in os.environ.items() if k.lower() != "prometheus_multiproc_dir"}
+    results = {"single_process": _run(args.requests, env)}
+
+    with tempfile.TemporaryDirectory() as d:
+        mp_env = dict(env, PROMETHEUS_MULTIPROC_DIR=d)
+        # workers anteriores deixam seus arquivos; o último mede o scrape agregado
+        for _ in range(args.workers - 1):
+            _run(1000, mp_env)
+        results["multiprocess"] = _run(args.requests, mp_env)
+        results["multiprocess"]["worker_files"] = len(os.listdir(d))
+
+    base = results["single_process"]["per_request_us"]
+    results["overhead_us_per_request"] = results["multiprocess"]["per_request_us"] - base
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_ringlog.py
+"""Log de requisições: CSV (csv.writer + pandas) x ring buffer mmap (NumPy).
+
+Uso:
+    python -m benchmarks.bench_ringlog --rows 200000 --batch 1 --batch 50
+
+Mede, para cada tamanho de lote, a escrita do lado da API (linhas/s) e, do
+lado do drift service, o tempo para montar a janela das últimas `--window`
+linhas (CSV: LogTail a frio + to_numeric; ring: latest() + DataFrame).
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.monitoring.log_tail import LogTail
+from src.monitoring.ringlog import RingReader, RingWriter, make_records
+
+HEADER = ["ts", "endpoint", "cv_len", "job_len", "score"]
+
+
+def _rows(n: int):
+    return [[1.7e9 + i, "/rank-candidates", 800 + i % 900, 1500 + i % 700, (i % 1000) / 1000] for i in range(n)]
+
+
+def _write_csv(path: Path, rows, batch: int) -> float:
+    with path.open("w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(HEADER)
+    t0 = time.perf_counter()
+    for i in range(0, len(rows), batch):
+        # mesmo padrão da API: abre, escreve o lote, fecha
+        with path.open("a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            for r in rows[i:i + batch]:
+                w.writerow(r)
+    return time.perf_counter() - t0
+
+
+def _write_ring(path: Path, rows, batch: int) -> float:
+    w = RingWriter(path, capacity=len(rows))
+    t0 = time.perf_counter()
+    for i in range(0, len(rows), batch):
+        w.append(make_records(rows[i:i + batch], "bench"))
+    dt = time.perf_counter() - t0
+    w.close()
+    return dt
+
+
+def _window_csv(path: Path, window: int) -> float:
+    t0 = time.perf_counter()
+    tail = LogTail(path, max_rows=window)
+    tail.refresh()
+    df = tail.frame()
+    pd.DataFrame({c: pd.to_numeric(df[c], errors="coerce") for c in ("cv_len", "job_len", "score")})
+    return time.perf_counter() - t0
+
+
+def _window_ring(path: Path, window: int) -> float:
+    t0 = time.perf_counter()
+    r = RingReader(path)
+    recs = r.latest(window)
+    pd.DataFrame({c: recs[c].astype(float) for c in ("cv_len", "job_len", "score")})
+    dt = time.perf_counter() - t0
+    r.close()
+    return dt
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--batch", type=int, action="append", default=None)
+    ap.add_argument("--window", type=int, default=5000)
+    args = ap.parse_args(argv)
+    rows = _rows(args.rows)
+
+    result = {"rows": args.rows, "window": args.window, "batches": {}}
+    with tempfile.TemporaryDirectory() as d:
+        for batch in args.batch or [1, 50]:
+            csv_path = Path(d) / f"log_{batch}.csv"
+            ring_path = Path(d) / f"log_{batch}.ring"
+            t_csv = _write_csv(csv_path, rows, batch)
+            t_ring = _write_ring(ring_path, rows, batch)
+            result["batches"][batch] = {
+                "csv_write_rows_per_s": args.rows / t_csv,
+                "ring_write_rows_per_s": args.rows / t_ring,
+                "csv_window_s": _window_csv(csv_path, args.window),
+                "ring_window_s": _window_ring(ring_path, args.window),
+                "csv_bytes": csv_path.stat().st_size,
+                "ring_bytes": ring_path.stat().st_size,
+            }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
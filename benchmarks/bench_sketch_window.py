@@ -0,0 +1,92 @@
+# benchmarks/bench_sketch_window.py
+"""Ciclo do drift service na janela de 1d: merge de todos os minutos x roll-ups por hora.
+
+Uso:
+    python -m benchmarks.bench_sketch_window --workers 4 --cycles 5 --dir /tmp/dm_sketch_bench
+
+Gera 1440 minutos x N workers de arquivos de sketch (reaproveitados se já
+existirem) e mede `SketchStore.window(1d)`: primeiro ciclo (cold, lê tudo) e
+ciclos seguintes com um minuto novo por worker, com e sem os roll-ups.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.monitoring import sketches
+from src.monitoring.sketches import SketchRecorder, SketchStore, parse_window
+
+DAY = 86400
+
+
+def _generate(d: Path, workers: int, start: int, rows: int):
+    rng = np.random.default_rng(0)
+    for minute in range(start, start + DAY, 60):
+        for pid in range(1, workers + 1):
+            path = d / f"{minute}-{pid}.json"
+            if path.exists():
+                continue
+            rec = SketchRecorder(d, clock=lambda: minute + 1.0)
+            rec.update({
+                "cv_len": rng.lognormal(7, 0.5, rows),
+                "job_len": rng.lognormal(7.5, 0.4, rows),
+                "score": rng.random(rows),
+            })
+            rec.flush()
+            os.replace(d / f"{minute}-{os.getpid()}.json", path)
+
+
+def _cycles(d: Path, now: float, cycles: int) -> dict:
+    store = SketchStore(d)
+    window = parse_window("1d")
+    t0 = time.perf_counter()
+    store.window(window, now=now)
+    cold = time.perf_counter() - t0
+    times = []
+    for i in range(cycles):
+        # um minuto novo (arquivo do minuto corrente regravado pelo worker 1)
+        path = d / f"{int(now // 60) * 60}-1.json"
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + i + 1))
+        t0 = time.perf_counter()
+        store.window(window, now=now)
+        times.append(time.perf_counter() - t0)
+    return {"cold_s": cold, "cycle_p50_s": float(np.median(times)), "cycle_max_s": max(times)}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--rows", type=int, default=50, help="linhas por minuto e worker")
+    ap.add_argument("--cycles", type=int, default=5)
+    ap.add_argument("--dir", default="/tmp/dm_sketch_bench")
+    args = ap.parse_args(argv)
+
+    d = Path(args.dir)
+    d.mkdir(parents=True, exist_ok=True)
+    start = 3600 * 400_000
+    t0 = time.perf_counter()
+    _generate(d, args.workers, start, args.rows)
+    now = start + DAY - 1.0
+    result = {"files": args.workers * DAY // 60, "generate_s": time.perf_counter() - t0}
+
+    result["rollup"] = _cycles(d, now, args.cycles)
+    # caminho antigo: nenhuma hora conta como fechada, todo minuto é fundido a cada ciclo
+    grace = sketches._ROLLUP_GRACE
+    sketches._ROLLUP_GRACE = float("inf")
+    try:
+        result["per_minute"] = _cycles(d, now, args.cycles)
+    finally:
+        sketches._ROLLUP_GRACE = grace
+    result["cycle_speedup"] = (
+        result["per_minute"]["cycle_p50_s"] / max(result["rollup"]["cycle_p50_s"], 1e-9)
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_ui_csv.py
+"""Ingestão do CSV da UI: leitor robusto + iterrows x caminho rápido + colunas.
+
+Uso:
+    python -m benchmarks.bench_ui_csv --rows 100000
+
+Gera um CSV sintético (id, name, cv_pt, competencias, observacoes) e mede,
+para cada caminho, a leitura até o DataFrame padrão e a montagem da lista de
+candidatos do payload. "antes" reproduz a UI anterior (DictReader linha a linha
+e df.iterrows()); "depois" é `ui/csv_io.py`. Também mede um rerun com cache
+(lookup por hash do conteúdo).
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import random
+import time
+
+from ui.csv_io import build_candidates, file_digest, read_candidates, read_robust, sniff_delimiter
+
+_WORDS = "python java sql docker aws dados etl spark api rest backend analista sênior".split()
+
+
+def _csv_bytes(rows: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(["id", "name", "cv_pt", "competencias", "observacoes"])
+    for i in range(rows):
+        w.writerow([
+            i,
+            f"Candidato {i}",
+            " ".join(rng.choice(_WORDS) for _ in range(rng.randint(40, 120))),
+            ", ".join(rng.sample(_WORDS, 4)),
+            "remoto" if i % 3 else "",
+        ])
+    return buf.getvalue().encode("utf-8")
+
+
+def _before(raw: bytes):
+    t0 = time.perf_counter()
+    text = raw.decode("utf-8-sig")
+    df = read_robust(text, sniff_delimiter(text[:20000])).fillna("").astype(str)
+    t1 = time.perf_counter()
+    cands = [
+        {c: str(r[c]) for c in ("id", "name", "cv_pt", "competencias", "observacoes")}
+        for _, r in df.iterrows()
+    ]
+    return t1 - t0, time.perf_counter() - t1, len(cands)
+
+
+def _after(raw: bytes):
+    t0 = time.perf_counter()
+    df, engine = read_candidates(raw)
+    t1 = time.perf_counter()
+    cands = build_candidates(df)
+    return t1 - t0, time.perf_counter() - t1, len(cands), engine
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    args = ap.parse_args(argv)
+    raw = _csv_bytes(args.rows)
+
+    read_b, payload_b, n_b = _before(raw)
+    read_a, payload_a, n_a, engine = _after(raw)
+    assert n_a == n_b == args.rows
+
+    # rerun com cache: só o hash do conteúdo + lookup
+    cache = {file_digest(raw): True}
+    t0 = time.perf_counter()
+    hit = file_digest(raw) in cache
+    rerun = time.perf_counter() - t0
+
+    print(json.dumps({
+        "rows": args.rows,
+        "csv_mb": len(raw) / 2**20,
+        "before": {"read_s": read_b, "payload_s": payload_b, "total_s": read_b + payload_b},
+        "after": {"engine": engine, "read_s": read_a, "payload_s": payload_a, "total_s": read_a + payload_a},
+        "speedup": (read_b + payload_b) / (read_a + payload_a),
+        "cached_rerun_s": rerun if hit else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
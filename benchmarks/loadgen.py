@@ -0,0 +1,343 @@
+# benchmarks/loadgen.py
+"""Gerador de carga da API: replay de um trace JSONL (gravado ou sintético).
+
+Uso:
+    # gera um trace sintético (mix de endpoints e tamanhos de ranking)
+    python -m benchmarks.loadgen synth --out trace.jsonl --requests 5000 \
+        --mix score=0.6,score-batch=0.1,rank=0.3
+
+    # taxa fixa (open loop), subindo a API localmente
+    python -m benchmarks.loadgen run --trace trace.jsonl --start-server \
+        --rate 20 --rate 50 --rate 100 --duration 30
+
+    # concorrência fixa (closed loop) contra uma API já rodando
+    python -m benchmarks.loadgen run --trace trace.jsonl --url http://127.0.0.1:8000 \
+        --concurrency 8 --duration 30
+
+Formato do trace (uma requisição por linha):
+    {"endpoint": "/rank-candidates", "body": {...}}
+
+Em open loop as requisições saem no horário previsto (`i / rate`),
+independentemente das respostas; se `--max-inflight` estourar, a requisição é
+contada como `dropped` (o cliente também saturou). O ponto de saturação é a
+primeira etapa em que a vazão fica abaixo de 90% do alvo, o p99 passa de
+`--slo-ms` ou os erros passam de 1%.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+ENDPOINTS = {"score": "/score", "score-batch": "/score-batch", "rank": "/rank-candidates"}
+DEFAULT_MIX = "score=0.6,score-batch=0.1,rank=0.3"
+
+_WORDS = (
+    "python java sql docker kubernetes fastapi spring react aws azure dados etl "
+    "spark airflow pandas api rest microsserviços backend frontend devops linux "
+    "git scrum analista desenvolvedor engenheiro sênior pleno júnior inglês"
+).split()
+
+
+# =========================
+# Trace
+# =========================
+def _text(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n_words))
+
+
+def _job(rng: random.Random) -> dict:
+    return {
+        "titulo_vaga": _text(rng, 3),
+        "principais_atividades": _text(rng, rng.randint(20, 80)),
+        "competencias": _text(rng, rng.randint(5, 20)),
+        "observacoes": _text(rng, rng.randint(0, 10)),
+    }
+
+
+def _cv(rng: random.Random) -> str:
+    return _text(rng, rng.randint(50, 300))
+
+
+def synth_trace(
+    n: int, mix: Dict[str, float], seed: int = 42, max_candidates: int = 500
+) -> List[dict]:
+    """Trace sintético; candidatos por ranking seguem uma log-uniforme em [5, max_candidates]."""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[k] for k in names]
+    out = []
+    for _ in range(n):
+        kind = rng.choices(names, weights)[0]
+        if kind == "score":
+            body = {"cv_pt": _cv(rng), **_job(rng)}
+        elif kind == "score-batch":
+            body = [{"cv_pt": _cv(rng), **_job(rng)} for _ in range(rng.randint(2, 20))]
+        else:
+            n_cand = int(round(np.exp(rng.uniform(np.log(5), np.log(max_candidates)))))
+            body = {
+                **_job(rng),
+                "candidates": [
+                    {"id": str(i), "cv_pt": _cv(rng), "competencias": _text(rng, 5)}
+                    for i in range(n_cand)
+                ],
+                "k": 10,
+            }
+        out.append({"endpoint": ENDPOINTS[kind], "body": body})
+    return out
+
+
+def load_trace(path: Path) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        k, _, v = part.partition("=")
+        if k.strip() not in ENDPOINTS:
+            raise SystemExit(f"endpoint desconhecido no mix: {k!r} (use {', '.join(ENDPOINTS)})")
+        mix[k.strip()] = float(v or 1)
+    return mix
+
+
+# =========================
+# Execução
+# =========================
+class Recorder:
+    def __init__(self):
+        self.lat: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.status: Dict[str, int] = defaultdict(int)
+        self.dropped = 0
+
+    async def send(self, client: httpx.AsyncClient, req: dict):
+        ep = req["endpoint"]
+        t0 = time.perf_counter()
+        try:
+            r = await client.post(
+                ep, content=req["_payload"], headers={"Content-Type": "application/json"}
+            )
+            self.status[str(r.status_code)] += 1
+            if r.status_code >= 400:
+                self.errors[ep] += 1
+                return
+        except httpx.HTTPError as e:
+            self.status[type(e).__name__] += 1
+            self.errors[ep] += 1
+            return
+        self.lat[ep].append(time.perf_counter() - t0)
+
+
+def _percentiles(values: List[float]) -> dict:
+    if not values:
+        return {}
+    a = np.asarray(values) * 1000
+    p50, p90, p95, p99 = np.percentile(a, [50, 90, 95, 99])
+    return {"p50_ms": p50, "p90_ms": p90, "p95_ms": p95, "p99_ms": p99, "max_ms": float(a.max())}
+
+
+def _summary(rec: Recorder, elapsed: float, sent: int) -> dict:
+    ok = sum(len(v) for v in rec.lat.values())
+    errors = sum(rec.errors.values())
+    out = {
+        "sent": sent,
+        "ok": ok,
+        "errors": errors,
+        "dropped": rec.dropped,
+        "error_rate": (errors + rec.dropped) / sent if sent else 0.0,
+        "elapsed_s": elapsed,
+        "throughput_rps": ok / elapsed if elapsed else 0.0,
+        "latency": _percentiles([x for v in rec.lat.values() for x in v]),
+        "status": dict(rec.status),
+        "endpoints": {},
+    }
+    for ep in sorted(set(rec.lat) | set(rec.errors)):
+        out["endpoints"][ep] = {
+            "ok": len(rec.lat[ep]), "errors": rec.errors[ep], **_percentiles(rec.lat[ep]),
+        }
+    return out
+
+
+async def run_rate(
+    client, trace: List[dict], rate: float, duration: float, max_inflight: int
+) -> dict:
+    """Open loop: requisição i sai em t0 + i/rate."""
+    rec = Recorder()
+    tasks = set()
+    n = int(rate * duration)
+    t0 = time.perf_counter()
+    for i in range(n):
+        delay = t0 + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(tasks) >= max_inflight:
+            rec.dropped += 1
+            continue
+        task = asyncio.create_task(rec.send(client, trace[i % len(trace)]))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return {"mode": "rate", "target_rps": rate, **_summary(rec, time.perf_counter() - t0, n)}
+
+
+async def run_concurrency(client, trace: List[dict], concurrency: int, duration: float) -> dict:
+    """Closed loop: `concurrency` clientes, cada um manda a próxima ao receber a resposta."""
+    rec = Recorder()
+    counter = iter(range(10**12))
+    sent = 0
+    t0 = time.perf_counter()
+    deadline = t0 + duration
+
+    async def worker():
+        nonlocal sent
+        while time.perf_counter() < deadline:
+            i = next(counter)
+            sent += 1
+            await rec.send(client, trace[i % len(trace)])
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = _summary(rec, time.perf_counter() - t0, sent)
+    return {"mode": "concurrency", "concurrency": concurrency, **summary}
+
+
+def _saturated(step: dict, slo_ms: float) -> bool:
+    p99 = step["latency"].get("p99_ms", float("inf"))
+    if step["error_rate"] > 0.01 or p99 > slo_ms:
+        return True
+    return step["mode"] == "rate" and step["throughput_rps"] < 0.9 * step["target_rps"]
+
+
+async def run(args, trace: List[dict]) -> dict:
+    for req in trace:
+        req["_payload"] = json.dumps(req["body"]).encode("utf-8")
+    limits = httpx.Limits(
+        max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight
+    )
+    steps = []
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        # aquecimento: carrega modelo/caches antes de medir
+        for req in trace[: args.warmup]:
+            await Recorder().send(client, req)
+        for rate in args.rate or []:
+            steps.append(await run_rate(client, trace, rate, args.duration, args.max_inflight))
+        for c in args.concurrency or []:
+            steps.append(await run_concurrency(client, trace, c, args.duration))
+    saturation = next((s for s in steps if _saturated(s, args.slo_ms)), None)
+    if saturation is not None:
+        keys = ("mode", "target_rps", "concurrency", "throughput_rps", "error_rate")
+        saturation = {k: saturation.get(k) for k in keys} | {
+            "p99_ms": saturation["latency"].get("p99_ms")
+        }
+    return {
+        "url": args.url,
+        "trace_requests": len(trace),
+        "duration_s": args.duration,
+        "slo_p99_ms": args.slo_ms,
+        "steps": steps,
+        "saturation": saturation,
+    }
+
+
+# =========================
+# Servidor local
+# =========================
+def _start_server(port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, API_PORT=str(port), API_WORKERS=str(workers), API_HOST="127.0.0.1")
+    # logs do servidor (inclusive access log) vão para stderr; stdout fica só com o JSON
+    proc = subprocess.Popen([sys.executable, "-m", "src.api.serve"], env=env, stdout=sys.stderr)
+    url = f"http://127.0.0.1:{port}/health"
+    for _ in range(300):
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        if proc.poll() is not None:
+            raise SystemExit("a API encerrou durante a inicialização")
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("a API não respondeu /health a tempo")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Gerador de carga da Decision Match API")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sy = sub.add_parser("synth", help="gera um trace sintético")
+    sy.add_argument("--out", type=Path, required=True)
+    sy.add_argument("--requests", type=int, default=5000)
+    sy.add_argument("--mix", default=DEFAULT_MIX)
+    sy.add_argument("--max-candidates", type=int, default=500)
+    sy.add_argument("--seed", type=int, default=42)
+
+    rn = sub.add_parser("run", help="replay do trace (taxa ou concorrência)")
+    rn.add_argument(
+        "--trace", type=Path, default=None, help="JSONL; sem ele usa um trace sintético"
+    )
+    rn.add_argument("--url", default="http://127.0.0.1:8000")
+    rn.add_argument("--start-server", action="store_true", help="sobe a API local (src.api.serve)")
+    rn.add_argument("--port", type=int, default=8765)
+    rn.add_argument("--workers", type=int, default=1)
+    rn.add_argument(
+        "--rate", type=float, action="append", help="req/s (open loop); repetir para varrer"
+    )
+    rn.add_argument(
+        "--concurrency", type=int, action="append",
+        help="clientes (closed loop); repetir para varrer",
+    )
+    rn.add_argument("--duration", type=float, default=30.0)
+    rn.add_argument("--warmup", type=int, default=20)
+    rn.add_argument("--max-inflight", type=int, default=512)
+    rn.add_argument("--timeout", type=float, default=60.0)
+    rn.add_argument(
+        "--slo-ms", type=float, default=1000.0, help="p99 acima disso conta como saturado"
+    )
+    rn.add_argument("--out", type=Path, default=None, help="grava o JSON também neste arquivo")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "synth":
+        trace = synth_trace(args.requests, _parse_mix(args.mix), args.seed, args.max_candidates)
+        with open(args.out, "w", encoding="utf-8") as f:
+            for req in trace:
+                f.write(json.dumps(req, ensure_ascii=False) + "\n")
+        print(json.dumps({"out": str(args.out), "requests": len(trace)}))
+        return
+
+    if not args.rate and not args.concurrency:
+        args.concurrency = [4]
+    if args.trace:
+        trace = load_trace(args.trace)
+    else:
+        trace = synth_trace(1000, _parse_mix(DEFAULT_MIX))
+    proc = None
+    if args.start_server:
+        proc = _start_server(args.port, args.workers)
+        args.url = f"http://127.0.0.1:{args.port}"
+    try:
+        result = asyncio.run(run(args, trace))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(10)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# src/api/accounting.py
+"""Custo por requisição: tempo de CPU da thread e pico de alocação (amostrado).
+
+- CPU: `time.thread_time()` na thread que executa o endpoint (threadpool do
+  FastAPI); não inclui threads auxiliares (BLAS, etc.).
+- Alocação: `tracemalloc` ligado só durante a requisição sorteada e em uma
+  requisição por vez (lock); o pico é relativo ao início. O tracemalloc é do
+  processo inteiro, então alocações de requisições concorrentes no mesmo worker
+  entram na conta — o valor é um teto, não uma medida exata.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import List, Optional
+
+_alloc_lock = threading.Lock()
+
+
+class Usage:
+    __slots__ = ("cpu_seconds", "peak_bytes")
+
+    def __init__(self):
+        self.cpu_seconds: float = 0.0
+        self.peak_bytes: Optional[int] = None
+
+
+@contextmanager
+def account(alloc: bool = False):
+    """Mede o bloco; com `alloc`, tenta também o pico de memória alocada."""
+    usage = Usage()
+    traced = False
+    if alloc and not tracemalloc.is_tracing() and _alloc_lock.acquire(blocking=False):
+        tracemalloc.start()
+        traced = True
+    cpu0 = time.thread_time()
+    try:
+        yield usage
+    finally:
+        usage.cpu_seconds = time.thread_time() - cpu0
+        if traced:
+            try:
+                _, peak = tracemalloc.get_traced_memory()
+                usage.peak_bytes = int(peak)
+            finally:
+                tracemalloc.stop()
+                _alloc_lock.release()
+
+
+def server_timing(total_seconds: float, usage: Optional[Usage]) -> str:
+    """Valor do header `Server-Timing` (durações em ms)."""
+    parts: List[str] = [f"app;dur={total_seconds * 1000:.1f}"]
+    if usage is not None:
+        parts.append(f"cpu;dur={usage.cpu_seconds * 1000:.1f}")
+        if usage.peak_bytes is not None:
+            parts.append(f'alloc;desc="peak {usage.peak_bytes / 2**20:.1f} MiB"')
+    return ", ".join(parts)
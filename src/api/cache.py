@@ -0,0 +1,103 @@
+# src/api/cache.py
+"""Cache de resultados por requisição: guarda o vetor completo de scores.
+
+A chave cobre endpoint, versão do modelo e os textos que entram no modelo; assim
+mudanças de `k`, `use_threshold` ou filtragem são respondidas sem re-scorar.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .metrics import CACHE_BYTES, CACHE_EVICTIONS
+
+# custo fixo estimado por entrada (chave, tupla, nó do OrderedDict)
+_ENTRY_OVERHEAD = 256
+
+
+def result_key(endpoint: str, model_version: str, Xdf: pd.DataFrame) -> str:
+    """Hash estável (sha256) do DataFrame de entrada do modelo + endpoint + versão."""
+    h = hashlib.sha256()
+    h.update(f"{endpoint}\x1f{model_version}\x1f{len(Xdf)}\x1f".encode("utf-8"))
+    h.update("\x1f".join(map(str, Xdf.columns)).encode("utf-8"))
+    if len(Xdf):
+        h.update(pd.util.hash_pandas_object(Xdf, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class ResultCache:
+    """LRU limitado por memória (bytes) com TTL por entrada. Thread-safe."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = int(max_bytes)
+        self.ttl_seconds = float(ttl_seconds)
+        self._clock = clock
+        self._data: "OrderedDict[str, tuple[float, np.ndarray, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl_seconds > 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _drop(self, key: str, reason: Optional[str] = None):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+        if reason:
+            CACHE_EVICTIONS.labels(reason=reason).inc()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, scores, _ = entry
+            if self._clock() >= expires:
+                self._drop(key, "ttl")
+                CACHE_BYTES.set(self._bytes)
+                return None
+            self._data.move_to_end(key)
+            return scores
+
+    def put(self, key: str, scores: np.ndarray):
+        if not self.enabled:
+            return
+        scores = np.array(scores, dtype=float, copy=True)
+        scores.setflags(write=False)
+        size = scores.nbytes + len(key) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (self._clock() + self.ttl_seconds, scores, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)), "size")
+            CACHE_BYTES.set(self._bytes)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            CACHE_BYTES.set(0)
@@ -0,0 +1,294 @@
+# src/api/codecs.py
+"""Codificação dos endpoints em lote: JSON (padrão), MessagePack e Arrow IPC.
+
+O cliente escolhe o formato do corpo por `Content-Type` e o da resposta por
+`Accept`. JSON continua validado pelos modelos pydantic (mesmos erros 422 de
+antes); MessagePack usa decoders tipados do msgspec e Arrow IPC (stream) chega
+colunar, direto para o DataFrame, sem objeto por linha.
+
+Arrow: em /score-batch a tabela tem as colunas de `SCORE_FIELDS`; em
+/rank-candidates a tabela são os candidatos e os campos da vaga (`JOB_FIELDS`,
+`k`, `use_threshold`) vão nos metadados do schema. As respostas seguem o mesmo
+padrão (itens como colunas, `used_k`/`threshold_used` nos metadados).
+"""
+from __future__ import annotations
+
+from typing import Dict, List, NamedTuple, Optional, Union
+
+import msgspec
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from starlette.responses import Response
+
+from .schemas import RankCandidatesRequest, ScoreRequest
+
+try:  # opcional: Arrow IPC
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+_ALIASES = {
+    JSON: JSON,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    ARROW: ARROW,
+}
+
+SCORE_FIELDS = ["cv_pt", "principais_atividades", "competencias", "observacoes", "titulo_vaga"]
+JOB_FIELDS = ["titulo_vaga", "principais_atividades", "competencias", "observacoes"]
+CANDIDATE_FIELDS = ["id", "name", "cv_pt", "competencias", "observacoes"]
+# id/name ausentes ficam None (default do pydantic); nulos viram "" em todas as
+# colunas, como `_coerce_str` faz no JSON
+_NULLABLE = ("id", "name")
+# tipos das colunas de resposta em Arrow (lotes vazios mantêm o schema)
+_ARROW_TYPES = {} if pa is None else {
+    "id": pa.string(),
+    "name": pa.string(),
+    "score": pa.float64(),
+    "pass_by_threshold": pa.bool_(),
+    "threshold_used": pa.float64(),
+}
+
+
+# =========================
+# Decoders tipados (msgspec)
+# =========================
+class ScoreRow(msgspec.Struct):
+    cv_pt: Optional[str] = ""
+    principais_atividades: Optional[str] = ""
+    competencias: Optional[str] = ""
+    observacoes: Optional[str] = ""
+    titulo_vaga: Optional[str] = ""
+
+
+class CandidateRow(msgspec.Struct):
+    # UNSET distingue campo ausente (None) de null explícito ("")
+    id: Union[Optional[str], msgspec.UnsetType] = msgspec.UNSET
+    name: Union[Optional[str], msgspec.UnsetType] = msgspec.UNSET
+    cv_pt: Optional[str] = ""
+    competencias: Optional[str] = ""
+    observacoes: Optional[str] = ""
+
+
+class RankJob(msgspec.Struct):
+    candidates: List[CandidateRow]
+    titulo_vaga: Optional[str] = ""
+    principais_atividades: Optional[str] = ""
+    competencias: Optional[str] = ""
+    observacoes: Optional[str] = ""
+    k: Optional[int] = None
+    use_threshold: bool = True
+
+
+_score_msgpack = msgspec.msgpack.Decoder(List[ScoreRow])
+_rank_msgpack = msgspec.msgpack.Decoder(RankJob)
+_score_json = TypeAdapter(List[ScoreRequest])
+_rank_json = TypeAdapter(RankCandidatesRequest)
+_msgpack_encoder = msgspec.msgpack.Encoder()
+
+
+class RankBatch(NamedTuple):
+    """Pedido de ranking já decodificado: vaga, parâmetros e candidatos (colunas)."""
+    job: Dict[str, str]
+    k: Optional[int]
+    use_threshold: bool
+    candidates: pd.DataFrame
+
+
+# =========================
+# Negociação
+# =========================
+def _media_type(value: Optional[str]) -> str:
+    return (value or "").split(";", 1)[0].strip().lower()
+
+
+def request_format(content_type: Optional[str]) -> str:
+    """Formato do corpo; sem Content-Type (ou *+json) é JSON, desconhecido é 415."""
+    mt = _media_type(content_type)
+    if not mt or mt.endswith("+json"):
+        return JSON
+    fmt = _ALIASES.get(mt)
+    if fmt is None or (fmt == ARROW and pa is None):
+        raise HTTPException(status_code=415, detail=f"Content-Type não suportado: {mt}")
+    return fmt
+
+
+def response_format(accept: Optional[str]) -> str:
+    """Primeiro formato suportado do Accept (na ordem enviada); senão JSON."""
+    for part in (accept or "").split(","):
+        fmt = _ALIASES.get(_media_type(part))
+        if fmt is not None and not (fmt == ARROW and pa is None):
+            return fmt
+    return JSON
+
+
+# =========================
+# Requisições
+# =========================
+def _invalid(e: Exception):
+    return HTTPException(status_code=422, detail=f"corpo inválido: {e}")
+
+
+def _json_errors(e: ValidationError):
+    # mesmo formato do FastAPI para o corpo JSON
+    return RequestValidationError([
+        {**err, "loc": ("body",) + tuple(err.get("loc", ()))}
+        for err in e.errors(include_url=False)
+    ])
+
+
+def _read_arrow(body: bytes):
+    try:
+        return pa.ipc.open_stream(pa.BufferReader(body)).read_all()
+    except Exception as e:
+        raise _invalid(e)
+
+
+def _arrow_column(table, name: str) -> np.ndarray:
+    """Coluna de texto como array object ("" nos nulos); ausente = "" (ou None em id/name)."""
+    if name not in table.column_names:
+        return np.full(table.num_rows, None if name in _NULLABLE else "", dtype=object)
+    col = table.column(name)
+    t = col.type
+    if pa.types.is_dictionary(t) or pa.types.is_large_string(t) or pa.types.is_null(t):
+        col = col.cast(pa.string())
+    if not pa.types.is_string(col.type):
+        raise HTTPException(
+            status_code=422, detail=f"coluna {name!r} deve ser string (recebido {col.type})"
+        )
+    return col.fill_null("").to_numpy(zero_copy_only=False).astype(object, copy=False)
+
+
+def _cell(row, field: str):
+    v = getattr(row, field)
+    if v is msgspec.UNSET:
+        return None  # msgspec: campo ausente
+    if v is None and field in _NULLABLE and not isinstance(row, msgspec.Struct):
+        return None  # pydantic: default de campo ausente (null explícito já virou "")
+    return v or ""
+
+
+def _arrow_frame(table, fields: List[str]) -> pd.DataFrame:
+    return pd.DataFrame({f: _arrow_column(table, f) for f in fields}, columns=fields)
+
+
+def _rows_frame(rows, fields: List[str]) -> pd.DataFrame:
+    cols = {f: [_cell(r, f) for r in rows] for f in fields}
+    return pd.DataFrame(cols, columns=fields, dtype=object)
+
+
+def decode_score_batch(body: bytes, fmt: str) -> pd.DataFrame:
+    """Corpo do /score-batch como DataFrame com `SCORE_FIELDS` (uma linha por item)."""
+    if fmt == ARROW:
+        table = _read_arrow(body)
+        return _arrow_frame(table, SCORE_FIELDS)
+    if fmt == MSGPACK:
+        try:
+            rows = _score_msgpack.decode(body)
+        except (msgspec.DecodeError, msgspec.ValidationError) as e:
+            raise _invalid(e)
+    else:
+        try:
+            rows = _score_json.validate_json(body)
+        except ValidationError as e:
+            raise _json_errors(e)
+    return _rows_frame(rows, SCORE_FIELDS)
+
+
+def decode_rank(body: bytes, fmt: str) -> RankBatch:
+    """Corpo do /rank-candidates: vaga, k, use_threshold e candidatos em colunas."""
+    if fmt == ARROW:
+        table = _read_arrow(body)
+        meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+        try:
+            k = int(meta["k"]) if meta.get("k", "") not in ("", "null", "None") else None
+        except ValueError as e:
+            raise _invalid(e)
+        use_thr = meta.get("use_threshold", "true").strip().lower() not in ("0", "false", "no")
+        cands = _arrow_frame(table, CANDIDATE_FIELDS)
+        return RankBatch({f: meta.get(f, "") for f in JOB_FIELDS}, k, use_thr, cands)
+    if fmt == MSGPACK:
+        try:
+            req = _rank_msgpack.decode(body)
+        except (msgspec.DecodeError, msgspec.ValidationError) as e:
+            raise _invalid(e)
+    else:
+        try:
+            req = _rank_json.validate_json(body)
+        except ValidationError as e:
+            raise _json_errors(e)
+    job = {f: getattr(req, f) or "" for f in JOB_FIELDS}
+    cands = _rows_frame(req.candidates, CANDIDATE_FIELDS)
+    return RankBatch(job, req.k, bool(req.use_threshold), cands)
+
+
+# =========================
+# Respostas
+# =========================
+def encode_columns(columns: Dict[str, list], fmt: str, meta: Optional[dict] = None) -> Response:
+    """Resposta binária a partir de colunas.
+
+    MessagePack espelha o JSON: lista de registros ou, com `meta`,
+    {"items": [...], **meta}. Arrow: as colunas viram a tabela e `meta`
+    vai para os metadados do schema.
+    """
+    if fmt == ARROW:
+        # tipos fixos: colunas vazias ou só com nulos não mudam o schema
+        table = pa.table({
+            k: pa.array(v, type=_ARROW_TYPES.get(k, pa.string() if isinstance(v, list) else None))
+            for k, v in columns.items()
+        })
+        if meta:
+            table = table.replace_schema_metadata({k: str(v) for k, v in meta.items()})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue().to_pybytes(), media_type=ARROW)
+    names = list(columns)
+    values = [v.tolist() if isinstance(v, np.ndarray) else list(v) for v in columns.values()]
+    records = [dict(zip(names, row)) for row in zip(*values)]
+    obj = records if meta is None else {"items": records, **meta}
+    return Response(_msgpack_encoder.encode(obj), media_type=MSGPACK)
+
+
+# =========================
+# OpenAPI
+# =========================
+def _inline_refs(schema: dict) -> dict:
+    """Schema pydantic sem $defs (as refs locais não resolvem dentro do OpenAPI)."""
+    defs = schema.pop("$defs", {})
+
+    def walk(node):
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if ref is not None:
+                return walk(dict(defs[ref.rsplit("/", 1)[-1]]))
+            return {k: walk(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [walk(v) for v in node]
+        return node
+
+    return walk(schema)
+
+
+def openapi_body(adapter: TypeAdapter) -> dict:
+    """`openapi_extra` com o corpo documentado nos três formatos."""
+    schema = _inline_refs(adapter.json_schema())
+    binary = {"schema": {"type": "string", "format": "binary"}}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {JSON: {"schema": schema}, MSGPACK: {"schema": schema}, ARROW: binary},
+        }
+    }
+
+
+SCORE_BATCH_OPENAPI = openapi_body(_score_json)
+RANK_OPENAPI = openapi_body(_rank_json)
@@ -0,0 +1,402 @@
+# src/api/grpc_server.py
+"""Serviço gRPC de score, ao lado da API HTTP e com o mesmo estado.
+
+Métodos de `dm.scoring.v1.Scoring`: Score, ScoreBatch, RankCandidates e
+RankCandidatesStream (server streaming em lotes de GRPC_STREAM_CHUNK itens;
+sem `k` devolve o ranking inteiro). Todos chamam o núcleo de `main`
+(`_score_single`, `_score_batch_frame`, `_rank_batch`): mesmo modelo,
+thresholds, cache de resultados, log de drift, métricas e spans.
+
+Formas de subir:
+- junto com a API: GRPC_PORT=50051 (o servidor nasce no lifespan do worker);
+- sozinho: `python -m src.api.grpc_server` (carrega o modelo como a API).
+
+As mensagens são montadas em tempo de execução (FileDescriptorProto), sem
+protoc/grpcio-tools; `src/api/proto/scoring.proto` é o mesmo contrato para
+gerar clientes em outras linguagens (`--print-proto` regenera o arquivo).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent import futures
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Tuple
+
+import grpc
+import msgspec
+import pandas as pd
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+from . import codecs, tracing
+from . import main as api
+from .accounting import account
+from .metrics import (
+    BODY_BYTES, CANDIDATES, GRPC_LATENCY, GRPC_REQUESTS, REQUEST_CPU, TEXT_CHARS,
+)
+
+PACKAGE = "dm.scoring.v1"
+SERVICE = f"{PACKAGE}.Scoring"
+PROTO_PATH = Path(__file__).resolve().parent / "proto" / "scoring.proto"
+
+# =========================
+# Contrato (mensagens e métodos)
+# =========================
+# campo: (nome, número, tipo[, comentário]); tipo "repeated X" / "optional X" / escalar / mensagem
+_MESSAGES: Dict[str, list] = {
+    "ScoreRequest": [
+        ("cv_pt", 1, "string"),
+        ("principais_atividades", 2, "string"),
+        ("competencias", 3, "string"),
+        ("observacoes", 4, "string"),
+        ("titulo_vaga", 5, "string"),
+    ],
+    "ScoreResponse": [
+        ("score", 1, "double"),
+        ("pass_by_threshold", 2, "bool"),
+        ("threshold_used", 3, "double"),
+    ],
+    "ScoreBatchRequest": [("items", 1, "repeated ScoreRequest")],
+    "ScoreBatchResponse": [("items", 1, "repeated ScoreResponse")],
+    "Candidate": [
+        ("id", 1, "string"),
+        ("name", 2, "string"),
+        ("cv_pt", 3, "string"),
+        ("competencias", 4, "string"),
+        ("observacoes", 5, "string"),
+    ],
+    "RankRequest": [
+        ("titulo_vaga", 1, "string"),
+        ("principais_atividades", 2, "string"),
+        ("competencias", 3, "string"),
+        ("observacoes", 4, "string"),
+        ("candidates", 5, "repeated Candidate"),
+        ("k", 6, "int32", "<= 0 usa TARGET_K (no streaming, devolve todos)"),
+        ("use_threshold", 7, "optional bool", "ausente = true, como no HTTP"),
+    ],
+    "RankItem": [
+        ("id", 1, "string"),
+        ("name", 2, "string"),
+        ("score", 3, "double"),
+        ("pass_by_threshold", 4, "bool"),
+    ],
+    "RankResponse": [
+        ("items", 1, "repeated RankItem"),
+        ("used_k", 2, "int32"),
+        ("threshold_used", 3, "double"),
+    ],
+    "RankChunk": [
+        ("items", 1, "repeated RankItem"),
+        ("offset", 2, "int32", "posição do primeiro item deste lote no ranking"),
+        ("threshold_used", 3, "double"),
+    ],
+}
+# método: (requisição, resposta, server streaming)
+_METHODS: Dict[str, Tuple[str, str, bool]] = {
+    "Score": ("ScoreRequest", "ScoreResponse", False),
+    "ScoreBatch": ("ScoreBatchRequest", "ScoreBatchResponse", False),
+    "RankCandidates": ("RankRequest", "RankResponse", False),
+    "RankCandidatesStream": ("RankRequest", "RankChunk", True),
+}
+
+_F = descriptor_pb2.FieldDescriptorProto
+_SCALARS = {
+    "string": _F.TYPE_STRING,
+    "double": _F.TYPE_DOUBLE,
+    "bool": _F.TYPE_BOOL,
+    "int32": _F.TYPE_INT32,
+}
+
+
+def _file_descriptor() -> descriptor_pb2.FileDescriptorProto:
+    fd = descriptor_pb2.FileDescriptorProto(
+        name="scoring.proto", package=PACKAGE, syntax="proto3"
+    )
+    for msg_name, fields in _MESSAGES.items():
+        msg = fd.message_type.add(name=msg_name)
+        for name, number, spec, *_ in fields:
+            label, _, typ = spec.rpartition(" ")
+            f = msg.field.add(name=name, number=number, json_name=name)
+            f.label = _F.LABEL_REPEATED if label == "repeated" else _F.LABEL_OPTIONAL
+            if typ in _SCALARS:
+                f.type = _SCALARS[typ]
+            else:
+                f.type, f.type_name = _F.TYPE_MESSAGE, f".{PACKAGE}.{typ}"
+            if label == "optional":
+                # proto3 optional = oneof sintético com um campo só
+                f.proto3_optional = True
+                f.oneof_index = len(msg.oneof_decl)
+                msg.oneof_decl.add(name=f"_{name}")
+    svc = fd.service.add(name=SERVICE.rsplit(".", 1)[-1])
+    for name, (req, resp, stream) in _METHODS.items():
+        svc.method.add(
+            name=name,
+            input_type=f".{PACKAGE}.{req}",
+            output_type=f".{PACKAGE}.{resp}",
+            server_streaming=stream,
+        )
+    return fd
+
+
+def _message_classes() -> dict:
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(_file_descriptor())
+    return {
+        n: message_factory.GetMessageClass(pool.FindMessageTypeByName(f"{PACKAGE}.{n}"))
+        for n in _MESSAGES
+    }
+
+
+MESSAGES = _message_classes()
+
+
+def render_proto() -> str:
+    """Texto do .proto equivalente ao descriptor (para clientes em outras linguagens)."""
+    lines = [
+        "// src/api/proto/scoring.proto — gerado por "
+        "`python -m src.api.grpc_server --print-proto`",
+        'syntax = "proto3";',
+        "",
+        f"package {PACKAGE};",
+        "",
+        f"service {SERVICE.rsplit('.', 1)[-1]} {{",
+    ]
+    for name, (req, resp, stream) in _METHODS.items():
+        lines.append(f"  rpc {name}({req}) returns ({'stream ' if stream else ''}{resp});")
+    lines.append("}")
+    for msg_name, fields in _MESSAGES.items():
+        lines += ["", f"message {msg_name} {{"]
+        for name, number, spec, *doc in fields:
+            lines.append(f"  {spec} {name} = {number};" + (f"  // {doc[0]}" if doc else ""))
+        lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+# =========================
+# Conversões
+# =========================
+def _score_frame(items) -> pd.DataFrame:
+    return pd.DataFrame(
+        {f: [getattr(it, f) for it in items] for f in codecs.SCORE_FIELDS},
+        columns=codecs.SCORE_FIELDS,
+        dtype=object,
+    )
+
+
+def _rank_request(req) -> codecs.RankBatch:
+    cands = pd.DataFrame(
+        {f: [getattr(c, f) for c in req.candidates] for f in codecs.CANDIDATE_FIELDS},
+        columns=codecs.CANDIDATE_FIELDS,
+        dtype=object,
+    )
+    use_thr = req.use_threshold if req.HasField("use_threshold") else True
+    job = {f: getattr(req, f) for f in codecs.JOB_FIELDS}
+    return codecs.RankBatch(job, req.k or None, use_thr, cands)
+
+
+def _rank_items(res: api.RankResult, start: int = 0, stop: int = None) -> list:
+    RankItem = MESSAGES["RankItem"]
+    # após o filtro (ou sem threshold) todos os itens devolvidos passam
+    return [
+        RankItem(id=i or "", name=nm or "", score=float(s), pass_by_threshold=True)
+        for i, nm, s in zip(res.ids[start:stop], res.names[start:stop], res.scores[start:stop])
+    ]
+
+
+# =========================
+# Servicer
+# =========================
+def _status_for(e: Exception) -> grpc.StatusCode:
+    """Erro de entrada (validação/valor, 4xx do núcleo) -> INVALID_ARGUMENT; resto INTERNAL."""
+    if isinstance(e, HTTPException):
+        if e.status_code == 503:
+            return grpc.StatusCode.UNAVAILABLE
+        if 400 <= e.status_code < 500:
+            return grpc.StatusCode.INVALID_ARGUMENT
+        return grpc.StatusCode.INTERNAL
+    # pydantic.ValidationError também é ValueError
+    if isinstance(e, (ValueError, RequestValidationError, msgspec.ValidationError)):
+        return grpc.StatusCode.INVALID_ARGUMENT
+    return grpc.StatusCode.INTERNAL
+
+
+@contextmanager
+def _observed(method: str, request, context):
+    """Contexto da chamada para o núcleo de `main` + métricas/span como no middleware HTTP.
+
+    Contagem e latência vão para `dm_grpc_*` (status gRPC); tamanho, CPU e
+    candidatos usam os histogramas da API com o caminho do método.
+    """
+    path = f"/{SERVICE}/{method}"
+    start = time.perf_counter()
+    ctx: dict = {"t0_ns": time.time_ns()}
+    token = api._request_ctx.set(ctx)
+    status = "OK"
+    usage = None
+    try:
+        attrs = {"rpc.system": "grpc", "rpc.method": method}
+        with tracing.span(f"grpc {path}", **attrs) as root:
+            if api._accounting:
+                with account() as usage:
+                    yield ctx
+            else:
+                yield ctx
+    except Exception as e:
+        code = _status_for(e)
+        status = code.name
+        detail = e.detail if isinstance(e, HTTPException) else e
+        context.abort(code, f"falha em {method}: {detail}")
+    finally:
+        api._request_ctx.reset(token)
+        try:
+            GRPC_LATENCY.labels(method=method).observe(time.perf_counter() - start)
+            GRPC_REQUESTS.labels(method=method, code=status).inc()
+            BODY_BYTES.labels(endpoint=path).observe(request.ByteSize())
+            if usage is not None:
+                REQUEST_CPU.labels(endpoint=path).observe(usage.cpu_seconds)
+            if "rows" in ctx:
+                CANDIDATES.labels(endpoint=path).observe(ctx["rows"])
+                TEXT_CHARS.labels(endpoint=path).observe(ctx.get("text_chars", 0))
+            tracing.set_attributes(root, **{"rpc.grpc.status_code": status})
+            version = ctx.get("model_version", api._model_version)
+            context.set_trailing_metadata((("x-model-version", version),))
+        except Exception:
+            # nunca quebre a chamada por falha de métrica
+            pass
+
+
+class ScoringServicer:
+    """Implementação dos métodos sobre o núcleo de score da API."""
+
+    def __init__(self, stream_chunk: int = 500):
+        self.stream_chunk = max(1, int(stream_chunk))
+
+    def Score(self, request, context):
+        with _observed("Score", request, context):
+            s, thr = api._score_single(_score_frame([request]))
+            return MESSAGES["ScoreResponse"](
+                score=s, pass_by_threshold=s >= thr, threshold_used=thr
+            )
+
+    def ScoreBatch(self, request, context):
+        with _observed("ScoreBatch", request, context):
+            out = MESSAGES["ScoreBatchResponse"]()
+            if not request.items:
+                return out
+            scores, thr = api._score_batch_frame(_score_frame(request.items))
+            Resp = MESSAGES["ScoreResponse"]
+            out.items.extend(
+                Resp(score=float(s), pass_by_threshold=bool(s >= thr), threshold_used=thr)
+                for s in scores
+            )
+            return out
+
+    def RankCandidates(self, request, context):
+        with _observed("RankCandidates", request, context):
+            res = api._rank_batch(_rank_request(request))
+            return MESSAGES["RankResponse"](
+                items=_rank_items(res), used_k=len(res.ids), threshold_used=res.threshold_used
+            )
+
+    def RankCandidatesStream(self, request, context):
+        # com a cascata, o ranking "completo" é a shortlist (só ela tem score do modelo)
+        with _observed("RankCandidatesStream", request, context):
+            res = api._rank_batch(_rank_request(request), k_all=True)
+            Chunk = MESSAGES["RankChunk"]
+            for i in range(0, len(res.ids), self.stream_chunk):
+                yield Chunk(
+                    items=_rank_items(res, i, i + self.stream_chunk),
+                    offset=i,
+                    threshold_used=res.threshold_used,
+                )
+
+
+def _generic_handler(servicer: ScoringServicer):
+    handlers = {}
+    for name, (req, resp, stream) in _METHODS.items():
+        if stream:
+            factory = grpc.unary_stream_rpc_method_handler
+        else:
+            factory = grpc.unary_unary_rpc_method_handler
+        handlers[name] = factory(
+            getattr(servicer, name),
+            request_deserializer=MESSAGES[req].FromString,
+            response_serializer=MESSAGES[resp].SerializeToString,
+        )
+    return grpc.method_handlers_generic_handler(SERVICE, handlers)
+
+
+def _channel_options() -> list:
+    max_bytes = int(api._env_float("GRPC_MAX_MESSAGE_MB", 64.0) * 1024 * 1024)
+    return [
+        ("grpc.max_receive_message_length", max_bytes),
+        ("grpc.max_send_message_length", max_bytes),
+    ]
+
+
+def start_server(port: int, host: str = None, max_workers: int = None) -> Tuple[grpc.Server, int]:
+    """Sobe o servidor (já iniciado) e devolve (server, porta); porta 0 escolhe uma livre.
+
+    Com vários workers do uvicorn cada um sobe o seu na mesma porta
+    (SO_REUSEPORT, padrão do gRPC no Linux) e o kernel distribui as conexões.
+    """
+    host = host or os.getenv("GRPC_HOST", "0.0.0.0")
+    workers = max_workers or int(api._env_float("GRPC_WORKERS", 8))
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=workers), options=_channel_options()
+    )
+    server.add_generic_rpc_handlers(
+        (_generic_handler(ScoringServicer(int(api._env_float("GRPC_STREAM_CHUNK", 500)))),)
+    )
+    bound = server.add_insecure_port(f"{host}:{port}")
+    server.start()
+    return server, bound
+
+
+# =========================
+# Cliente
+# =========================
+class ScoringStub:
+    """Stub do cliente (equivalente ao gerado pelo protoc)."""
+
+    def __init__(self, channel: grpc.Channel):
+        for name, (req, resp, stream) in _METHODS.items():
+            factory = channel.unary_stream if stream else channel.unary_unary
+            setattr(self, name, factory(
+                f"/{SERVICE}/{name}",
+                request_serializer=MESSAGES[req].SerializeToString,
+                response_deserializer=MESSAGES[resp].FromString,
+            ))
+
+
+def channel(target: str) -> grpc.Channel:
+    """Canal inseguro com os mesmos limites de mensagem do servidor."""
+    return grpc.insecure_channel(target, options=_channel_options())
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Servidor gRPC de score (sem HTTP)")
+    ap.add_argument("--port", type=int, default=int(os.getenv("GRPC_PORT", "50051") or 50051))
+    ap.add_argument("--print-proto", action="store_true", help="imprime o .proto e sai")
+    args = ap.parse_args(argv)
+    if args.print_proto:
+        print(render_proto(), end="")
+        return
+    # mesmo ciclo de vida da API (modelo, monitoramento, watcher); o gRPC sobe no _startup
+    os.environ["GRPC_PORT"] = str(args.port)
+    api._startup()
+    print(f"gRPC {SERVICE} em {os.getenv('GRPC_HOST', '0.0.0.0')}:{args.port}", flush=True)
+    try:
+        api._grpc_server.wait_for_termination()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api._shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,57 @@
 # src/api/main.py
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional, List
+from typing import NamedTuple, Optional, Tuple
 
 import csv
+import functools
+import hashlib
+import hmac
 import json
+import logging
 import os
+import random
+import threading
 import time
+from contextvars import ContextVar
 
 import joblib
 import numpy as np
 import pandas as pd
-from fastapi import FastAPI, Response
+from fastapi import Depends, FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST
 from starlette.requests import Request
-from starlette.responses import Response as StarletteResponse
-
-from .metrics import REQUESTS, LATENCY
+from starlette.responses import PlainTextResponse, Response as StarletteResponse
+
+from .cache import ResultCache, result_key
+from ..modeling.cascade import merge_cascade_scores, shortlist
+from ..monitoring.ringlog import RingWriter, make_records
+from ..monitoring.sketches import SketchRecorder
+from ..monitoring.text_stats import OOVTracker, TEXT_FEATURES, staged_parts, text_stats
+from .metrics import (
+    REQUESTS,
+    LATENCY,
+    BODY_BYTES,
+    CANDIDATES,
+    TEXT_CHARS,
+    CACHE_HITS,
+    CACHE_MISSES,
+    RELOADS,
+    MONITOR_SINK_ERRORS,
+    REQUEST_ALLOC,
+    REQUEST_CPU,
+    mark_dead,
+    metrics_payload,
+)
+from . import codecs, tracing
+from .accounting import account, server_timing
+from .profiler import profile_in_thread
+from .reload import ArtifactWatcher
+from .stages import maybe_stage, start_timer, timed_column_transform
 from .schemas import (
     ScoreRequest,
     ScoreResponse,
-    RankCandidatesRequest,
     RankResponse,
     RankItem,
 )
@@ -29,54 +59,292 @@ from .schemas import (
 # =========================
 # Paths, Globals & Config
 # =========================
+_log = logging.getLogger(__name__)
+
 ROOT = Path(__file__).resolve().parents[2]
 MODEL_PATH = ROOT / "models" / "artifacts" / "model.joblib"
 META_PATH = ROOT / "models" / "artifacts" / "metadata.json"
+# 1º estágio da cascata (word TF-IDF), gerado com TRAIN_CASCADE=true
+STAGE1_PATH = ROOT / "models" / "artifacts" / "model_stage1.joblib"
 
 # Diretório para logs de monitoramento (montado via Docker)
 MONITORING_DIR = os.getenv("MONITORING_DIR", "/monitoring")
 LOG_FILE = os.path.join(MONITORING_DIR, "requests_log.csv")
+RING_FILE = os.path.join(MONITORING_DIR, "requests.ring")
+LOG_COLUMNS = ["ts", "endpoint", "cv_len", "job_len", "score"] + TEXT_FEATURES
 
 _model: Optional[object] = None
+_model_version: str = "none"
 _threshold_topk: float = 0.5
 _target_k: int = 5
+_stage1_model: Optional[object] = None
+
+
+class ModelState(NamedTuple):
+    model: Optional[object]
+    version: str
+    threshold_topk: float
+    target_k: int
+    stage1: Optional[object] = None
+
+# modelo/threshold/target_k/versão são trocados juntos sob este lock (hot reload)
+_state_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_watcher: Optional[ArtifactWatcher] = None
+_grpc_server: Optional[object] = None
+
+# dados por requisição preenchidos pelos endpoints e lidos pelo middleware
+_request_ctx: ContextVar[Optional[dict]] = ContextVar("dm_request_ctx", default=None)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except Exception:
+        return default
+
+
+# Cache de resultados (vetor de scores por requisição); 0 desativa
+_result_cache = ResultCache(
+    max_bytes=int(_env_float("RESULT_CACHE_MAX_MB", 64.0) * 1024 * 1024),
+    ttl_seconds=_env_float("RESULT_CACHE_TTL_SECONDS", 300.0),
+)
+
+# Tracing (TRACING=off|jsonl|memory|otlp); desligado por padrão
+tracing.setup()
+
+# Custo por requisição: CPU da thread (sempre) e pico de alocação (fração amostrada)
+_accounting = os.getenv("REQUEST_ACCOUNTING", "true").strip().lower() not in ("0", "false", "no")
+_alloc_sample = _env_float("ALLOC_SAMPLE_RATE", 0.01)
+
+# Fração das chamadas de _score_df com tempo por etapa (0 desativa)
+_stage_sample = _env_float("STAGE_TIMING_SAMPLE", 0.05)
+
+# Fração das requisições com taxa de OOV e tokens não vistos medidos
+_oov_sample = _env_float("OOV_SAMPLE_RATE", 0.1)
+# Linhas re-tokenizadas para o OOV numa requisição amostrada (lotes grandes)
+_oov_max_rows = int(_env_float("OOV_SAMPLE_ROWS", 32))
+
+# Cascata: só os top-M do 1º estágio passam pela pipeline completa (0 desativa)
+_cascade_top_m = int(_env_float("CASCADE_TOP_M", 200))
+
+# Linha fictícia usada para aquecer um modelo recém-carregado antes da troca
+_WARMUP_DF = pd.DataFrame(
+    {
+        "cv_pt": ["desenvolvedor python sql docker"],
+        "principais_atividades": ["construir apis rest"],
+        "competencias": ["python; fastapi"],
+        "observacoes": [""],
+        "titulo_vaga": ["backend python"],
+    }
+)
 
 
 # =========================
 # Helpers internos
 # =========================
-def _score_df(df: pd.DataFrame) -> np.ndarray:
-    """Retorna scores [0,1] para um DataFrame no formato da pipeline."""
-    global _model
-    if _model is None:
+def _snapshot() -> ModelState:
+    """Estado consistente (modelo, versão, threshold, target_k) para uma requisição."""
+    with _state_lock:
+        state = ModelState(_model, _model_version, _threshold_topk, _target_k, _stage1_model)
+    ctx = _request_ctx.get()
+    if ctx is not None:
+        ctx["model_version"] = state.version
+    return state
+
+
+def _score_df(
+    df: pd.DataFrame, model: Optional[object] = None, oov: bool = True, stats: bool = True
+) -> np.ndarray:
+    """Retorna scores [0,1] para um DataFrame no formato da pipeline.
+
+    `oov=False` registra só o nnz (1º estágio da cascata: o OOV sai do 2º);
+    `stats=False` não registra nada (aquecimento com a linha fictícia).
+    """
+    if model is None:
+        model = _model
+    if model is None:
         return np.zeros(len(df), dtype=float)
 
     df = df.copy().fillna("")
-    last = _model[-1]
-    if hasattr(last, "predict_proba"):
-        s = _model.predict_proba(df)[:, 1]
-    elif hasattr(last, "decision_function"):
-        dfu = _model.decision_function(df)
-        s = (dfu - dfu.min()) / (dfu.max() - dfu.min() + 1e-9)
-    else:
-        s = _model.predict(df).astype(float)
+    last = model[-1]
+    est, X = model, df
+    timer = start_timer(len(df), _stage_sample)
+    parts = staged_parts(model)
+    if parts is not None:
+        # etapas à mão para aproveitar a matriz CSR nas estatísticas de vocabulário
+        concat, ct, est = parts
+        with maybe_stage(timer, "concat"):
+            text = concat.transform(df)
+        X = ct.transform(text) if timer is None else timed_column_transform(ct, text, timer)
+        if stats:
+            with maybe_stage(timer, "text_stats"):
+                _record_text_stats(df.index, ct, X, text["text_concat"], oov=oov)
+    # sem as etapas separadas, a pipeline inteira é medida como "pipeline"
+    with maybe_stage(timer, "predict" if parts is not None else "pipeline"):
+        if hasattr(last, "predict_proba"):
+            s = est.predict_proba(X)[:, 1]
+        elif hasattr(last, "decision_function"):
+            dfu = est.decision_function(X)
+            s = (dfu - dfu.min()) / (dfu.max() - dfu.min() + 1e-9)
+        else:
+            s = est.predict(X).astype(float)
+    if timer is not None:
+        timer.observe()
 
     return np.clip(s, 0.0, 1.0)
 
 
-def load_model():
-    """Carrega modelo/metadata e aplica overrides de ambiente."""
-    global _model, _threshold_topk, _target_k
+_oov: Optional[OOVTracker] = None
+
+
+def _oov_tracker() -> Optional[OOVTracker]:
+    global _oov
+    if _oov is None and MONITORING_DIR:
+        _oov = OOVTracker(Path(MONITORING_DIR))
+    return _oov
+
+
+def _record_text_stats(index, ct, X, texts: pd.Series, oov: bool = True):
+    """Guarda nnz (sempre) e OOV (requisições amostradas) no contexto da requisição."""
+    ctx = _request_ctx.get()
+    if ctx is None:
+        return
+    try:
+        if oov and "oov_sampled" not in ctx:
+            ctx["oov_sampled"] = random.random() < _oov_sample
+        sampled = oov and ctx["oov_sampled"]
+        stats, unseen = text_stats(
+            ct, X, texts if sampled else None, index=index, max_rows=_oov_max_rows
+        )
+        prev = ctx.get("text_stats")
+        # cascata: o 2º estágio (word+char) completa/sobrepõe o 1º (só word)
+        ctx["text_stats"] = stats if prev is None else stats.combine_first(prev)
+        tracker = _oov_tracker() if unseen else None
+        if tracker is not None:
+            tracker.update(unseen)
+    except Exception:
+        pass
+
+
+def _record_payload_size(df: pd.DataFrame, span=None):
+    """Linhas e caracteres de texto da requisição, lidos pelo middleware (e no span)."""
+    ctx = _request_ctx.get()
+    if ctx is None:
+        return
+    try:
+        ctx["rows"] = len(df)
+        ctx["text_chars"] = int(
+            sum(df[c].str.len().sum() for c in df.columns if df[c].dtype == object)
+        )
+        tracing.set_attributes(span, rows=ctx["rows"], text_chars=ctx["text_chars"])
+    except Exception:
+        pass
+
 
+def _accounted(fn):
+    """Mede CPU/alocação do endpoint (na thread que o executa) para o middleware."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        ctx = _request_ctx.get()
+        if not _accounting or ctx is None:
+            return fn(*args, **kwargs)
+        with account(alloc=random.random() < _alloc_sample) as usage:
+            ctx["usage"] = usage
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _trace_parse():
+    """Span do parse/validação do corpo: do início do middleware até o endpoint."""
+    ctx = _request_ctx.get()
+    if ctx is not None and tracing.enabled():
+        tracing.record_span("request.parse", ctx["t0_ns"], time.time_ns())
+
+
+def _text_stats_rows(index) -> list:
+    """[word_nnz, char_nnz, oov_rate] por linha do índice ("" quando indisponível)."""
+    ctx = _request_ctx.get() or {}
+    stats = ctx.get("text_stats")
+    if stats is None:
+        return [["", "", ""] for _ in range(len(index))]
+    vals = stats.reindex(index)[TEXT_FEATURES].to_numpy(dtype=float)
+    return [["" if np.isnan(v) else round(float(v), 4) for v in row] for row in vals]
+
+
+def _cascade_score_df(df: pd.DataFrame, state: ModelState) -> Tuple[np.ndarray, np.ndarray]:
+    """1º estágio em todos os candidatos; pipeline completa só nos top-M.
+
+    Devolve (scores, máscara das linhas com score da pipeline completa). Fora da
+    shortlist o valor só ordena a cauda (ver `merge_cascade_scores`).
+    """
+    m = _cascade_top_m
+    if state.stage1 is None or state.model is None or m <= 0 or len(df) <= m:
+        return _score_df(df, state.model), np.ones(len(df), dtype=bool)
+    s1 = _score_df(df, state.stage1, oov=False)
+    idx = shortlist(s1, m)
+    full = _score_df(df.iloc[idx], state.model)
+    mask = np.zeros(len(df), dtype=bool)
+    mask[idx] = True
+    return merge_cascade_scores(s1, idx, full), mask
+
+
+def _cached(endpoint: str, Xdf: pd.DataFrame, state: ModelState, score_fn) -> np.ndarray:
+    """Resultado de `score_fn(Xdf)`, reaproveitando o cache quando os textos já foram vistos."""
+    if not _result_cache.enabled:
+        return score_fn(Xdf)
+    key = result_key(endpoint, state.version, Xdf)
+    scores = _result_cache.get(key)
+    if scores is not None:
+        CACHE_HITS.labels(endpoint=endpoint).inc()
+        return scores
+    CACHE_MISSES.labels(endpoint=endpoint).inc()
+    scores = score_fn(Xdf)
+    _result_cache.put(key, scores)
+    return scores
+
+
+def _cached_scores(endpoint: str, Xdf: pd.DataFrame, state: ModelState) -> np.ndarray:
+    """Scores da pipeline completa (com cache)."""
+    return _cached(endpoint, Xdf, state, lambda df: _score_df(df, state.model))
+
+
+def _cached_cascade_scores(
+    endpoint: str, Xdf: pd.DataFrame, state: ModelState
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(scores, máscara de score completo) da cascata; o cache guarda os dois empilhados."""
+    out = _cached(endpoint, Xdf, state, lambda df: np.vstack(_cascade_score_df(df, state)))
+    return np.asarray(out[0], dtype=float), np.asarray(out[1]).astype(bool)
+
+
+def _file_fingerprint(path: Path) -> str:
+    """Versão derivada de tamanho+mtime do arquivo (barata; sem ler o conteúdo)."""
+    st = path.stat()
+    return hashlib.sha1(f"{st.st_size}:{st.st_mtime_ns}".encode("utf-8")).hexdigest()[:12]
+
+
+def _load_artifacts(
+    model, version: str, threshold_topk: float, target_k: int, stage1=None
+) -> ModelState:
+    """Lê model.joblib/metadata.json + overrides de ambiente a partir do estado atual.
+
+    Não altera o estado global; devolve o novo ModelState.
+    """
     if MODEL_PATH.exists():
-        _model = joblib.load(MODEL_PATH)
+        model = joblib.load(MODEL_PATH)
+        version = _file_fingerprint(MODEL_PATH)
+        # o 1º estágio só vale junto do modelo com que foi treinado
+        stage1 = joblib.load(STAGE1_PATH) if STAGE1_PATH.exists() else None
 
     if META_PATH.exists():
         try:
             meta = json.loads(META_PATH.read_text(encoding="utf-8"))
+            if meta.get("model_version") and model is not None:
+                version = str(meta["model_version"])
             rk = meta.get("ranking", {})
-            _threshold_topk = float(rk.get("threshold_topk", _threshold_topk))
-            _target_k = int(rk.get("target_k", _target_k))
+            threshold_topk = float(rk.get("threshold_topk", threshold_topk))
+            target_k = int(rk.get("target_k", target_k))
         except Exception:
             # metadata inválida: mantém defaults/overrides
             pass
@@ -85,17 +353,83 @@ def load_model():
     env_thr = os.getenv("THRESHOLD_TOPK")
     if env_thr:
         try:
-            _threshold_topk = float(env_thr)
+            threshold_topk = float(env_thr)
         except Exception:
             pass
 
     env_k = os.getenv("TARGET_K")
     if env_k:
         try:
-            _target_k = int(env_k)
+            target_k = int(env_k)
         except Exception:
             pass
 
+    return ModelState(model, version, threshold_topk, target_k, stage1)
+
+
+def _swap_state(model, version: str, threshold_topk: float, target_k: int, stage1=None):
+    global _model, _model_version, _threshold_topk, _target_k, _stage1_model
+    with _state_lock:
+        _model, _model_version, _threshold_topk, _target_k, _stage1_model = (
+            model, version, threshold_topk, target_k, stage1
+        )
+    # scores de um modelo anterior não valem mais
+    _result_cache.clear()
+
+
+def load_model():
+    """Carrega modelo/metadata e aplica overrides de ambiente."""
+    _swap_state(*_load_artifacts(*_snapshot()))
+
+
+def reload_model() -> bool:
+    """Carrega e aquece o novo modelo fora do lock e só então troca o estado.
+
+    O modelo antigo segue servindo até a troca. Retorna False se já houver um
+    reload em andamento ou se a carga falhar (o estado atual é mantido).
+    """
+    if not _reload_lock.acquire(blocking=False):
+        return False
+    try:
+        state = _load_artifacts(*_snapshot())
+        for m in (state.model, state.stage1):
+            if m is not None:
+                _score_df(_WARMUP_DF, m, stats=False)
+        _swap_state(*state)
+        RELOADS.labels(status="ok").inc()
+        return True
+    except Exception:
+        RELOADS.labels(status="error").inc()
+        return False
+    finally:
+        _reload_lock.release()
+
+
+def _require_admin(x_admin_token: Optional[str]):
+    """Rotas administrativas exigem ADMIN_TOKEN; sem ele configurado ficam desligadas."""
+    expected = os.getenv("ADMIN_TOKEN", "")
+    if not expected:
+        raise HTTPException(status_code=403, detail="admin desativado (ADMIN_TOKEN vazio)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=401, detail="token inválido")
+
+
+def _monitor_sink() -> str:
+    """Destino do log de requisições: csv (padrão), ring ou both."""
+    sink = os.getenv("MONITOR_SINK", "csv").strip().lower()
+    return sink if sink in ("csv", "ring", "both") else "csv"
+
+
+def _rotate_stale_log():
+    """Log com header antigo (outras colunas) é renomeado; o novo começa limpo."""
+    try:
+        with open(LOG_FILE, "r", encoding="utf-8") as f:
+            header = f.readline().strip().split(",")
+    except OSError:
+        return
+    if header != LOG_COLUMNS:
+        os.replace(LOG_FILE, f"{LOG_FILE[:-4]}.{int(time.time())}.csv")
+
 
 def _init_monitoring():
     """Garante diretório/arquivo de log para drift."""
@@ -103,39 +437,278 @@ def _init_monitoring():
         return
     try:
         os.makedirs(MONITORING_DIR, exist_ok=True)
-        if not os.path.exists(LOG_FILE):
+        if _monitor_sink() != "ring":
+            _rotate_stale_log()
+        if _monitor_sink() != "ring" and not os.path.exists(LOG_FILE):
             with open(LOG_FILE, "w", newline="", encoding="utf-8") as f:
                 w = csv.writer(f)
-                w.writerow(["ts", "endpoint", "cv_len", "job_len", "score"])
+                w.writerow(LOG_COLUMNS)
     except Exception:
         # não bloqueia o app se não conseguir criar diretório/arquivo
         pass
 
 
+_sketches: Optional[SketchRecorder] = None
+_sketches_lock = threading.Lock()
+
+
+def _sketch_recorder() -> Optional[SketchRecorder]:
+    """Recorder de sketches por minuto (SKETCH_FLUSH_SECONDS=0 desativa).
+
+    Criado no startup (ou na primeira requisição, sob lock); grava numa thread própria.
+    """
+    global _sketches
+    if _sketches is None and MONITORING_DIR:
+        with _sketches_lock:
+            flush = _env_float("SKETCH_FLUSH_SECONDS", 10.0)
+            if _sketches is None and flush > 0:
+                rec = SketchRecorder(Path(MONITORING_DIR) / "sketches", flush_seconds=flush)
+                rec.start()
+                _sketches = rec
+    return _sketches
+
+
+_ring: Optional[RingWriter] = None
+_ring_failed = False
+
+
+def _ring_writer() -> Optional[RingWriter]:
+    """Ring buffer mmap compartilhado com o drift service (criado sob demanda)."""
+    global _ring, _ring_failed
+    if _ring is None and not _ring_failed:
+        try:
+            capacity = int(_env_float("MONITOR_RING_CAPACITY", 1_000_000))
+            _ring = RingWriter(Path(RING_FILE), capacity=capacity)
+        except Exception:
+            # arquivo incompatível/sem permissão: não insiste a cada requisição
+            _ring_failed = True
+            MONITOR_SINK_ERRORS.labels(sink="ring", stage="open").inc()
+            _log.warning(
+                "ring log %s indisponível; sink ring desativado neste worker",
+                RING_FILE,
+                exc_info=True,
+            )
+    return _ring
+
+
 def _append_monitor_rows(rows):
-    """Anexa linhas no CSV de monitoramento; falhas são silenciosas."""
+    """Anexa linhas no log de monitoramento (CSV e/ou ring); falhas são silenciosas."""
     if not MONITORING_DIR:
         return
+    sink = _monitor_sink()
+    with tracing.span("monitor.write", rows=len(rows), sink=sink):
+        _write_monitor_rows(rows, sink)
+
+
+def _write_monitor_rows(rows, sink: str):
+    try:
+        rec = _sketch_recorder()
+        if rec is not None and rows:
+            cols = list(zip(*rows))
+            rec.update({
+                name: [v for v in cols[i] if v != ""]
+                for i, name in enumerate(LOG_COLUMNS) if i >= 2 and i < len(cols)
+            })
+    except Exception:
+        pass
+    if sink in ("ring", "both"):
+        try:
+            ring = _ring_writer()
+            if ring is not None and rows:
+                ctx = _request_ctx.get()
+                version = (ctx or {}).get("model_version", _model_version)
+                ring.append(make_records(rows, version))
+        except Exception:
+            MONITOR_SINK_ERRORS.labels(sink="ring", stage="write").inc()
+    if sink == "ring":
+        return
     try:
         with open(LOG_FILE, "a", newline="", encoding="utf-8") as f:
             w = csv.writer(f)
             for r in rows:
                 w.writerow(r)
+    except Exception:
+        MONITOR_SINK_ERRORS.labels(sink="csv", stage="write").inc()
+
+
+# =========================
+# Núcleo de score (HTTP e gRPC)
+# =========================
+class RankResult(NamedTuple):
+    """Top-K já ordenado (ids/nomes/scores) e o threshold do estado usado."""
+    ids: list
+    names: list
+    scores: np.ndarray
+    threshold_used: float
+
+
+def _score_single(Xdf: pd.DataFrame) -> Tuple[float, float]:
+    """Score de uma linha (sem cache) + log de drift; devolve (score, threshold)."""
+    with tracing.span("features.build") as sp:
+        Xdf = Xdf.fillna("")
+        _record_payload_size(Xdf, sp)
+    state = _snapshot()
+    thr = state.threshold_topk
+    score_val = float(_score_df(Xdf, state.model)[0])
+
+    # ===== Log leve para drift (sem PII) =====
+    try:
+        row = Xdf.iloc[0]
+        cv_len = len(row["cv_pt"] or "")
+        job_len = len(
+            " ".join(
+                [
+                    row["principais_atividades"] or "",
+                    row["competencias"] or "",
+                    row["observacoes"] or "",
+                    row["titulo_vaga"] or "",
+                ]
+            )
+        )
+        _append_monitor_rows(
+            [[time.time(), "/score", cv_len, job_len, score_val] + _text_stats_rows(Xdf.index)[0]]
+        )
+    except Exception:
+        pass
+    return score_val, thr
+
+
+def _score_batch_frame(Xdf: pd.DataFrame) -> Tuple[np.ndarray, float]:
+    """Scores do lote (com cache de resultados); devolve (scores, threshold)."""
+    with tracing.span("features.build") as sp:
+        _record_payload_size(Xdf, sp)
+    state = _snapshot()
+    scores = np.asarray(_cached_scores("/score-batch", Xdf, state), dtype=float)
+    return scores, state.threshold_topk
+
+
+def _join_job(job_val: str, col: pd.Series) -> pd.Series:
+    """" ".join(filter(None, [job, candidato])) em colunas."""
+    if not job_val:
+        return col
+    return (job_val + " " + col).where(col != "", job_val)
+
+
+def _rank_batch(req: codecs.RankBatch, k_all: bool = False) -> RankResult:
+    """Ranqueia os candidatos do pedido (threshold opcional e top-K).
+
+    `k` ausente ou <= 0 usa o TARGET_K; com `k_all` (streaming) devolve todos.
+    Com a cascata ativa a resposta fica limitada à shortlist (CASCADE_TOP_M): a
+    cauda só tem um valor de ordenação, não um score do modelo.
+    """
+    with tracing.span("features.build") as sp:
+        # uma linha por candidato, repetindo o contexto da vaga
+        cands, job = req.candidates, req.job
+        ids, names = cands["id"].to_numpy(), cands["name"].to_numpy()
+        n = len(cands)
+        Xdf = pd.DataFrame(
+            {
+                "cv_pt": cands["cv_pt"],
+                "principais_atividades": [job["principais_atividades"]] * n,
+                # combina competências/observações do job com as do candidato
+                "competencias": _join_job(job["competencias"], cands["competencias"]),
+                "observacoes": _join_job(job["observacoes"], cands["observacoes"]),
+                "titulo_vaga": [job["titulo_vaga"]] * n,
+            },
+            index=pd.RangeIndex(n),
+            dtype=object,
+        ).fillna("")
+        _record_payload_size(Xdf, sp)
+    state = _snapshot()
+    thr = state.threshold_topk
+    scores, full_mask = _cached_cascade_scores("/rank-candidates", Xdf, state)
+
+    # ===== Log leve para drift (sem PII) — 1 linha por candidato com score completo =====
+    # (a cauda da cascata só tem um valor de ordenação, não um score do modelo)
+    try:
+        job_txt = (
+            Xdf["principais_atividades"].astype(str)
+            + " "
+            + Xdf["competencias"].astype(str)
+            + " "
+            + Xdf["observacoes"].astype(str)
+            + " "
+            + Xdf["titulo_vaga"].astype(str)
+        )
+        ts = time.time()
+        cv_lens = Xdf["cv_pt"].astype(str).str.len().tolist()
+        job_lens = job_txt.str.len().tolist()
+        text_rows = _text_stats_rows(Xdf.index)
+        to_log = [
+            [ts, "/rank-candidates", cv_lens[i], job_lens[i], float(scores[i])] + text_rows[i]
+            for i in np.flatnonzero(full_mask)
+        ]
+        if to_log:
+            _append_monitor_rows(to_log)
     except Exception:
         pass
 
+    with tracing.span("rank.topk", candidates=len(scores)) as sp:
+        # ordena por score desc (estável); aplica threshold (se pedido), depois corta em K
+        order = np.argsort(-scores, kind="stable")
+        # só scores da pipeline completa saem na resposta e vão ao threshold
+        order = order[full_mask[order]]
+        if req.use_threshold:
+            order = order[scores[order] >= thr]
+        k_target = req.k if (req.k and req.k > 0) else (None if k_all else state.target_k)
+        if k_target is not None:
+            order = order[:k_target]
+        k_span = k_target if k_target is not None else len(order)
+        tracing.set_attributes(sp, k=k_span, returned=len(order))
+
+    return RankResult(
+        ids=[str(ids[i]) if ids[i] is not None else None for i in order],
+        names=[str(names[i]) if names[i] is not None else None for i in order],
+        scores=scores[order],
+        threshold_used=thr,
+    )
+
 
 # =========================
 # App factory (lifespan)
 # =========================
+def _startup():
+    """Carga do modelo, monitoramento, watcher de artefatos e gRPC (GRPC_PORT)."""
+    global _watcher, _grpc_server
+    load_model()
+    _init_monitoring()
+    _sketch_recorder()
+    watch_secs = _env_float("MODEL_WATCH_SECONDS", 0.0)
+    if watch_secs > 0:
+        _watcher = ArtifactWatcher([MODEL_PATH, META_PATH, STAGE1_PATH], watch_secs, reload_model)
+        _watcher.start()
+    grpc_port = int(_env_float("GRPC_PORT", 0))
+    if grpc_port > 0:
+        # mesmo processo: o gRPC usa o modelo/thresholds deste worker
+        from .grpc_server import start_server
+
+        _grpc_server, _ = start_server(grpc_port)
+
+
+def _shutdown():
+    global _watcher, _grpc_server, _sketches
+    if _grpc_server is not None:
+        _grpc_server.stop(grace=5).wait()
+        _grpc_server = None
+    if _watcher is not None:
+        _watcher.stop()
+        _watcher = None
+    if _sketches is not None:
+        _sketches.stop()
+        _sketches = None
+    if _oov is not None:
+        _oov.flush()
+    tracing.flush()
+    # modo multiprocess: gauges "live" deste worker deixam de contar
+    mark_dead(os.getpid())
+
+
 def _build_app() -> FastAPI:
     @asynccontextmanager
     async def lifespan(app: FastAPI):
-        # Inicialização
-        load_model()
-        _init_monitoring()
+        _startup()
         yield
-        # Finalização: nada por enquanto
+        _shutdown()
 
     app = FastAPI(title="Decision Match API", version="0.3.3", lifespan=lifespan)
     app.add_middleware(
@@ -156,21 +729,54 @@ app = _build_app()
 @app.middleware("http")
 async def metrics_and_access_log(request: Request, call_next):
     start = time.perf_counter()
-    path = request.url.path
     method = request.method
     status_code = 500
-    try:
-        response: StarletteResponse = await call_next(request)
-        status_code = response.status_code
-        return response
-    finally:
-        dur = time.perf_counter() - start
+    ctx: dict = {"t0_ns": time.time_ns()}
+    _request_ctx.set(ctx)
+    # span raiz: os spans dos endpoints (threadpool) herdam o contexto
+    with tracing.span("http.request", **{"http.method": method}) as root:
         try:
-            LATENCY.labels(endpoint=path).observe(dur)
-            REQUESTS.labels(endpoint=path, method=method, status=str(status_code)).inc()
-        except Exception:
-            # nunca quebre a requisição por falha de métrica
-            pass
+            response: StarletteResponse = await call_next(request)
+            status_code = response.status_code
+            # versão que efetivamente atendeu (ou a atual, p/ rotas sem modelo)
+            response.headers["X-Model-Version"] = ctx.get("model_version", _model_version)
+            if "usage" in ctx:
+                response.headers["Server-Timing"] = server_timing(
+                    time.perf_counter() - start, ctx["usage"]
+                )
+            return response
+        finally:
+            dur = time.perf_counter() - start
+            try:
+                # template da rota (FastAPI grava em scope["route"]): cardinalidade limitada
+                route = request.scope.get("route")
+                path = getattr(route, "path", None) or "unmatched"
+                LATENCY.labels(endpoint=path).observe(dur)
+                REQUESTS.labels(endpoint=path, method=method, status=str(status_code)).inc()
+                size = request.headers.get("content-length")
+                if size and size.isdigit():
+                    BODY_BYTES.labels(endpoint=path).observe(int(size))
+                usage = ctx.get("usage")
+                if usage is not None:
+                    REQUEST_CPU.labels(endpoint=path).observe(usage.cpu_seconds)
+                    if usage.peak_bytes is not None:
+                        REQUEST_ALLOC.labels(endpoint=path).observe(usage.peak_bytes)
+                if "rows" in ctx:
+                    CANDIDATES.labels(endpoint=path).observe(ctx["rows"])
+                    TEXT_CHARS.labels(endpoint=path).observe(ctx.get("text_chars", 0))
+                if root is not None:
+                    root.update_name(f"{method} {path}")
+                    tracing.set_attributes(
+                        root,
+                        **{
+                            "http.route": path,
+                            "http.status_code": status_code,
+                            "request.body_bytes": int(size or 0),
+                        },
+                    )
+            except Exception:
+                # nunca quebre a requisição por falha de métrica
+                pass
 
 
 # =========================
@@ -178,81 +784,114 @@ async def metrics_and_access_log(request: Request, call_next):
 # =========================
 @app.get("/health")
 def health():
+    state = _snapshot()
     return {
         "status": "ok",
-        "model_loaded": _model is not None,
-        "threshold_topk": _threshold_topk,
-        "target_k": _target_k,
+        "model_loaded": state.model is not None,
+        "model_version": state.version,
+        "cascade_enabled": state.stage1 is not None and _cascade_top_m > 0,
+        "reloading": _reload_lock.locked(),
+        "threshold_topk": state.threshold_topk,
+        "target_k": state.target_k,
     }
 
 
 @app.get("/config")
 def config():
-    return {"threshold_topk": _threshold_topk, "target_k": _target_k}
+    state = _snapshot()
+    return {"threshold_topk": state.threshold_topk, "target_k": state.target_k}
+
+
+@app.post("/admin/reload", status_code=202)
+def admin_reload(wait: bool = False, x_admin_token: Optional[str] = Header(default=None)):
+    """Recarrega model.joblib/metadata.json sem derrubar requisições em andamento."""
+    _require_admin(x_admin_token)
+    if _reload_lock.locked():
+        raise HTTPException(status_code=409, detail="reload já em andamento")
+    if wait:
+        if not reload_model():
+            raise HTTPException(status_code=500, detail="falha no reload; modelo anterior mantido")
+        return {"status": "reloaded", "model_version": _snapshot().version}
+    threading.Thread(target=reload_model, name="model-reload", daemon=True).start()
+    return {"status": "reloading", "model_version": _snapshot().version}
+
+
+@app.get("/debug/profile", response_class=PlainTextResponse)
+async def debug_profile(
+    seconds: float = 10.0,
+    format: str = "collapsed",
+    interval_ms: float = 5.0,
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """Amostra as pilhas de todas as threads deste worker por `seconds` (admin).
+
+    A espera roda numa thread própria: o profile não prende uma thread do
+    threadpool que atende os endpoints síncronos.
+    """
+    _require_admin(x_admin_token)
+    if format not in ("collapsed", "pstats"):
+        raise HTTPException(status_code=400, detail="format deve ser collapsed ou pstats")
+    max_secs = _env_float("PROFILE_MAX_SECONDS", 60.0)
+    if not 0 < seconds <= max_secs:
+        raise HTTPException(status_code=400, detail=f"seconds deve estar em (0, {max_secs:g}]")
+    sampler = await profile_in_thread(seconds, interval=interval_ms / 1000.0)
+    if sampler is None:
+        raise HTTPException(status_code=409, detail="profile já em andamento")
+    return sampler.collapsed() if format == "collapsed" else sampler.pstats()
 
 
 @app.get("/metrics")
 def metrics():
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    return Response(metrics_payload(), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.post("/score", response_model=ScoreResponse)
+@_accounted
 def score(payload: ScoreRequest):
-    Xdf = pd.DataFrame(
-        {
-            "cv_pt": [payload.cv_pt or ""],
-            "principais_atividades": [payload.principais_atividades or ""],
-            "competencias": [payload.competencias or ""],
-            "observacoes": [payload.observacoes or ""],
-            "titulo_vaga": [payload.titulo_vaga or ""],
-        }
-    ).fillna("")
-    score_val = float(_score_df(Xdf)[0])
-
-    # ===== Log leve para drift (sem PII) =====
-    try:
-        cv_len = len(payload.cv_pt or "")
-        job_len = len(
-            " ".join(
-                [
-                    payload.principais_atividades or "",
-                    payload.competencias or "",
-                    payload.observacoes or "",
-                    payload.titulo_vaga or "",
-                ]
-            )
-        )
-        _append_monitor_rows([[time.time(), "/score", cv_len, job_len, score_val]])
-    except Exception:
-        pass
-
+    _trace_parse()
+    Xdf = pd.DataFrame({f: [getattr(payload, f) or ""] for f in codecs.SCORE_FIELDS})
+    score_val, thr = _score_single(Xdf)
     return ScoreResponse(
         score=score_val,
-        pass_by_threshold=score_val >= _threshold_topk,
-        threshold_used=_threshold_topk,
+        pass_by_threshold=score_val >= thr,
+        threshold_used=thr,
     )
 
 
-@app.post("/score-batch")
-def score_batch(payload: List[ScoreRequest]):
-    """Retorna lista simples de {score, pass_by_threshold, threshold_used}."""
-    rows = []
-    for p in payload:
-        rows.append(
-            {
-                "cv_pt": p.cv_pt or "",
-                "principais_atividades": p.principais_atividades or "",
-                "competencias": p.competencias or "",
-                "observacoes": p.observacoes or "",
-                "titulo_vaga": p.titulo_vaga or "",
-            }
+async def _raw_body(request: Request) -> bytes:
+    """Corpo cru: os endpoints em lote decodificam conforme o Content-Type."""
+    return await request.body()
+
+
+@app.post("/score-batch", openapi_extra=codecs.SCORE_BATCH_OPENAPI)
+@_accounted
+def score_batch(
+    body: bytes = Depends(_raw_body),
+    content_type: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None),
+):
+    """Retorna lista simples de {score, pass_by_threshold, threshold_used}.
+
+    Aceita/devolve JSON (padrão), MessagePack ou Arrow IPC (ver `codecs`).
+    """
+    out_fmt = codecs.response_format(accept)
+    Xdf = codecs.decode_score_batch(body, codecs.request_format(content_type))
+    _trace_parse()
+    if Xdf.empty:
+        return [] if out_fmt == codecs.JSON else codecs.encode_columns(
+            {"score": [], "pass_by_threshold": [], "threshold_used": []}, out_fmt
         )
-    if not rows:
-        return []
-    Xdf = pd.DataFrame(rows).fillna("")
-    scores = _score_df(Xdf)
-    thr = _threshold_topk
+    scores, thr = _score_batch_frame(Xdf)
 
+    if out_fmt != codecs.JSON:
+        return codecs.encode_columns(
+            {
+                "score": scores,
+                "pass_by_threshold": scores >= thr,
+                "threshold_used": np.full(len(scores), thr),
+            },
+            out_fmt,
+        )
     out = []
     for s in scores:
         s = float(s)
@@ -266,80 +905,39 @@ def score_batch(payload: List[ScoreRequest]):
     return out
 
 
-@app.post("/rank-candidates", response_model=RankResponse)
-def rank_candidates(payload: RankCandidatesRequest):
-    """Ranqueia candidatos para uma vaga, aplicando threshold opcional e top-K."""
-    # monta uma linha por candidato, repetindo o contexto da vaga
-    rows = []
-    ids, names = [], []
-    for c in payload.candidates:
-        ids.append(c.id)
-        names.append(c.name)
-        rows.append(
+@app.post("/rank-candidates", response_model=RankResponse, openapi_extra=codecs.RANK_OPENAPI)
+@_accounted
+def rank_candidates(
+    body: bytes = Depends(_raw_body),
+    content_type: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None),
+):
+    """Ranqueia candidatos para uma vaga, aplicando threshold opcional e top-K.
+
+    Aceita/devolve JSON (padrão), MessagePack ou Arrow IPC (ver `codecs`).
+    """
+    out_fmt = codecs.response_format(accept)
+    req = codecs.decode_rank(body, codecs.request_format(content_type))
+    _trace_parse()
+    res = _rank_batch(req)
+
+    # após o filtro (ou sem threshold) todos os itens devolvidos passam
+    if out_fmt != codecs.JSON:
+        return codecs.encode_columns(
             {
-                "cv_pt": c.cv_pt or "",
-                "principais_atividades": payload.principais_atividades or "",
-                # combina competências/observações do job com as do candidato
-                "competencias": " ".join(
-                    filter(None, [payload.competencias or "", c.competencias or ""])
-                ),
-                "observacoes": " ".join(
-                    filter(None, [payload.observacoes or "", c.observacoes or ""])
-                ),
-                "titulo_vaga": payload.titulo_vaga or "",
-            }
-        )
-
-    Xdf = pd.DataFrame(rows).fillna("")
-    scores = _score_df(Xdf)
-
-    # ===== Log leve para drift (sem PII) — 1 linha por candidato =====
-    try:
-        job_txt = (
-            Xdf["principais_atividades"].astype(str)
-            + " "
-            + Xdf["competencias"].astype(str)
-            + " "
-            + Xdf["observacoes"].astype(str)
-            + " "
-            + Xdf["titulo_vaga"].astype(str)
+                "id": res.ids,
+                "name": res.names,
+                "score": res.scores,
+                "pass_by_threshold": np.ones(len(res.ids), dtype=bool),
+            },
+            out_fmt,
+            meta={"used_k": len(res.ids), "threshold_used": res.threshold_used},
         )
-        ts = time.time()
-        to_log = []
-        for i in range(len(Xdf)):
-            cv_len_i = len(str(Xdf.iloc[i]["cv_pt"]))
-            job_len_i = len(str(job_txt.iloc[i]))
-            to_log.append([ts, "/rank-candidates", cv_len_i, job_len_i, float(scores[i])])
-        if to_log:
-            _append_monitor_rows(to_log)
-    except Exception:
-        pass
-
-    # ordena por score desc
-    order = np.argsort(-scores)
-    k_target = payload.k if (payload.k and payload.k > 0) else _target_k
-
-    # aplica threshold (se pedido), depois corta em K
-    items_all = []
-    thr = _threshold_topk
-    use_thr = bool(payload.use_threshold)
-    for idx in order:
-        s = float(scores[idx])
-        pass_thr = s >= thr if use_thr else True
-        items_all.append(
-            RankItem(
-                id=str(ids[idx]) if ids[idx] is not None else None,
-                name=str(names[idx]) if names[idx] is not None else None,
-                score=s,
-                pass_by_threshold=pass_thr,
-            )
-        )
-
-    if use_thr:
-        items_all = [it for it in items_all if it.pass_by_threshold]
-
-    items = items_all[:k_target]
-    return RankResponse(items=items, used_k=len(items), threshold_used=thr)
+    items = [
+        RankItem(id=i, name=nm, score=float(s), pass_by_threshold=True)
+        for i, nm, s in zip(res.ids, res.names, res.scores)
+    ]
+    return RankResponse(items=items, used_k=len(items), threshold_used=res.threshold_used)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,164 @@
 # src/api/metrics.py
-from prometheus_client import Counter, Histogram
+"""Métricas Prometheus da API.
 
+Com vários workers (uvicorn --workers / `python -m src.api.serve`), defina
+`PROMETHEUS_MULTIPROC_DIR` *antes* de subir os processos: cada worker grava
+seus valores em arquivos mmap nesse diretório e o `/metrics` agrega todos no
+scrape (`MultiProcessCollector`). O diretório precisa ser limpo a cada
+inicialização (o `serve.py` faz isso).
+"""
+import os
+import re
+from pathlib import Path
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.getenv("prometheus_multiproc_dir")
+
+# `endpoint` é o template da rota (ex.: "/score"); caminhos sem rota viram "unmatched"
 REQUESTS = Counter(
     "dm_api_requests_total", "Total API requests", ["endpoint", "method", "status"]
 )
 
+# buckets finos em 1–50 ms (faixa do /score) e largos para lotes/rankings grandes
+_LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.0075, 0.01, 0.015, 0.02, 0.03, 0.04, 0.05,
+    0.075, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
 LATENCY = Histogram(
-    "dm_api_latency_seconds", "API latency seconds", ["endpoint"]
+    "dm_api_latency_seconds", "API latency seconds", ["endpoint"], buckets=_LATENCY_BUCKETS
+)
+
+# gRPC (src/api/grpc_server.py) em séries próprias: `code` é o status gRPC
+# (OK, INVALID_ARGUMENT, ...), não HTTP, e não deve cair em alertas status=~"5.."
+GRPC_REQUESTS = Counter(
+    "dm_grpc_requests_total", "Total gRPC calls", ["method", "code"]
+)
+GRPC_LATENCY = Histogram(
+    "dm_grpc_latency_seconds", "gRPC call latency seconds", ["method"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+# Tamanho das requisições (para ajustar latência x carga)
+CANDIDATES = Histogram(
+    "dm_api_candidates_per_request", "Rows scored per request", ["endpoint"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 200, 500, 1000, 2000, 5000, 10000),
+)
+BODY_BYTES = Histogram(
+    "dm_api_request_body_bytes", "Request body size (Content-Length)", ["endpoint"],
+    buckets=tuple(256 * 4 ** i for i in range(10)),  # 256 B .. 64 MiB
+)
+TEXT_CHARS = Histogram(
+    "dm_api_text_chars", "Text characters scored per request", ["endpoint"],
+    buckets=tuple(1000 * 4 ** i for i in range(10)),  # 1k .. 262M
+)
+
+# Cache de resultados (hit rate = hits / (hits + misses))
+CACHE_HITS = Counter(
+    "dm_api_result_cache_hits_total", "Result cache hits", ["endpoint"]
+)
+CACHE_MISSES = Counter(
+    "dm_api_result_cache_misses_total", "Result cache misses", ["endpoint"]
+)
+CACHE_EVICTIONS = Counter(
+    "dm_api_result_cache_evictions_total", "Result cache evictions", ["reason"]
+)
+# cada worker tem o próprio cache: soma dos processos vivos
+CACHE_BYTES = Gauge(
+    "dm_api_result_cache_bytes", "Estimated memory held by the result cache",
+    multiprocess_mode="livesum",
+)
+
+# Custo por requisição (ver src/api/accounting.py)
+REQUEST_CPU = Histogram(
+    "dm_api_request_cpu_seconds", "Thread CPU time per request", ["endpoint"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+REQUEST_ALLOC = Histogram(
+    "dm_api_request_alloc_peak_bytes", "Peak traced allocation per sampled request", ["endpoint"],
+    buckets=tuple(64 * 1024 * 4 ** i for i in range(10)),  # 64 KiB .. 16 GiB
 )
+
+# Tempo por etapa da inferência (amostrado; ver src/api/stages.py)
+STAGE_LATENCY = Histogram(
+    "dm_api_stage_seconds", "Inference stage latency seconds", ["stage", "rows"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+# Hot reload do modelo
+RELOADS = Counter(
+    "dm_api_model_reloads_total", "Model reload attempts", ["status"]
+)
+
+# Falhas ao gravar o log de monitoramento (a requisição segue normalmente)
+MONITOR_SINK_ERRORS = Counter(
+    "dm_api_monitor_sink_errors_total", "Monitoring sink write/open failures", ["sink", "stage"]
+)
+
+
+# =========================
+# Multiprocess
+# =========================
+_LIVE_FILE_RE = re.compile(r"^gauge_live\w*_(\d+)\.db$")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def mark_dead(pid: int):
+    """Descarta os gauges "live" de um worker encerrado (no-op fora do modo multiprocess)."""
+    if not MULTIPROC_DIR:
+        return
+    try:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid, MULTIPROC_DIR)
+    except Exception:
+        pass
+
+
+def reap_dead_workers() -> int:
+    """Limpa gauges "live" de workers que morreram sem shutdown (ex.: OOM kill).
+
+    Contadores/histogramas de workers mortos continuam somando: são monotônicos
+    e o Prometheus espera que não diminuam.
+    """
+    if not MULTIPROC_DIR:
+        return 0
+    dead = set()
+    try:
+        for p in Path(MULTIPROC_DIR).iterdir():
+            m = _LIVE_FILE_RE.match(p.name)
+            if m and not _pid_alive(int(m.group(1))):
+                dead.add(int(m.group(1)))
+    except OSError:
+        return 0
+    for pid in dead:
+        mark_dead(pid)
+    return len(dead)
+
+
+def metrics_payload() -> bytes:
+    """Texto do /metrics: registry do processo ou agregado de todos os workers."""
+    if not MULTIPROC_DIR:
+        return generate_latest()
+    from prometheus_client import multiprocess
+
+    reap_dead_workers()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=MULTIPROC_DIR)
+    return generate_latest(registry)
+
@@ -0,0 +1,130 @@
+# src/api/profiler.py
+"""Profiler por amostragem de pilhas para a API em execução.
+
+Uma thread lê `sys._current_frames()` a cada `interval` segundos e conta as
+pilhas de todas as threads do worker (exceto a própria e a que pediu o
+profile). Custo: proporcional ao número de threads, só enquanto o profile roda.
+
+Saídas:
+- `collapsed`: uma linha por pilha, `thread;frame;frame... N` — entrada do
+  flamegraph.pl / speedscope.
+- `pstats`: tabela por função no estilo do `pstats` (amostras próprias e
+  acumuladas, em vez de chamadas/tempo de CPU).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+Frame = Tuple[str, str, int]  # (arquivo, função, linha da definição)
+
+# um profile por vez por worker
+_busy = threading.Lock()
+
+
+def _frame_key(frame) -> Frame:
+    code = frame.f_code
+    return code.co_filename, code.co_name, code.co_firstlineno
+
+
+def _label(f: Frame) -> str:
+    return f"{f[1]} ({os.path.basename(f[0])}:{f[2]})"
+
+
+class StackSampler:
+    def __init__(self, interval: float = 0.005, exclude: Optional[set] = None):
+        self.interval = max(0.001, float(interval))
+        self.exclude = set(exclude or ())
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+
+    def _sample(self, names: Dict[int, str]):
+        for tid, frame in sys._current_frames().items():
+            if tid in self.exclude:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_key(frame))
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[(names.get(tid, str(tid)), tuple(stack))] += 1
+        self.samples += 1
+
+    def run(self, seconds: float) -> "StackSampler":
+        """Amostra por `seconds` na thread atual (que também fica excluída)."""
+        self.exclude.add(threading.get_ident())
+        start = time.perf_counter()
+        deadline = start + float(seconds)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            names = {t.ident: t.name for t in threading.enumerate()}
+            self._sample(names)
+            time.sleep(min(self.interval, max(0.0, deadline - time.perf_counter())))
+        self.elapsed = time.perf_counter() - start
+        return self
+
+    def collapsed(self) -> str:
+        lines = [
+            ";".join([thread] + [_label(f) for f in stack]) + f" {n}"
+            for (thread, stack), n in self.stacks.most_common()
+        ]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def pstats(self, limit: int = 60) -> str:
+        own: Counter = Counter()
+        cum: Counter = Counter()
+        for (_, stack), n in self.stacks.items():
+            if stack:
+                own[stack[-1]] += n
+            # recursão conta uma vez por pilha no acumulado
+            for f in set(stack):
+                cum[f] += n
+        total = sum(self.stacks.values()) or 1
+        out = [
+            f"{self.samples} amostras em {self.elapsed:.2f}s (intervalo {self.interval * 1000:.1f} ms)",
+            "",
+            f"{'own':>8} {'own%':>6} {'cum':>8} {'cum%':>6}  função (arquivo:linha)",
+        ]
+        for f, c in cum.most_common(limit):
+            o = own.get(f, 0)
+            out.append(f"{o:>8} {100 * o / total:>5.1f}% {c:>8} {100 * c / total:>5.1f}%  {_label(f)}")
+        return "\n".join(out) + "\n"
+
+
+def profile(
+    seconds: float, interval: float = 0.005, exclude: Optional[set] = None
+) -> Optional[StackSampler]:
+    """Roda um profile; None se já houver outro em andamento neste worker."""
+    if not _busy.acquire(blocking=False):
+        return None
+    try:
+        return StackSampler(interval, exclude).run(seconds)
+    finally:
+        _busy.release()
+
+
+async def profile_in_thread(
+    seconds: float, interval: float = 0.005, exclude: Optional[set] = None
+) -> Optional[StackSampler]:
+    """`profile` numa thread dedicada: não ocupa o event loop nem o threadpool da API."""
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+
+    def _run():
+        try:
+            result = profile(seconds, interval, exclude)
+        except BaseException as e:  # pragma: no cover - repassado ao await
+            loop.call_soon_threadsafe(done.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(done.set_result, result)
+
+    threading.Thread(target=_run, name="debug-profile", daemon=True).start()
+    return await done
@@ -0,0 +1,64 @@
+# src/api/reload.py
+"""Observa os artefatos do modelo e dispara o hot reload quando mudam."""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+
+def _stat_key(paths: Sequence[Path]) -> Tuple:
+    out = []
+    for p in paths:
+        try:
+            st = Path(p).stat()
+            out.append((st.st_size, st.st_mtime_ns))
+        except OSError:
+            out.append(None)
+    return tuple(out)
+
+
+class ArtifactWatcher:
+    """Polling de tamanho/mtime; só dispara quando a mudança fica estável.
+
+    Exigir duas leituras iguais seguidas evita recarregar um model.joblib
+    ainda sendo copiado para o diretório.
+    """
+
+    def __init__(self, paths: List[Path], interval: float, on_change: Callable[[], bool]):
+        self.paths = list(paths)
+        self.interval = float(interval)
+        self.on_change = on_change
+        self._applied = _stat_key(self.paths)
+        self._pending: Optional[Tuple] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll(self):
+        """Uma iteração do watcher (exposta para testes)."""
+        current = _stat_key(self.paths)
+        if current == self._applied:
+            self._pending = None
+            return
+        if current != self._pending:
+            self._pending = current
+            return
+        if self.on_change():
+            self._applied = current
+        self._pending = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                pass
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="artifact-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
@@ -0,0 +1,45 @@
+# src/api/serve.py
+"""Sobe a API com N workers e métricas Prometheus agregadas entre eles.
+
+Uso:
+    API_WORKERS=4 python -m src.api.serve
+
+Com mais de um worker, `PROMETHEUS_MULTIPROC_DIR` é definido (padrão
+`/tmp/dm_prometheus`) e limpo antes de criar os processos — arquivos de uma
+execução anterior somariam contadores antigos.
+"""
+import os
+from pathlib import Path
+
+
+def prepare_multiproc_dir(path: Path):
+    """Recria o diretório de métricas multiprocess (só apaga os *.db do Prometheus)."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for p in path.glob("*.db"):
+        try:
+            p.unlink()
+        except OSError:
+            pass
+
+
+def main():
+    workers = int(os.getenv("API_WORKERS", os.getenv("WEB_CONCURRENCY", "1")))
+    if workers > 1:
+        mp_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/dm_prometheus")
+        prepare_multiproc_dir(Path(mp_dir))
+    elif os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        prepare_multiproc_dir(Path(os.environ["PROMETHEUS_MULTIPROC_DIR"]))
+
+    import uvicorn
+
+    uvicorn.run(
+        "src.api.main:app",
+        host=os.getenv("API_HOST", "0.0.0.0"),
+        port=int(os.getenv("API_PORT", "8000")),
+        workers=workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
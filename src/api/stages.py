@@ -0,0 +1,96 @@
+# src/api/stages.py
+"""Tempo por etapa da inferência (TextConcat, cada vetorizador, classificador).
+
+Instrumentação amostrada: só uma fração das chamadas de `_score_df`
+(`STAGE_TIMING_SAMPLE`) é cronometrada; nas demais o custo é um `random()`.
+Nas amostradas o ColumnTransformer é executado transformador a transformador
+(mesmo resultado de `ct.transform`) para separar word e char TF-IDF.
+Com tracing ligado, toda chamada gera um span `model.<etapa>` por etapa (o
+histograma continua amostrado).
+"""
+from __future__ import annotations
+
+import random
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from . import tracing
+from .metrics import STAGE_LATENCY
+
+# faixas de linhas por chamada (rótulo de baixa cardinalidade)
+_ROW_BUCKETS = [(1, "1"), (10, "2-10"), (50, "11-50"), (200, "51-200"), (1000, "201-1000")]
+
+
+def rows_label(n: int) -> str:
+    for limit, label in _ROW_BUCKETS:
+        if n <= limit:
+            return label
+    return ">1000"
+
+
+class StageTimer:
+    """Acumula (etapa, segundos) de uma chamada e publica tudo no fim."""
+
+    def __init__(self, rows: int, metrics: bool = True):
+        self.n = rows
+        self.rows = rows_label(rows)
+        self.metrics = metrics
+        self.stages: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        with tracing.span(f"model.{name}", rows=self.n):
+            t0 = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.stages.append((name, time.perf_counter() - t0))
+
+    def observe(self):
+        if not self.metrics:
+            return
+        try:
+            for name, dt in self.stages:
+                STAGE_LATENCY.labels(stage=name, rows=self.rows).observe(dt)
+        except Exception:
+            pass
+
+
+def start_timer(rows: int, rate: float) -> Optional[StageTimer]:
+    """Timer para esta chamada, ou None se ela não foi sorteada (nem há tracing)."""
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        # só spans, sem alimentar o histograma
+        return StageTimer(rows, metrics=False) if tracing.enabled() else None
+    return StageTimer(rows)
+
+
+@contextmanager
+def maybe_stage(timer: Optional[StageTimer], name: str):
+    if timer is None:
+        yield
+    else:
+        with timer.stage(name):
+            yield
+
+
+def timed_column_transform(ct, X, timer: StageTimer):
+    """Equivalente a `ct.transform(X)`, cronometrando cada transformador.
+
+    Com `remainder="passthrough"` (ou transformador "passthrough") cai no
+    `ct.transform` inteiro, medido como uma etapa só.
+    """
+    steps = [(n, t, c) for n, t, c in ct.transformers_ if not (isinstance(t, str) and t == "drop")]
+    if any(isinstance(t, str) for _, t, _ in steps):
+        with timer.stage("vectorize"):
+            return ct.transform(X)
+    blocks = []
+    for name, trans, cols in steps:
+        with timer.stage(name):
+            blocks.append(trans.transform(X[cols]))
+    if ct.sparse_output_:
+        return sp.hstack(blocks).tocsr()
+    return np.hstack([b.toarray() if sp.issparse(b) else np.asarray(b) for b in blocks])
@@ -0,0 +1,167 @@
+# src/api/tracing.py
+"""Tracing (OpenTelemetry) das etapas da API, com exportação local.
+
+`TRACING`:
+- `off` (padrão): `span()` devolve um contexto nulo compartilhado (custo ~zero);
+- `jsonl`: um span por linha em `TRACING_FILE` (padrão `MONITORING_DIR/traces.jsonl`),
+  para análise offline (pandas/duckdb) sem coletor externo;
+- `memory`: coletor em processo (`finished_spans()`), útil em testes/benchmarks;
+- `otlp`: exportador OTLP/HTTP (`OTEL_EXPORTER_OTLP_ENDPOINT` etc.).
+
+Sem o SDK instalado, qualquer modo vira `off`.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List, Optional
+
+try:  # dependência opcional
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        SimpleSpanProcessor,
+        SpanExporter,
+        SpanExportResult,
+    )
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+except ImportError:  # pragma: no cover
+    TracerProvider = None
+    SpanExporter = object
+
+_NOOP = nullcontext()
+
+_provider = None
+_tracer = None
+_memory = None
+mode = "off"
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Grava cada span como uma linha JSON (append, thread-safe)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def to_dict(span) -> dict:
+        ctx = span.get_span_context()
+        return {
+            "name": span.name,
+            "trace_id": format(ctx.trace_id, "032x"),
+            "span_id": format(ctx.span_id, "016x"),
+            "parent_id": format(span.parent.span_id, "016x") if span.parent else None,
+            "start_ns": span.start_time,
+            "end_ns": span.end_time,
+            "duration_ms": (span.end_time - span.start_time) / 1e6,
+            "status": span.status.status_code.name,
+            "attributes": dict(span.attributes or {}),
+        }
+
+    def export(self, spans):
+        try:
+            lines = "".join(json.dumps(self.to_dict(s), ensure_ascii=False) + "\n" for s in spans)
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+            return SpanExportResult.SUCCESS
+        except Exception:
+            return SpanExportResult.FAILURE
+
+    def shutdown(self):
+        pass
+
+
+def setup(requested: Optional[str] = None, path: Optional[Path] = None) -> str:
+    """(Re)configura o tracing; devolve o modo efetivo."""
+    global _provider, _tracer, _memory, mode
+    shutdown()
+    requested = (requested or os.getenv("TRACING", "off")).strip().lower()
+    if requested not in ("jsonl", "memory", "otlp") or TracerProvider is None:
+        mode = "off"
+        return mode
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "dm-api")})
+    )
+    if requested == "jsonl":
+        if path is None:
+            path = Path(os.getenv(
+                "TRACING_FILE", os.path.join(os.getenv("MONITORING_DIR", "/monitoring"), "traces.jsonl")
+            ))
+        provider.add_span_processor(BatchSpanProcessor(JsonlSpanExporter(path)))
+    elif requested == "memory":
+        _memory = InMemorySpanExporter()
+        provider.add_span_processor(SimpleSpanProcessor(_memory))
+    else:
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            mode = "off"
+            return mode
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    # provider próprio (não o global), para não interferir em outras libs
+    _provider = provider
+    _tracer = provider.get_tracer("src.api")
+    mode = requested
+    return mode
+
+
+def shutdown():
+    global _provider, _tracer, _memory, mode
+    if _provider is not None:
+        try:
+            _provider.shutdown()
+        except Exception:
+            pass
+    _provider = _tracer = _memory = None
+    mode = "off"
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, **attributes):
+    """Span filho do atual (ou contexto nulo com tracing desligado)."""
+    if _tracer is None:
+        return _NOOP
+    return _tracer.start_as_current_span(name, attributes=attributes or None)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes):
+    """Span retroativo (ex.: parse da requisição, medido antes do endpoint)."""
+    if _tracer is None:
+        return
+    s = _tracer.start_span(name, start_time=start_ns, attributes=attributes or None)
+    s.end(end_time=end_ns)
+
+
+def set_attributes(s, **attributes):
+    if s is not None:
+        try:
+            s.set_attributes(attributes)
+        except Exception:
+            pass
+
+
+def finished_spans() -> List[dict]:
+    """Spans do coletor em memória (modo `memory`), como dicts."""
+    if _memory is None:
+        return []
+    return [JsonlSpanExporter.to_dict(s) for s in _memory.get_finished_spans()]
+
+
+def clear():
+    if _memory is not None:
+        _memory.clear()
+
+
+def flush():
+    if _provider is not None:
+        _provider.force_flush()
@@ -12,6 +12,12 @@ REPORTS_DIR = ROOT_DIR / "models" / "reports"
 
 # Env flags
 USE_EMBEDDINGS = os.getenv("USE_EMBEDDINGS", "false").lower() == "true"
+# Treina também o 1º estágio (word TF-IDF) da cascata de ranking
+TRAIN_CASCADE = os.getenv("TRAIN_CASCADE", "false").lower() == "true"
+# Tamanhos de shortlist avaliados no relatório da cascata
+CASCADE_EVAL_M = [int(x) for x in os.getenv("CASCADE_EVAL_M", "5,10,20,50").split(",") if x.strip()]
+# Compactação pós-treino (poda |coef| < tol + float32); 0 desativa
+COMPACT_TOL = float(os.getenv("COMPACT_TOL", "0") or 0)
 
 # Files
 APPLICANTS_PATH = RAW_DIR / "applicants.json"
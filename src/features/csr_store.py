@@ -0,0 +1,295 @@
+# src/features/csr_store.py
+"""Contêiner CSR em disco, aberto via memmap (zero-copy) por vários workers.
+
+Layout do diretório:
+
+    <root>/header.json          # formato, model_version, vocab_hash, n_cols, segmentos
+    <root>/seg-000001/data.npy  # valores (float32 por padrão)
+    <root>/seg-000001/indices.npy
+    <root>/seg-000001/indptr.npy
+    <root>/seg-000001/ids.npy   # id de cada linha
+
+Novas linhas entram como segmentos; `compact()` funde os segmentos em um só
+(pode rodar em background). Há um único processo escritor por diretório: o
+lock de compactação é só entre threads, não há lock de arquivo. Leitores podem
+ser muitos processos. O header é sempre trocado de forma atômica (os.replace).
+
+Bloco de biblioteca: a API ainda não o usa no caminho de inferência; quem
+pré-computar matrizes de candidatos abre o store com `open_for_model`.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import scipy.sparse as sp
+
+FORMAT_NAME = "dm-csr"
+FORMAT_VERSION = 1
+HEADER_FILE = "header.json"
+_ARRAYS = ("data", "indices", "indptr", "ids")
+
+
+class VocabularyMismatchError(ValueError):
+    """A matriz foi gerada com um vocabulário diferente do modelo carregado."""
+
+
+# =========================
+# Hash de vocabulário
+# =========================
+def _iter_vocabularies(model) -> Iterable[dict]:
+    """Percorre Pipeline/ColumnTransformer e devolve os `vocabulary_` na ordem das features."""
+    if isinstance(model, dict):
+        yield model
+        return
+    if hasattr(model, "vocabulary_"):
+        yield model.vocabulary_
+        return
+    if hasattr(model, "transformers_"):  # ColumnTransformer já ajustado
+        for _, trans, _ in model.transformers_:
+            if trans in ("drop", "passthrough"):
+                continue
+            yield from _iter_vocabularies(trans)
+        return
+    if hasattr(model, "steps"):  # Pipeline
+        for _, step in model.steps:
+            yield from _iter_vocabularies(step)
+
+
+def vocabulary_hash(model) -> str:
+    """sha256 dos vocabulários (termo -> índice) de todos os vetorizadores do modelo.
+
+    Aceita um Pipeline, um ColumnTransformer, um vetorizador ou um dict de vocabulário.
+    """
+    h = hashlib.sha256()
+    for vocab in _iter_vocabularies(model):
+        h.update(f"#{len(vocab)}\n".encode("utf-8"))
+        for term, _ in sorted(vocab.items(), key=lambda kv: kv[1]):
+            h.update(term.encode("utf-8"))
+            h.update(b"\n")
+    return h.hexdigest()
+
+
+# =========================
+# Segmentos
+# =========================
+@dataclass
+class CSRSegment:
+    name: str
+    data: np.ndarray
+    indices: np.ndarray
+    indptr: np.ndarray
+    ids: np.ndarray
+
+    @property
+    def n_rows(self) -> int:
+        return int(len(self.indptr) - 1)
+
+    def to_csr(self, n_cols: int) -> sp.csr_matrix:
+        """csr_matrix apontando para os memmaps (sem cópia)."""
+        return sp.csr_matrix(
+            (self.data, self.indices, self.indptr), shape=(self.n_rows, n_cols), copy=False
+        )
+
+
+def _index_dtype(nnz: int, n_cols: int):
+    # indices e indptr com o mesmo dtype evitam cópia ao montar o csr_matrix
+    return np.int32 if max(nnz, n_cols) < np.iinfo(np.int32).max else np.int64
+
+
+def _write_json_atomic(path: Path, obj: dict):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# =========================
+# Store
+# =========================
+class CSRStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        # uma compactação por vez (background + chamada manual fundiriam os mesmos segmentos)
+        self._compact_lock = threading.Lock()
+
+    # ---- criação/abertura ----
+    @classmethod
+    def create(
+        cls,
+        root: Path,
+        n_cols: int,
+        model_version: str,
+        vocab_hash: str,
+        dtype: str = "float32",
+    ) -> "CSRStore":
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        if (root / HEADER_FILE).exists():
+            raise FileExistsError(f"Já existe um CSRStore em {root}")
+        _write_json_atomic(
+            root / HEADER_FILE,
+            {
+                "format": FORMAT_NAME,
+                "version": FORMAT_VERSION,
+                "model_version": str(model_version),
+                "vocab_hash": str(vocab_hash),
+                "n_cols": int(n_cols),
+                "dtype": np.dtype(dtype).name,
+                "segments": [],
+                "next_segment": 1,
+            },
+        )
+        return cls(root)
+
+    @classmethod
+    def open(cls, root: Path, expected_vocab_hash: Optional[str] = None) -> "CSRStore":
+        """Abre um store existente; recusa se o vocab_hash não bater com o esperado."""
+        store = cls(root)
+        header = store.header
+        if header.get("format") != FORMAT_NAME or int(header.get("version", 0)) != FORMAT_VERSION:
+            raise ValueError(f"Formato desconhecido em {root}: {header.get('format')}")
+        if expected_vocab_hash is not None and header.get("vocab_hash") != expected_vocab_hash:
+            raise VocabularyMismatchError(
+                f"vocab_hash do store ({header.get('vocab_hash')}) difere do modelo "
+                f"carregado ({expected_vocab_hash})"
+            )
+        return store
+
+    # ---- leitura ----
+    @property
+    def header(self) -> dict:
+        return json.loads((self.root / HEADER_FILE).read_text(encoding="utf-8"))
+
+    @property
+    def n_cols(self) -> int:
+        return int(self.header["n_cols"])
+
+    def _load_segment(self, name: str) -> CSRSegment:
+        seg_dir = self.root / name
+        arrays = {a: np.load(seg_dir / f"{a}.npy", mmap_mode="r") for a in _ARRAYS}
+        return CSRSegment(name=name, **arrays)
+
+    def segments(self) -> List[CSRSegment]:
+        """Segmentos atuais mapeados em memória (np.memmap, somente leitura)."""
+        for attempt in range(2):
+            header = self.header
+            try:
+                return [self._load_segment(n) for n in header["segments"]]
+            except FileNotFoundError:
+                # compactação removeu um segmento entre a leitura do header e o mmap
+                if attempt:
+                    raise
+        return []
+
+    def to_csr(self) -> sp.csr_matrix:
+        """Matriz completa. Zero-copy com um único segmento (após compact())."""
+        segs = self.segments()
+        n_cols = self.n_cols
+        if not segs:
+            return sp.csr_matrix((0, n_cols), dtype=np.dtype(self.header["dtype"]))
+        if len(segs) == 1:
+            return segs[0].to_csr(n_cols)
+        return sp.vstack([s.to_csr(n_cols) for s in segs], format="csr")
+
+    def ids(self) -> np.ndarray:
+        segs = self.segments()
+        if len(segs) == 1:
+            return segs[0].ids
+        if not segs:
+            return np.array([], dtype=str)
+        return np.concatenate([s.ids for s in segs])
+
+    def __len__(self) -> int:
+        return sum(s.n_rows for s in self.segments())
+
+    # ---- escrita ----
+    def _write_segment(self, name: str, matrix: sp.csr_matrix, ids: np.ndarray, dtype: str):
+        idx_dtype = _index_dtype(matrix.nnz, matrix.shape[1])
+        tmp_dir = self.root / f"{name}.tmp"
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+        np.save(tmp_dir / "data.npy", np.asarray(matrix.data, dtype=dtype))
+        np.save(tmp_dir / "indices.npy", np.asarray(matrix.indices, dtype=idx_dtype))
+        np.save(tmp_dir / "indptr.npy", np.asarray(matrix.indptr, dtype=idx_dtype))
+        np.save(tmp_dir / "ids.npy", ids)
+        os.replace(tmp_dir, self.root / name)
+
+    def append(self, matrix, ids: Sequence) -> str:
+        """Grava as linhas como um novo segmento e o publica no header."""
+        matrix = sp.csr_matrix(matrix)
+        matrix.sort_indices()
+        ids = np.asarray([str(i) for i in ids], dtype=str)
+        if matrix.shape[0] != len(ids):
+            raise ValueError(f"{matrix.shape[0]} linhas para {len(ids)} ids")
+        with self._lock:
+            header = self.header
+            if matrix.shape[1] != int(header["n_cols"]):
+                raise ValueError(f"n_cols={matrix.shape[1]}, esperado {header['n_cols']}")
+            name = f"seg-{int(header['next_segment']):06d}"
+            self._write_segment(name, matrix, ids, header["dtype"])
+            header["segments"].append(name)
+            header["next_segment"] = int(header["next_segment"]) + 1
+            _write_json_atomic(self.root / HEADER_FILE, header)
+        return name
+
+    def compact(self) -> Optional[str]:
+        """Funde os segmentos atuais em um só. Appends concorrentes são preservados.
+
+        Compactações concorrentes no mesmo processo são serializadas; se ao publicar
+        algum segmento fundido já não estiver no header, a compactação é descartada.
+        """
+        with self._compact_lock:
+            return self._compact()
+
+    def _compact(self) -> Optional[str]:
+        with self._lock:
+            header = self.header
+            merged = list(header["segments"])
+            if len(merged) < 2:
+                return None
+            name = f"seg-{int(header['next_segment']):06d}"
+            header["next_segment"] = int(header["next_segment"]) + 1
+            _write_json_atomic(self.root / HEADER_FILE, header)
+            dtype = header["dtype"]
+
+        # a parte cara roda fora do lock de escrita
+        segs = [self._load_segment(n) for n in merged]
+        n_cols = int(header["n_cols"])
+        matrix = sp.vstack([s.to_csr(n_cols) for s in segs], format="csr")
+        ids = np.concatenate([s.ids for s in segs])
+        self._write_segment(name, matrix, ids, dtype)
+        del segs
+
+        with self._lock:
+            header = self.header
+            if not set(merged).issubset(header["segments"]):
+                # outro escritor mexeu nesses segmentos: publicar duplicaria linhas
+                shutil.rmtree(self.root / name, ignore_errors=True)
+                return None
+            rest = [n for n in header["segments"] if n not in merged]
+            header["segments"] = [name] + rest
+            _write_json_atomic(self.root / HEADER_FILE, header)
+
+        for old in merged:
+            # leitores com mmap aberto seguem válidos (POSIX); no Windows pode falhar
+            shutil.rmtree(self.root / old, ignore_errors=True)
+        return name
+
+    def compact_in_background(self) -> threading.Thread:
+        t = threading.Thread(target=self.compact, name="csr-compact", daemon=True)
+        t.start()
+        return t
+
+
+def open_for_model(root: Path, model) -> CSRStore:
+    """Abre o store validando contra o vocabulário do modelo carregado."""
+    return CSRStore.open(root, expected_vocab_hash=vocabulary_hash(model))
@@ -0,0 +1,74 @@
+# src/modeling/cascade.py
+"""Cascata de dois estágios: modelo barato (word TF-IDF) filtra, pipeline completa re-scora o top-M.
+
+Quem não entra na shortlist recebe um valor em [0, piso), com piso = menor score
+completo da shortlist: `piso * percentil(score do 1º estágio)` dentro da cauda.
+Assim a ordem final respeita o corte e a ordem do 1º estágio na cauda, sem
+empates artificiais. Esses valores só ordenam; não são probabilidades calibradas
+(a API não os compara com o threshold nem os grava no log de drift).
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def shortlist(stage1_scores: np.ndarray, m: int) -> np.ndarray:
+    """Índices dos M maiores scores do 1º estágio (ordem arbitrária)."""
+    s = np.asarray(stage1_scores, dtype=float)
+    if m >= len(s):
+        return np.arange(len(s))
+    return np.argpartition(-s, m - 1)[:m]
+
+
+def _tail_rank(stage1_tail: np.ndarray) -> np.ndarray:
+    """Percentil de cada item na cauda, em (0, 1); empates do 1º estágio ficam empatados."""
+    ranks = pd.Series(stage1_tail).rank(method="average").to_numpy()
+    return ranks / (len(stage1_tail) + 1)
+
+
+def merge_cascade_scores(
+    stage1_scores: np.ndarray, idx: np.ndarray, full_scores: np.ndarray
+) -> np.ndarray:
+    """Vetor final: score completo na shortlist; cauda reescalada abaixo do piso."""
+    s1 = np.asarray(stage1_scores, dtype=float)
+    full = np.asarray(full_scores, dtype=float)
+    if len(idx) == 0:
+        return s1.copy()
+    tail = np.ones(len(s1), dtype=bool)
+    tail[idx] = False
+    out = np.empty(len(s1), dtype=float)
+    floor = max(float(full.min()), 0.0)
+    out[tail] = floor * _tail_rank(s1[tail])
+    out[idx] = full
+    return np.clip(out, 0.0, 1.0)
+
+
+def cascade_by_group(
+    stage1_scores: np.ndarray, full_scores: np.ndarray, groups: np.ndarray, m: int
+) -> np.ndarray:
+    """Simula a cascata por vaga (grupo) a partir dos dois vetores já calculados.
+
+    Usado na validação: o resultado pode ir direto para ndcg_at_k & cia.
+    """
+    s1 = pd.Series(np.asarray(stage1_scores, dtype=float))
+    full = pd.Series(np.asarray(full_scores, dtype=float))
+    g = pd.Series(np.asarray(groups))
+    keep = s1.groupby(g, sort=False).rank(ascending=False, method="first") <= m
+    floor = full.where(keep).groupby(g, sort=False).transform("min").clip(lower=0.0)
+    # percentil do 1º estágio dentro da cauda de cada vaga, em (0, 1)
+    tail_s1 = s1.where(~keep)
+    pct = tail_s1.groupby(g, sort=False).rank(method="average") / (
+        (~keep).groupby(g, sort=False).transform("sum") + 1
+    )
+    tail = (floor * pct).to_numpy()
+    return np.clip(np.where(keep, full, tail), 0.0, 1.0)
+
+
+def shortlist_mask_by_group(stage1_scores: np.ndarray, groups: np.ndarray, m: int) -> np.ndarray:
+    """Máscara booleana das linhas que seriam re-scoradas pela pipeline completa."""
+    s1 = pd.Series(np.asarray(stage1_scores, dtype=float))
+    rank = s1.groupby(pd.Series(np.asarray(groups)), sort=False).rank(
+        ascending=False, method="first"
+    )
+    return (rank <= m).to_numpy()
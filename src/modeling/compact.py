@@ -0,0 +1,191 @@
+# src/modeling/compact.py
+"""Compactação pós-treino: poda features de peso desprezível e passa para float32.
+
+Remove de cada vocabulário TF-IDF (e do vetor de coeficientes) as features com
+|coef| < tol, descarta `stop_words_` (só serve para inspeção e pode ser enorme)
+e converte matrizes/pesos para float32. Como a normalização L2 do TF-IDF passa a
+considerar só as features mantidas, os scores mudam um pouco: por isso o
+relatório sempre acompanha a compactação.
+
+Uso:
+    python -m src.modeling.compact --tol 1e-4            # gera model_compact.joblib
+    python -m src.modeling.compact --tol 1e-4 --replace  # troca model.joblib (guarda model_full.joblib)
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import io
+import json
+import time
+from typing import Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+
+from ..config.settings import (
+    APPLICANTS_PATH, VAGAS_PATH, PROSPECTS_PATH,
+    MODELS_DIR, REPORTS_DIR, RANDOM_STATE,
+)
+from ..features.csr_store import vocabulary_hash
+from .evaluate import ndcg_at_k
+
+
+def _pruned_vectorizer(vect, local: np.ndarray, dtype):
+    """Vetorizador novo só com os termos de `local`, montado por atributos públicos.
+
+    `clone` + `vocabulary_` + o setter de `idf_` evitam mexer no TfidfTransformer
+    interno do scikit-learn; `stop_words_` não é copiado.
+    """
+    remap = np.cumsum(local) - 1
+    new = clone(vect).set_params(dtype=dtype)
+    new.vocabulary_ = {t: int(remap[i]) for t, i in vect.vocabulary_.items() if local[i]}
+    if getattr(vect, "use_idf", False):
+        new.idf_ = np.asarray(vect.idf_[local], dtype=dtype)
+    return new
+
+
+def compact_pipeline(pipe, tol: float = 1e-4, dtype=np.float32):
+    """Devolve uma cópia podada/float32 da pipeline (concat -> vectorize -> clf linear)."""
+    pipe = copy.deepcopy(pipe)
+    clf = pipe[-1]
+    ct = pipe.named_steps["vectorize"]
+    coef = np.asarray(clf.coef_)
+    if coef.shape[0] != 1:
+        raise ValueError("compactação suporta apenas classificador linear binário")
+    keep = np.abs(coef[0]) >= tol
+
+    new_slices = {}
+    kept_cols = []
+    offset = 0
+    # transformers_ na ordem das colunas da matriz de features
+    for pos, (name, vect, columns) in enumerate(ct.transformers_):
+        if not hasattr(vect, "vocabulary_"):
+            continue
+        sl = ct.output_indices_[name]
+        local = keep[sl].copy()
+        if not local.any():
+            # um vocabulário vazio quebra o transform: mantém o termo de maior peso
+            local[np.argmax(np.abs(coef[0, sl]))] = True
+        ct.transformers_[pos] = (name, _pruned_vectorizer(vect, local, dtype), columns)
+        kept_cols.append(np.arange(sl.start, sl.stop)[local])
+        new_slices[name] = slice(offset, offset + int(local.sum()))
+        offset += int(local.sum())
+
+    for name in list(ct.output_indices_):
+        ct.output_indices_[name] = new_slices.get(name, slice(offset, offset))
+
+    cols = np.concatenate(kept_cols) if kept_cols else np.array([], dtype=int)
+    clf.coef_ = np.ascontiguousarray(coef[:, cols], dtype=dtype)
+    clf.intercept_ = np.asarray(clf.intercept_, dtype=dtype)
+    clf.n_features_in_ = len(cols)
+    return pipe
+
+
+def _scores(pipe, X) -> np.ndarray:
+    return pipe.predict_proba(X)[:, 1]
+
+
+def _dump_size_and_load_time(pipe) -> tuple[int, float]:
+    buf = io.BytesIO()
+    joblib.dump(pipe, buf)
+    size = buf.tell()
+    buf.seek(0)
+    t0 = time.perf_counter()
+    joblib.load(buf)
+    return size, time.perf_counter() - t0
+
+
+def compaction_report(
+    full,
+    compact,
+    X: pd.DataFrame,
+    y: Optional[np.ndarray] = None,
+    groups: Optional[np.ndarray] = None,
+    k: int = 5,
+) -> dict:
+    """Tamanho do artefato, tempo de load, latência de score e delta de métricas."""
+    report = {"n_features": {}, "artifact_bytes": {}, "load_s": {}, "score_s": {}}
+    scores = {}
+    for label, pipe in (("full", full), ("compact", compact)):
+        report["n_features"][label] = int(pipe[-1].coef_.shape[1])
+        size, load_s = _dump_size_and_load_time(pipe)
+        report["artifact_bytes"][label] = size
+        report["load_s"][label] = load_s
+        _scores(pipe, X.head(8))  # aquece caches antes de medir
+        t0 = time.perf_counter()
+        scores[label] = _scores(pipe, X)
+        report["score_s"][label] = time.perf_counter() - t0
+
+    diff = np.abs(scores["full"] - scores["compact"])
+    report["score_abs_diff"] = {"max": float(diff.max()), "mean": float(diff.mean())}
+    if y is not None and groups is not None:
+        nd_full = ndcg_at_k(y_true=y, y_score=scores["full"], groups=groups, k=k)
+        nd_comp = ndcg_at_k(y_true=y, y_score=scores["compact"], groups=groups, k=k)
+        report[f"NDCG@{k}"] = {"full": nd_full, "compact": nd_comp, "delta": nd_comp - nd_full}
+    return report
+
+
+def _evaluation_sample(n: int):
+    """Amostra da tabela de treino (se os dados brutos existirem) para o relatório."""
+    from ..data.loaders import load_applicants, load_jobs, load_prospects
+    from .train import make_training_table
+
+    if not (APPLICANTS_PATH.exists() and VAGAS_PATH.exists() and PROSPECTS_PATH.exists()):
+        return None, None, None
+    data = make_training_table(
+        load_applicants(APPLICANTS_PATH), load_jobs(VAGAS_PATH), load_prospects(PROSPECTS_PATH)
+    )
+    # amostra por vaga inteira para o NDCG fazer sentido
+    jobs = data["job_id"].drop_duplicates().sample(frac=1.0, random_state=RANDOM_STATE)
+    sizes = data.groupby("job_id").size().reindex(jobs)
+    chosen = sizes.index[sizes.cumsum() <= n]
+    data = data[data["job_id"].isin(chosen)]
+    return data, data["y"].to_numpy(), data["job_id"].to_numpy()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Poda + float32 do model.joblib")
+    ap.add_argument("--tol", type=float, default=1e-4, help="remove features com |coef| < tol")
+    ap.add_argument("--sample", type=int, default=5000, help="linhas usadas no relatório")
+    ap.add_argument("--replace", action="store_true", help="substitui model.joblib")
+    args = ap.parse_args(argv)
+
+    model_path = MODELS_DIR / "model.joblib"
+    full = joblib.load(model_path)
+    compact = compact_pipeline(full, tol=args.tol)
+
+    X, y, groups = _evaluation_sample(args.sample)
+    if X is None:
+        print("[Compact] dados brutos ausentes; relatório sem métricas de ranking")
+    else:
+        report = compaction_report(full, compact, X, y, groups)
+        report["tol"] = args.tol
+        REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+        (REPORTS_DIR / "compaction.json").write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print("[Compact]", json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.replace:
+        joblib.dump(full, MODELS_DIR / "model_full.joblib")
+        joblib.dump(compact, model_path)
+        meta_path = MODELS_DIR / "metadata.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            meta["vocab_hash"] = vocabulary_hash(compact)
+            if meta.get("model_version"):
+                meta["model_version"] = f"{meta['model_version']}+c"
+            meta["compaction"] = {"tol": args.tol}
+            meta_path.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[Compact] {model_path} substituído (original em model_full.joblib)")
+    else:
+        out = MODELS_DIR / "model_compact.joblib"
+        joblib.dump(compact, out)
+        print(f"[Compact] salvo em {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -79,4 +79,22 @@ def build_pipeline() -> Pipeline:
         ("vectorize", text_union),
         ("clf", LogisticRegression(max_iter=200, class_weight="balanced")),
     ])
-    return pipe
\ No newline at end of file
+    return pipe
+
+
+def build_first_stage_pipeline() -> Pipeline:
+    """1º estágio da cascata: só word TF-IDF (sem o char 3–5-gram, que domina o custo)."""
+    text_union = ColumnTransformer(
+        transformers=[
+            ("tfidf_word", build_tfidf_vectorizer(), "text_concat"),
+        ],
+        remainder="drop",
+        sparse_threshold=0.3,
+    )
+
+    pipe = Pipeline(steps=[
+        ("concat", TextConcat(job_weight=2, cv_weight=1)),
+        ("vectorize", text_union),
+        ("clf", LogisticRegression(max_iter=200, class_weight="balanced")),
+    ])
+    return pipe
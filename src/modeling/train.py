@@ -2,7 +2,7 @@ from __future__ import annotations
 from pathlib import Path
 import json
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 import joblib
 import pandas as pd
 from sklearn.model_selection import StratifiedGroupKFold, GroupKFold
@@ -12,11 +12,17 @@ import numpy as np
 
 from ..config.settings import (
     APPLICANTS_PATH, VAGAS_PATH, PROSPECTS_PATH,
-    MODELS_DIR, REPORTS_DIR, RANDOM_STATE
+    MODELS_DIR, REPORTS_DIR, RANDOM_STATE,
+    TRAIN_CASCADE, CASCADE_EVAL_M, COMPACT_TOL,
 )
 from ..data.loaders import load_applicants, load_jobs, load_prospects
+from ..features.csr_store import vocabulary_hash
 from ..labeling.targets import map_status_to_label
-from .pipeline import build_pipeline
+from ..monitoring.baseline import build_profile, save_profile
+from ..monitoring.text_stats import TEXT_FEATURES, staged_parts, text_stats
+from .cascade import cascade_by_group, shortlist_mask_by_group
+from .compact import compact_pipeline, compaction_report
+from .pipeline import build_pipeline, build_first_stage_pipeline
 from .evaluate import ndcg_at_k, precision_at_k, recall_at_k, mrr
 
 # Alvo de workload por vaga: quantos candidatos o recrutador quer ver no topo
@@ -30,6 +36,73 @@ def _fmt_secs(seconds: float) -> str:
 def _now() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+def _predict_scores(pipe, X) -> np.ndarray:
+    """Score contínuo 0-1, qualquer que seja o estimador final."""
+    if hasattr(pipe[-1], "predict_proba"):
+        return pipe.predict_proba(X)[:, 1]
+    if hasattr(pipe[-1], "decision_function"):
+        dfu = pipe.decision_function(X)
+        return (dfu - dfu.min()) / (dfu.max() - dfu.min() + 1e-9)
+    return pipe.predict(X).astype(float)
+
+
+def _eval_cascade_fold(pipe, Xtr, ytr, Xva, yva, gva, s_full, t_full: float) -> dict:
+    """Treina o 1º estágio no fold e mede qualidade (NDCG) e latência da cascata por M."""
+    stage1 = build_first_stage_pipeline()
+    stage1.fit(Xtr, ytr)
+
+    t0 = time.perf_counter()
+    s1 = _predict_scores(stage1, Xva)
+    t_stage1 = time.perf_counter() - t0
+
+    out = {
+        "ndcg_full": ndcg_at_k(y_true=yva, y_score=s_full, groups=gva, k=TARGET_K),
+        "ndcg_stage1": ndcg_at_k(y_true=yva, y_score=s1, groups=gva, k=TARGET_K),
+        "latency_full_s": t_full,
+        "latency_stage1_s": t_stage1,
+        "by_m": {},
+    }
+    for m in CASCADE_EVAL_M:
+        mask = shortlist_mask_by_group(s1, gva, m)
+        t0 = time.perf_counter()
+        if mask.any():
+            _predict_scores(pipe, Xva[mask])
+        t_rescore = time.perf_counter() - t0
+        merged = cascade_by_group(s1, s_full, gva, m)
+        out["by_m"][m] = {
+            "ndcg": ndcg_at_k(y_true=yva, y_score=merged, groups=gva, k=TARGET_K),
+            "latency_s": t_stage1 + t_rescore,
+            "rescored_frac": float(mask.mean()) if len(mask) else 0.0,
+        }
+    return out
+
+
+def _summarize_cascade(folds: list[dict]) -> dict:
+    """Média por fold: perda de NDCG@K e ganho de latência lado a lado."""
+    mean = lambda xs: float(np.mean(xs)) if xs else 0.0  # noqa: E731
+    nd_full = mean([f["ndcg_full"] for f in folds])
+    lat_full = mean([f["latency_full_s"] for f in folds])
+    report = {
+        f"NDCG@{TARGET_K}_full": nd_full,
+        f"NDCG@{TARGET_K}_stage1_only": mean([f["ndcg_stage1"] for f in folds]),
+        "latency_full_s": lat_full,
+        "latency_stage1_s": mean([f["latency_stage1_s"] for f in folds]),
+        "shortlist": [],
+    }
+    for m in CASCADE_EVAL_M:
+        nd = mean([f["by_m"][m]["ndcg"] for f in folds])
+        lat = mean([f["by_m"][m]["latency_s"] for f in folds])
+        report["shortlist"].append({
+            "M": m,
+            f"NDCG@{TARGET_K}": nd,
+            f"NDCG@{TARGET_K}_delta": nd - nd_full,
+            "latency_s": lat,
+            "speedup": lat_full / lat if lat > 0 else 0.0,
+            "rescored_frac": mean([f["by_m"][m]["rescored_frac"] for f in folds]),
+        })
+    return report
+
+
 def make_training_table(app_df: pd.DataFrame, job_df: pd.DataFrame, prs_df: pd.DataFrame) -> pd.DataFrame:
     # Join prospects with applicants and jobs
     df = prs_df.copy()
@@ -104,6 +177,9 @@ def main():
 
     ndcgs, rocs, f1s = [], [], []
     kth_scores: list[float] = []
+    cascade_folds: list[dict] = []
+    # scores out-of-fold: referência do drift de score
+    oof_scores = np.full(len(y), np.nan)
 
     # tenta Estratificado por grupo; se não der, cai para GroupKFold
     splitter = StratifiedGroupKFold(n_splits=n_splits, shuffle=True, random_state=RANDOM_STATE)
@@ -129,14 +205,13 @@ def main():
         pipe.fit(Xtr, ytr)
 
         # obtém score contínuo 0-1
-        if hasattr(pipe[-1], "predict_proba"):
-            s = pipe.predict_proba(Xva)[:, 1]
-        else:
-            if hasattr(pipe[-1], "decision_function"):
-                dfu = pipe.decision_function(Xva)
-                s = (dfu - dfu.min()) / (dfu.max() - dfu.min() + 1e-9)
-            else:
-                s = pipe.predict(Xva).astype(float)
+        t_pred0 = time.perf_counter()
+        s = _predict_scores(pipe, Xva)
+        t_pred = time.perf_counter() - t_pred0
+        oof_scores[va] = s
+
+        if TRAIN_CASCADE:
+            cascade_folds.append(_eval_cascade_fold(pipe, Xtr, ytr, Xva, yva, gva, s, t_pred))
 
         # Métricas de ranking
         nd = ndcg_at_k(y_true=yva, y_score=s, groups=gva, k=TARGET_K)
@@ -188,6 +263,10 @@ def main():
 
     print("[Metrics]", json.dumps(metrics, ensure_ascii=False, indent=2))
 
+    cascade_report = _summarize_cascade(cascade_folds) if cascade_folds else None
+    if cascade_report:
+        print("[Cascade]", json.dumps(cascade_report, ensure_ascii=False, indent=2))
+
     # =======================
     # Fit final + salvamento
     # =======================
@@ -196,42 +275,82 @@ def main():
         print("[AVISO] Dataset completo com classe única — usando DummyClassifier(most_frequent).")
         pipe.set_params(clf=DummyClassifier(strategy="most_frequent"))
     pipe.fit(X, y)
+    stage1 = None
+    if TRAIN_CASCADE and len(np.unique(y)) >= 2:
+        stage1 = build_first_stage_pipeline()
+        stage1.fit(X, y)
     t_fit = time.perf_counter() - t_fit0
     print(f"[TIMER] Fit final (tudo): { _fmt_secs(t_fit) }")
 
+    compaction = None
+    if COMPACT_TOL > 0 and hasattr(pipe[-1], "coef_"):
+        full_pipe = pipe
+        pipe = compact_pipeline(full_pipe, tol=COMPACT_TOL)
+        # relatório in-sample: mede fidelidade ao modelo completo, não generalização
+        sample = data[data["job_id"].isin(pd.unique(groups)[:2000])]
+        compaction = compaction_report(
+            full_pipe, pipe, sample, sample["y"].to_numpy(), sample["job_id"].to_numpy(), k=TARGET_K
+        )
+        compaction["tol"] = COMPACT_TOL
+        joblib.dump(full_pipe, MODELS_DIR / "model_full.joblib")
+        print("[Compact]", json.dumps(compaction, ensure_ascii=False, indent=2))
+
     t_save0 = time.perf_counter()
     joblib.dump(pipe, MODELS_DIR / "model.joblib")
+    stage1_path = MODELS_DIR / "model_stage1.joblib"
+    if stage1 is not None:
+        joblib.dump(stage1, stage1_path)
+    elif stage1_path.exists():
+        # 1º estágio de um treino anterior não combina com o novo modelo
+        stage1_path.unlink()
     (MODELS_DIR / "metadata.json").write_text(json.dumps({
+        "model_version": datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+        # matrizes pré-computadas (CSRStore) só são aceitas com o mesmo vocabulário
+        "vocab_hash": vocabulary_hash(pipe),
         "features": ["text_concat via TF-IDF (word+char)"],
         "target": "y",
         "metrics": metrics,
         "ranking": {
             "target_k": TARGET_K,
             "threshold_topk": threshold_topk
-        }
+        },
+        "cascade": cascade_report,
+        "compaction": compaction,
     }, ensure_ascii=False, indent=2), encoding="utf-8")
     t_save = time.perf_counter() - t_save0
     print(f"[TIMER] Persistência de artefatos: { _fmt_secs(t_save) }")
 
+    # === Salva perfil de referência p/ drift (quantis + histogramas) ===
+    ref_features = pd.DataFrame({
+        "cv_len": data["cv_pt"].fillna("").astype(str).str.len(),
+        "job_len": (
+            data["principais_atividades"].fillna("").astype(str) + " " +
+            data["competencias"].fillna("").astype(str) + " " +
+            data["observacoes"].fillna("").astype(str) + " " +
+            data["titulo_vaga"].fillna("").astype(str)
+        ).str.len(),
+        "score": oof_scores,
+    })
+    # vocabulário (nnz word/char, OOV) medido com o modelo servido, numa amostra
+    parts = staged_parts(pipe)
+    if parts is not None:
+        concat, ct, _ = parts
+        rng = np.random.default_rng(RANDOM_STATE)
+        pos = np.sort(rng.choice(len(data), size=min(5000, len(data)), replace=False))
+        text = concat.transform(data.iloc[pos])
+        stats, _ = text_stats(ct, ct.transform(text), text["text_concat"])
+        for col in TEXT_FEATURES:
+            ref_features[col] = np.nan
+            ref_features.iloc[pos, ref_features.columns.get_loc(col)] = stats[col].to_numpy()
+    ref_path = MODELS_DIR / "baseline_profile.json"
+    save_profile(
+        build_profile(ref_features, ["cv_len", "job_len", "score"] + TEXT_FEATURES), ref_path
+    )
+    print(f"[Baseline] perfil salvo em: {ref_path}")
+
     t_total = time.perf_counter() - t0
     print(f"[TIMER] Tempo total do pipeline: { _fmt_secs(t_total) } (fim: { _now() })")
 
-# === Salva baseline de features simples p/ drift ===
-ref_features = pd.DataFrame({
-    "cv_len": data["cv_pt"].fillna("").astype(str).str.len(),
-    "job_len": (
-        data["principais_atividades"].fillna("").astype(str) + " " +
-        data["competencias"].fillna("").astype(str) + " " +
-        data["observacoes"].fillna("").astype(str) + " " +
-        data["titulo_vaga"].fillna("").astype(str)
-    ).str.len(),
-    # score não existe no treino; usar placeholder NaN
-    "score": np.nan
-})
-ref_path = MODELS_DIR / "baseline_features.csv"
-ref_features.to_csv(ref_path, index=False)
-print(f"[Baseline] features salvas em: {ref_path}")
-
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
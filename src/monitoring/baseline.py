@@ -0,0 +1,127 @@
+# src/monitoring/baseline.py
+"""Perfil compacto de referência para o drift (baseline_profile.json).
+
+Substitui o CSV com uma linha por par de treino: por feature guarda só o
+tamanho da amostra, quantis equiespaçados, histograma nos bins fixos dos
+sketches e média/desvio. O `score` vem das predições out-of-fold da validação
+cruzada, então o drift de score passa a ter uma referência real.
+
+Os quantis funcionam como "amostra" ordenada da referência no motor nativo:
+KS/PSI/Wasserstein usam os quantis e o `n` real (ver drift_stats.ks_2samp_sorted).
+O Evidently não aceita `n`, então o perfil guarda também uma amostra real de
+linhas (`sample`), usada por ele e pelos relatórios HTML.
+"""
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .sketches import HIST_EDGES, histogram
+
+PROFILE_VERSION = 1
+DEFAULT_QUANTILES = 1001
+DEFAULT_SAMPLE_ROWS = 2000
+
+
+def _sample_rows(frame: pd.DataFrame, cols, n: int, seed: int) -> Dict[str, list]:
+    """Amostra de linhas reais (mesmas linhas em todas as colunas); NaN vira null.
+
+    Prefere linhas completas, se houver, para o Evidently ver todas as features.
+    """
+    if not cols or n <= 0:
+        return {}
+    data = frame[cols].apply(pd.to_numeric, errors="coerce")
+    complete = data.notna().all(axis=1)
+    pool = data[complete] if complete.any() else data
+    if len(pool) > n:
+        pool = pool.sample(n=n, random_state=seed).sort_index()
+    return {c: [None if pd.isna(v) else float(v) for v in pool[c]] for c in cols}
+
+
+def build_profile(
+    frame: pd.DataFrame,
+    features: Iterable[str],
+    n_quantiles: int = DEFAULT_QUANTILES,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    seed: int = 0,
+) -> dict:
+    feats: Dict[str, dict] = {}
+    qs = np.linspace(0.0, 1.0, n_quantiles)
+    for col in features:
+        a = pd.to_numeric(frame[col], errors="coerce").to_numpy(dtype=float) if col in frame else np.array([])
+        a = a[np.isfinite(a)]
+        if not len(a):
+            # sem referência (ex.: score sem validação cruzada): feature fica de fora
+            continue
+        feats[col] = {
+            "n": int(len(a)),
+            "quantiles": np.quantile(a, qs).tolist(),
+            "hist_edges": HIST_EDGES.get(col, HIST_EDGES["score"]).tolist(),
+            "hist": histogram(col, a).tolist(),
+            "mean": float(a.mean()),
+            "std": float(a.std()),
+        }
+    return {
+        "version": PROFILE_VERSION,
+        "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "features": feats,
+        "sample": _sample_rows(frame, list(feats), sample_rows, seed),
+    }
+
+
+def save_profile(profile: dict, path: Path):
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(profile, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_profile(path: Path) -> Optional[dict]:
+    try:
+        profile = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(profile, dict) or "features" not in profile:
+        return None
+    return profile
+
+
+def profile_sorted(profile: dict) -> Dict[str, np.ndarray]:
+    """Quantis por feature (já ordenados), prontos para drift_stats."""
+    return {c: np.asarray(f["quantiles"], dtype=float) for c, f in profile["features"].items()}
+
+
+def profile_counts(profile: dict) -> Dict[str, int]:
+    return {c: int(f["n"]) for c, f in profile["features"].items()}
+
+
+def profile_sample(profile: dict, features: Iterable[str]) -> pd.DataFrame:
+    """Amostra real da referência (para Evidently/relatórios).
+
+    Perfis antigos, sem `sample`, caem nos quantis (profile_to_frame).
+    """
+    sample = profile.get("sample") or {}
+    if not sample:
+        return profile_to_frame(profile, features)
+    n = len(next(iter(sample.values())))
+    return pd.DataFrame(
+        {c: np.asarray(sample[c], dtype=float) if c in sample else np.full(n, np.nan) for c in features}
+    )
+
+
+def profile_to_frame(profile: dict, features: Iterable[str]) -> pd.DataFrame:
+    """DataFrame com os quantis como linhas (fallback sem amostra).
+
+    Features ausentes no perfil viram NaN.
+    """
+    srt = profile_sorted(profile)
+    n = max((len(v) for v in srt.values()), default=0)
+    return pd.DataFrame(
+        {c: srt[c] if c in srt and len(srt[c]) == n else np.full(n, np.nan) for c in features}
+    )
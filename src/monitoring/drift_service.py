@@ -1,13 +1,19 @@
 # src/monitoring/drift_service.py
 import os
-import time
 import threading
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import NamedTuple, Optional
 
+import numpy as np
 import pandas as pd
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import FileResponse
 from prometheus_client import (
+    Counter,
     Gauge,
+    Histogram,
     generate_latest,
     CONTENT_TYPE_LATEST,
     CollectorRegistry,
@@ -15,16 +21,60 @@ from prometheus_client import (
 # estes coletores adicionam python_info/process/gc ao registry customizado
 from prometheus_client import ProcessCollector, PlatformCollector, GCCollector
 
+from . import drift_stats
+from .baseline import load_profile, profile_counts, profile_sample, profile_sorted
+from .log_tail import LogTail
+from .ringlog import ENDPOINT_NAMES, RingReader
+from .report_worker import ReportPolicy, ReportWorker, enforce_retention
+from .scheduler import DriftScheduler
+from .text_stats import TEXT_FEATURES, merge_oov_files
+from .sketches import SketchStore, histogram, histogram_psi, parse_window
+
 # ---- Paths/Config ----
 MON_DIR = Path(os.getenv("MONITORING_DIR", "/monitoring"))
 ARTIFACTS = Path("/app/models/artifacts")
 BASELINE = ARTIFACTS / "baseline_features.csv"
+# perfil compacto gerado pelo treino; o CSV acima fica como fallback (treinos antigos)
+BASELINE_PROFILE = ARTIFACTS / "baseline_profile.json"
 LOG_FILE = MON_DIR / "requests_log.csv"
+# ring buffer binário gravado pela API (MONITOR_SINK=ring|both)
+RING_FILE = MON_DIR / "requests.ring"
+# mesmo valor da API: csv lê só o CSV; ring/both só o ring; sem valor, o mais recente
+MONITOR_SINK = os.getenv("MONITOR_SINK", "").strip().lower()
 
 # Relatórios em diretório de monitoramento (RW), não em artifacts (RO)
 REPORTS_DIR = Path(os.getenv("DRIFT_REPORTS_DIR", str(MON_DIR / "drift_reports")))
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
+# HTML do Evidently: processo separado, só quando o status muda ou pela cadência
+DRIFT_REPORTS = os.getenv("DRIFT_REPORTS", "true").strip().lower() not in ("0", "false", "no", "off")
+DRIFT_REPORT_EVERY_SECONDS = float(os.getenv("DRIFT_REPORT_EVERY_SECONDS", "3600"))
+DRIFT_REPORTS_KEEP = int(os.getenv("DRIFT_REPORTS_KEEP", "20"))
+DRIFT_REPORTS_MAX_MB = float(os.getenv("DRIFT_REPORTS_MAX_MB", "200"))
+
+# Motor do ciclo: "evidently" (Report) ou "native" (drift_stats)
+DRIFT_ENGINE = os.getenv("DRIFT_ENGINE", "evidently").strip().lower()
+DRIFT_ALPHA = float(os.getenv("DRIFT_ALPHA", "0.05"))
+# comprimentos + score em toda linha; estatísticas de vocabulário (nnz/OOV) quando houver
+CORE_FEATURES = ["cv_len", "job_len", "score"]
+FEATURES = CORE_FEATURES + TEXT_FEATURES
+WINDOW_ROWS = 5000
+
+# Drift por janela de tempo x endpoint (sobre um buffer das linhas mais recentes)
+DRIFT_WINDOWS = [w for w in os.getenv("DRIFT_WINDOWS", "5m,1h,1d").split(",") if w.strip()]
+DRIFT_BUFFER_ROWS = int(os.getenv("DRIFT_BUFFER_ROWS", "50000"))
+DRIFT_WINDOW_MIN_ROWS = int(os.getenv("DRIFT_WINDOW_MIN_ROWS", "200"))
+
+# Agendador: ciclo a cada N linhas novas ou T segundos (pulado se nada chegou)
+DRIFT_MIN_NEW_ROWS = int(os.getenv("DRIFT_MIN_NEW_ROWS", "200"))
+DRIFT_INTERVAL_SECONDS = float(os.getenv("DRIFT_INTERVAL_SECONDS", "60"))
+
+# Sketches por minuto gravados pela API (drift por janela sem linhas brutas)
+SKETCH_DIR = Path(os.getenv("SKETCH_DIR", str(MON_DIR / "sketches")))
+SKETCH_WINDOWS = [w for w in os.getenv("SKETCH_WINDOWS", "5m,1h,1d").split(",") if w.strip()]
+SKETCH_RETENTION = os.getenv("SKETCH_RETENTION", "2d")
+SKETCH_MIN_ROWS = int(os.getenv("SKETCH_MIN_ROWS", "200"))
+
 # ---- Prometheus: registry próprio p/ evitar duplicações em testes ----
 DRIFT_REGISTRY = CollectorRegistry()
 # adiciona métricas padrão (python_info, process, gc) ao registry customizado
@@ -39,17 +89,119 @@ DRIFT_PVAL = Gauge(
 DRIFT_FLAG = Gauge(
     "dm_drift_detected", "1 se drift detectado na feature", ["feature"], registry=DRIFT_REGISTRY
 )
+# só o motor nativo preenche estas
+DRIFT_PSI = Gauge(
+    "dm_drift_psi", "Population Stability Index por feature", ["feature"], registry=DRIFT_REGISTRY
+)
+DRIFT_WASSERSTEIN = Gauge(
+    "dm_drift_wasserstein_norm", "Wasserstein normalizado pelo desvio da referência",
+    ["feature"], registry=DRIFT_REGISTRY
+)
+
+SKETCH_PVAL = Gauge(
+    "dm_sketch_drift_p_value", "KS p-value por feature/janela (sketches)",
+    ["feature", "window"], registry=DRIFT_REGISTRY
+)
+SKETCH_FLAG = Gauge(
+    "dm_sketch_drift_detected", "1 se drift na feature/janela (sketches)",
+    ["feature", "window"], registry=DRIFT_REGISTRY
+)
+SKETCH_PSI = Gauge(
+    "dm_sketch_drift_psi", "PSI por feature/janela (histogramas fixos)",
+    ["feature", "window"], registry=DRIFT_REGISTRY
+)
+SKETCH_ROWS = Gauge(
+    "dm_sketch_rows", "Linhas cobertas pelos sketches da janela", ["window"], registry=DRIFT_REGISTRY
+)
+
+REPORTS = Counter(
+    "dm_drift_reports", "Pedidos de relatório HTML (submitted, dropped)", ["result"],
+    registry=DRIFT_REGISTRY
+)
+
+WINDOW_PVAL = Gauge(
+    "dm_drift_window_p_value", "KS p-value por feature/janela/endpoint",
+    ["feature", "window", "endpoint"], registry=DRIFT_REGISTRY
+)
+WINDOW_FLAG = Gauge(
+    "dm_drift_window_detected", "1 se drift na feature/janela/endpoint",
+    ["feature", "window", "endpoint"], registry=DRIFT_REGISTRY
+)
+WINDOW_PSI = Gauge(
+    "dm_drift_window_psi", "PSI por feature/janela/endpoint",
+    ["feature", "window", "endpoint"], registry=DRIFT_REGISTRY
+)
+WINDOW_ROWS_GAUGE = Gauge(
+    "dm_drift_window_rows", "Linhas na janela/endpoint", ["window", "endpoint"], registry=DRIFT_REGISTRY
+)
+WINDOW_COVERAGE = Gauge(
+    "dm_drift_window_coverage_seconds",
+    "Segundos da janela cobertos pelo buffer (menor que a janela se truncada)",
+    ["window"], registry=DRIFT_REGISTRY
+)
+
+# custo/saúde do próprio ciclo
+CYCLE_SECONDS = Histogram(
+    "dm_drift_cycle_seconds", "Duração do ciclo de drift", registry=DRIFT_REGISTRY,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+CYCLE_ROWS = Counter(
+    "dm_drift_rows_processed", "Linhas novas do log consumidas pelos ciclos", registry=DRIFT_REGISTRY
+)
+CYCLES = Counter(
+    "dm_drift_cycles", "Ciclos de drift por resultado (ok, no_data, error, skipped)",
+    ["result"], registry=DRIFT_REGISTRY
+)
+LAST_SUCCESS = Gauge(
+    "dm_drift_last_success_timestamp_seconds", "Unix time do último ciclo bem-sucedido",
+    registry=DRIFT_REGISTRY
+)
 
 # ---- App ----
-app = FastAPI(title="Drift Monitor", version="0.1")
+_scheduler: Optional[DriftScheduler] = None
+_report_worker: Optional[ReportWorker] = None
+_report_policy = ReportPolicy(DRIFT_REPORT_EVERY_SECONDS)
+
+def _reports_max_bytes() -> int:
+    return int(DRIFT_REPORTS_MAX_MB * 1024 * 1024)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _scheduler, _report_worker
+    enforce_retention(REPORTS_DIR, DRIFT_REPORTS_KEEP, _reports_max_bytes())
+    if DRIFT_REPORTS:
+        _report_worker = ReportWorker(REPORTS_DIR, DRIFT_REPORTS_KEEP, _reports_max_bytes())
+        _report_worker.start()
+    if os.getenv("DRIFT_SCHEDULER", "true").strip().lower() not in ("0", "false", "no", "off"):
+        _scheduler = DriftScheduler(
+            run_cycle,
+            _probe_new_rows,
+            min_rows=DRIFT_MIN_NEW_ROWS,
+            max_interval=DRIFT_INTERVAL_SECONDS,
+            on_skip=lambda: CYCLES.labels(result="skipped").inc(),
+        )
+        _scheduler.start()
+    yield
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
+    if _report_worker is not None:
+        _report_worker.stop()
+        _report_worker = None
+
+app = FastAPI(title="Drift Monitor", version="0.1", lifespan=lifespan)
 
 @app.get("/health")
 def health():
     return {
         "status": "ok",
-        "baseline_exists": BASELINE.exists(),
+        "baseline_exists": BASELINE_PROFILE.exists() or BASELINE.exists(),
         "log_exists": LOG_FILE.exists(),
+        "ring_exists": RING_FILE.exists(),
         "reports_dir": str(REPORTS_DIR),
+        "engine": DRIFT_ENGINE,
+        "scheduler_running": _scheduler is not None,
+        "pending_rows": _scheduler.pending_rows if _scheduler is not None else 0,
     }
 
 @app.get("/metrics")
@@ -58,9 +210,17 @@ def metrics():
     return Response(generate_latest(DRIFT_REGISTRY), media_type=CONTENT_TYPE_LATEST)
 
 # ---- IO helpers ----
-def _load_baseline():
-    if not BASELINE.exists():
-        return None
+class Reference(NamedTuple):
+    frame: pd.DataFrame          # amostra real (Evidently, relatórios)
+    sorted: dict                 # feature -> valores ordenados (quantis no perfil; motor nativo)
+    n: dict                      # feature -> tamanho real da referência
+    hist: dict                   # feature -> contagens nos bins fixos dos sketches
+
+# carregada uma vez por versão do arquivo (path, mtime, tamanho)
+_ref_key = None
+_ref: Optional[Reference] = None
+
+def _read_baseline_csv() -> Optional[pd.DataFrame]:
     try:
         df = pd.read_csv(BASELINE)
         cols = ["cv_len", "job_len", "score"]
@@ -71,79 +231,391 @@ def _load_baseline():
     except Exception:
         return None
 
-def _load_current_window(limit_rows: int = 5000, min_rows: int = 200):
+def _reference_from_profile(profile: dict) -> Reference:
+    srt = profile_sorted(profile)
+    hist = {}
+    for c, f in profile["features"].items():
+        if len(f.get("hist", [])) == len(histogram(c, [])):
+            hist[c] = np.asarray(f["hist"], dtype=np.int64)
+        else:
+            hist[c] = histogram(c, srt[c])
+    return Reference(profile_sample(profile, FEATURES), srt, profile_counts(profile), hist)
+
+def _reference_from_frame(df: pd.DataFrame) -> Reference:
+    srt = {c: drift_stats.sorted_values(df[c]) for c in FEATURES if c in df}
+    return Reference(
+        df, srt, {c: len(v) for c, v in srt.items()}, {c: histogram(c, v) for c, v in srt.items()}
+    )
+
+def _reference() -> Optional[Reference]:
+    """Referência do drift: perfil JSON se existir, senão o CSV; cache por mtime."""
+    global _ref_key, _ref
+    for path in (BASELINE_PROFILE, BASELINE):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        key = (str(path), st.st_mtime_ns, st.st_size)
+        if key == _ref_key and _ref is not None:
+            return _ref
+        if path == BASELINE_PROFILE:
+            profile = load_profile(path)
+            ref = _reference_from_profile(profile) if profile else None
+        else:
+            df = _read_baseline_csv()
+            ref = _reference_from_frame(df) if df is not None else None
+        if ref is not None:
+            _ref_key, _ref = key, ref
+            return ref
+    return None
+
+def _load_baseline():
+    ref = _reference()
+    return None if ref is None else ref.frame
+
+# leitor incremental do log; recriado se LOG_FILE/limite mudarem. Compartilhado
+# pelo agendador e por /report: _get_tail/refresh/frame só com _tail_lock
+_tail: Optional[LogTail] = None
+_tail_lock = threading.Lock()
+
+def _get_tail(limit_rows: int) -> LogTail:
+    global _tail
+    if _tail is None or _tail.path != Path(LOG_FILE) or _tail.max_rows != limit_rows:
+        _tail = LogTail(LOG_FILE, max_rows=limit_rows)
+    return _tail
+
+# leitor do ring; reaberto se o arquivo for recriado (inode novo). Como o tail,
+# é compartilhado pelo agendador e por /report: _get_ring e leituras só com _ring_lock
+_ring: Optional[RingReader] = None
+_ring_ident = None
+_ring_seen = 0
+_ring_lock = threading.Lock()
+
+def _ring_selected(st: os.stat_result) -> bool:
+    """Ring como fonte? Um ring parado (sink voltou para csv) não esconde o CSV."""
+    if MONITOR_SINK in ("ring", "both"):
+        return True
+    if MONITOR_SINK == "csv":
+        return False
+    try:
+        return st.st_mtime >= os.stat(LOG_FILE).st_mtime
+    except OSError:
+        return True
+
+def _get_ring() -> Optional[RingReader]:
+    global _ring, _ring_ident, _ring_seen
+    try:
+        st = os.stat(RING_FILE)
+    except OSError:
+        return None
+    if not _ring_selected(st):
+        return None
+    ident = (str(RING_FILE), st.st_dev, st.st_ino)
+    if _ring is None or ident != _ring_ident:
+        try:
+            reader = RingReader(RING_FILE)
+        except (OSError, ValueError):
+            return None
+        if _ring is not None:
+            _ring.close()
+        _ring, _ring_ident, _ring_seen = reader, ident, 0
+    return _ring
+
+def _probe_new_rows() -> int:
+    """Linhas novas desde a última leitura (ring: diferença de seq; CSV: incremental)."""
+    global _ring_seen
+    with _ring_lock:
+        ring = _get_ring()
+        if ring is not None:
+            head = ring.seq
+            new, _ring_seen = max(0, head - _ring_seen), head
+            return new
+    if not LOG_FILE.exists():
+        return 0
+    with _tail_lock:
+        return _get_tail(_buffer_rows()).refresh()
+
+def _buffer_rows() -> int:
+    # um único buffer atende a janela do ciclo e as janelas de tempo
+    return max(WINDOW_ROWS, DRIFT_BUFFER_ROWS)
+
+_ENDPOINT_LOOKUP = np.array(
+    ["unknown"] + [ENDPOINT_NAMES.get(i, "unknown") for i in range(1, max(ENDPOINT_NAMES) + 1)]
+)
+
+def _window_from_ring(ring: RingReader, limit_rows: int) -> pd.DataFrame:
+    recs = ring.latest(limit_rows)
+    # cópia para float: o ring continua sendo escrito depois daqui
+    codes = np.minimum(recs["endpoint"].astype(np.int64), len(_ENDPOINT_LOOKUP) - 1)
+    df = pd.DataFrame({c: recs[c].astype(float) for c in ["ts"] + FEATURES})
+    df.insert(1, "endpoint", _ENDPOINT_LOOKUP[codes])
+    return df
+
+def _recent_frame(limit_rows: int) -> Optional[pd.DataFrame]:
+    """Últimas `limit_rows` linhas (ring ou CSV): ts, endpoint e FEATURES numéricas."""
+    with _ring_lock:
+        ring = _get_ring()
+        if ring is not None:
+            return _window_from_ring(ring, limit_rows)
     if not LOG_FILE.exists():
         return None
     try:
-        df = pd.read_csv(LOG_FILE)
-        if len(df) > limit_rows:
-            df = df.tail(limit_rows)
-        cur = pd.DataFrame({
-            "cv_len": pd.to_numeric(df["cv_len"], errors="coerce"),
-            "job_len": pd.to_numeric(df["job_len"], errors="coerce"),
-            "score":  pd.to_numeric(df["score"], errors="coerce"),
-        }).dropna()
-        if len(cur) < min_rows:
-            return None
-        return cur
+        with _tail_lock:
+            tail = _get_tail(_buffer_rows())
+            tail.refresh()
+            df = tail.frame().tail(limit_rows)
+        # logs antigos não têm as colunas de texto: ficam NaN
+        out = pd.DataFrame({
+            c: pd.to_numeric(df[c], errors="coerce") if c in df else np.nan
+            for c in ["ts"] + FEATURES
+        })
+        out.insert(1, "endpoint", df["endpoint"].astype(str) if "endpoint" in df else "unknown")
+        return out
     except Exception:
         return None
 
-# ---- Core (lazy import Evidently) ----
-def compute_and_export():
-    ref = _load_baseline()
+def _load_current_window(limit_rows: int = WINDOW_ROWS, min_rows: int = 200):
+    df = _recent_frame(limit_rows)
+    if df is None:
+        return None
+    cur = df[FEATURES].dropna(subset=CORE_FEATURES)
+    return cur if len(cur) >= min_rows else None
+
+# ---- Core ----
+def _compute_native(ref: Reference, cur: pd.DataFrame) -> dict:
+    return drift_stats.compute_drift(
+        ref.frame, cur, FEATURES, alpha=DRIFT_ALPHA, ref_sorted=ref.sorted, ref_n=ref.n
+    )
+
+def _common_columns(ref: pd.DataFrame, cur: pd.DataFrame) -> list:
+    """Features com dados dos dois lados (Evidently não lida com colunas vazias)."""
+    return [
+        c for c in FEATURES
+        if c in ref and c in cur and ref[c].notna().any() and cur[c].notna().any()
+    ]
+
+def _run_evidently(ref: pd.DataFrame, cur: pd.DataFrame):
+    """Roda o DataDriftPreset (import lazy); devolve o Report."""
+    from evidently.report import Report
+    from evidently.metric_preset import DataDriftPreset
+
+    cols = _common_columns(ref, cur)
+    report = Report(metrics=[DataDriftPreset()])
+    report.run(reference_data=ref[cols].copy(), current_data=cur[cols].copy())
+    return report
+
+def _save_html(report) -> Optional[Path]:
+    out_html = REPORTS_DIR / f"drift_{int(time.time())}.html"
+    try:
+        REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+        report.save_html(str(out_html))
+        return out_html
+    except Exception:
+        return None
+
+def _evidently_results(report) -> dict:
+    out = {}
+    for sec in report.as_dict().get("metrics", []):
+        per_col = sec.get("result", {}).get("drift_by_columns", {})
+        for col, info in per_col.items():
+            if info.get("p_value") is not None:
+                out[col] = {
+                    "p_value": float(info["p_value"]),
+                    "drift_detected": bool(info.get("drift_detected")),
+                }
+    return out
+
+def _export(results: dict):
+    for col, info in results.items():
+        DRIFT_PVAL.labels(feature=col).set(info["p_value"])
+        DRIFT_FLAG.labels(feature=col).set(1.0 if info["drift_detected"] else 0.0)
+        if "psi" in info:
+            DRIFT_PSI.labels(feature=col).set(info["psi"])
+            DRIFT_WASSERSTEIN.labels(feature=col).set(info["wasserstein_norm"])
+
+def _request_report(ref: pd.DataFrame, cur: pd.DataFrame, results: dict):
+    """Enfileira o HTML no worker se o status mudou/venceu a cadência; nunca bloqueia."""
+    if _report_worker is None:
+        return
+    status = tuple(sorted(c for c, info in results.items() if info["drift_detected"]))
+    if not _report_policy.should_render(status):
+        return
+    cols = _common_columns(ref, cur)
+    if _report_worker.submit(ref[cols].copy(), cur[cols].copy()):
+        _report_policy.mark(status)
+        REPORTS.labels(result="submitted").inc()
+    else:
+        REPORTS.labels(result="dropped").inc()
+
+def compute_and_export() -> Optional[bool]:
+    """True se exportou, False em falha, None sem dados suficientes."""
+    ref = _reference()
     cur = _load_current_window()
     if ref is None or cur is None:
+        return None
+
+    try:
+        if DRIFT_ENGINE == "native":
+            results = _compute_native(ref, cur)
+        else:
+            results = _evidently_results(_run_evidently(ref.frame, cur))
+        _export(results)
+        _request_report(ref.frame, cur, results)
+        return True
+    except Exception:
+        # qualquer falha no cálculo não deve derrubar o serviço
+        return False
+
+_sketch_store: Optional[SketchStore] = None
+
+def _get_sketch_store() -> SketchStore:
+    global _sketch_store
+    if _sketch_store is None or _sketch_store.root != Path(SKETCH_DIR):
+        _sketch_store = SketchStore(SKETCH_DIR)
+    return _sketch_store
+
+def compute_sketch_drift(now: Optional[float] = None):
+    """Drift por janela a partir dos sketches mesclados (KS/Wasserstein via KLL, PSI via histograma)."""
+    ref = _reference()
+    if ref is None:
         return
+    store = _get_sketch_store()
+    try:
+        store.prune(parse_window(SKETCH_RETENTION), now=now)
+    except Exception:
+        pass
+    for spec in SKETCH_WINDOWS:
+        try:
+            merged = store.window(parse_window(spec), now=now)
+        except ValueError:
+            continue
+        window = spec.strip()
+        SKETCH_ROWS.labels(window=window).set(max((sk.n for sk in merged.values()), default=0))
+        for col, sk in merged.items():
+            r = ref.sorted.get(col)
+            if r is None or len(r) == 0 or sk.n < SKETCH_MIN_ROWS:
+                continue
+            res = drift_stats.numeric_drift(
+                r, sk.sample(), alpha=DRIFT_ALPHA, n_ref=ref.n[col], n_cur=sk.n
+            )
+            SKETCH_PVAL.labels(feature=col, window=window).set(res["p_value"])
+            SKETCH_FLAG.labels(feature=col, window=window).set(1.0 if res["drift_detected"] else 0.0)
+            SKETCH_PSI.labels(feature=col, window=window).set(
+                histogram_psi(ref.hist[col], sk.hist)
+            )
+
+@app.get("/oov")
+def oov_tokens(top: int = 50, min_docs: int = 5):
+    """Tokens fora do vocabulário mais frequentes (amostrados pela API, todos os workers)."""
+    return merge_oov_files(MON_DIR, top=top, min_docs=min_docs)
 
+@app.get("/report")
+def report_html():
+    """Relatório HTML do Evidently sob demanda (independe do motor do ciclo)."""
+    ref = _load_baseline()
+    cur = _load_current_window()
+    if ref is None or cur is None:
+        raise HTTPException(status_code=404, detail="baseline ou janela atual indisponível")
     try:
-        from evidently.report import Report
-        from evidently.metric_preset import DataDriftPreset
+        report = _run_evidently(ref, cur)
+    except ImportError:
+        raise HTTPException(status_code=503, detail="evidently não instalado")
+    out = _save_html(report)
+    if out is None:
+        raise HTTPException(status_code=500, detail="falha ao gerar o relatório")
+    enforce_retention(REPORTS_DIR, max(DRIFT_REPORTS_KEEP, 1), _reports_max_bytes())
+    return FileResponse(out, media_type="text/html")
 
-        report = Report(metrics=[DataDriftPreset()])
-        common = ["cv_len", "job_len", "score"]
-        report.run(reference_data=ref[common].copy(), current_data=cur[common].copy())
+# rótulos exportados no último ciclo (séries que somem são removidas)
+_window_labels: set = set()
 
-        # salva HTML (best-effort)
-        ts = int(time.time())
-        out_html = REPORTS_DIR / f"drift_{ts}.html"
+def compute_window_drift(now: Optional[float] = None) -> dict:
+    """Drift por janela de tempo x endpoint sobre o buffer recente.
+
+    Cada feature é ordenada uma única vez; janelas/endpoints são máscaras
+    booleanas aplicadas na ordem já ordenada, sem re-ordenar nem re-ler.
+    Com o buffer cheio, janelas mais antigas que a linha mais velha dele ficam
+    truncadas: `dm_drift_window_coverage_seconds` mostra quanto foi coberto.
+    """
+    global _window_labels
+    ref = _reference()
+    recent = _recent_frame(_buffer_rows())
+    if ref is None or recent is None or recent.empty:
+        return {}
+    now = time.time() if now is None else now
+    # buffer cheio: linhas anteriores à mais velha dele foram descartadas
+    full = len(recent) >= _buffer_rows()
+    recent = recent.dropna(subset=["ts"])
+    ts = recent["ts"].to_numpy(dtype=float)
+    oldest = float(ts.min()) if full and len(ts) else -np.inf
+    ep = recent["endpoint"].astype(str).to_numpy()
+    core_ok = recent[CORE_FEATURES].notna().all(axis=1).to_numpy()
+    windows = []
+    for spec in DRIFT_WINDOWS:
         try:
-            REPORTS_DIR.mkdir(parents=True, exist_ok=True)
-        except Exception:
-            pass
+            seconds = parse_window(spec)
+        except ValueError:
+            continue
+        windows.append((spec.strip(), ts >= now - seconds))
+        WINDOW_COVERAGE.labels(window=spec.strip()).set(min(seconds, max(0.0, now - oldest)))
+    groups = ["all"] + sorted(set(ep))
 
+    out, seen = {}, set()
+    for window, in_win in windows:
+        for g in groups:
+            m = in_win & core_ok if g == "all" else in_win & core_ok & (ep == g)
+            WINDOW_ROWS_GAUGE.labels(window=window, endpoint=g).set(int(m.sum()))
+            seen.add(("rows", window, g))
+
+    for col in FEATURES:
+        r = ref.sorted.get(col)
+        if r is None or len(r) == 0:
+            continue
+        v = recent[col].to_numpy(dtype=float)
+        idx = np.flatnonzero(np.isfinite(v) & core_ok)
+        order = idx[np.argsort(v[idx], kind="stable")]
+        v_sorted, ep_sorted = v[order], ep[order]
+        for window, in_win in windows:
+            win_sorted = in_win[order]
+            for g in groups:
+                m = win_sorted if g == "all" else win_sorted & (ep_sorted == g)
+                cur = v_sorted[m]
+                if len(cur) < DRIFT_WINDOW_MIN_ROWS:
+                    continue
+                res = drift_stats.numeric_drift(r, cur, alpha=DRIFT_ALPHA, n_ref=ref.n[col])
+                labels = dict(feature=col, window=window, endpoint=g)
+                WINDOW_PVAL.labels(**labels).set(res["p_value"])
+                WINDOW_FLAG.labels(**labels).set(1.0 if res["drift_detected"] else 0.0)
+                WINDOW_PSI.labels(**labels).set(res["psi"])
+                seen.add((col, window, g))
+                out[(col, window, g)] = res
+
+    for key in _window_labels - seen:
         try:
-            report.save_html(str(out_html))
-        except Exception:
+            if key[0] == "rows":
+                WINDOW_ROWS_GAUGE.remove(key[1], key[2])
+            else:
+                for gauge in (WINDOW_PVAL, WINDOW_FLAG, WINDOW_PSI):
+                    gauge.remove(*key)
+        except KeyError:
             pass
+    _window_labels = seen
+    return out
 
-        # exporta métricas
+def run_cycle(rows: int = 0) -> Optional[bool]:
+    """Um ciclo completo (janela + sketches), com métricas de custo."""
+    t0 = time.perf_counter()
+    ok = compute_and_export()
+    for extra in (compute_window_drift, compute_sketch_drift):
         try:
-            as_dict = report.as_dict()
-            for sec in as_dict.get("metrics", []):
-                res = sec.get("result", {})
-                per_col = res.get("drift_by_columns", {})
-                for col, info in per_col.items():
-                    p = info.get("p_value")
-                    drifted = 1.0 if info.get("drift_detected") else 0.0
-                    if p is not None:
-                        DRIFT_PVAL.labels(feature=col).set(float(p))
-                        DRIFT_FLAG.labels(feature=col).set(drifted)
+            extra()
         except Exception:
             pass
-
-    except Exception:
-        # qualquer falha do Evidently não deve derrubar o serviço
-        pass
-
-def _loop():
-    while True:
-        compute_and_export()
-        time.sleep(60)
-
-def start_bg_loop():
-    t = threading.Thread(target=_loop, daemon=True)
-    t.start()
-
-# inicia loop em background; /metrics usa DRIFT_REGISTRY
-start_bg_loop()
+    CYCLE_SECONDS.observe(time.perf_counter() - t0)
+    CYCLE_ROWS.inc(rows)
+    if ok:
+        CYCLES.labels(result="ok").inc()
+        LAST_SUCCESS.set_to_current_time()
+    else:
+        CYCLES.labels(result="no_data" if ok is None else "error").inc()
+    return ok
@@ -0,0 +1,147 @@
+# src/monitoring/drift_stats.py
+"""Estatísticas de drift vetorizadas (NumPy/SciPy), sem Evidently.
+
+Todas as funções numéricas trabalham sobre arrays já ordenados, para que a
+referência seja ordenada uma única vez e reaproveitada entre ciclos/janelas.
+
+- KS (2 amostras): estatística D pelas CDFs empíricas; p-valor assintótico (kstwo).
+- PSI: bins por quantis da referência.
+- Wasserstein-1: área entre as CDFs; também normalizada pelo desvio da referência
+  (mesma convenção do Evidently: drift se > 0.1).
+- Qui-quadrado: para features categóricas (contagens por categoria).
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+DEFAULT_ALPHA = 0.05
+
+
+def sorted_values(x) -> np.ndarray:
+    a = np.asarray(x, dtype=float)
+    a = a[np.isfinite(a)]
+    a.sort()
+    return a
+
+
+def ks_2samp_sorted(
+    ref: np.ndarray,
+    cur: np.ndarray,
+    n_ref: Optional[int] = None,
+    n_cur: Optional[int] = None,
+) -> tuple[float, float]:
+    """KS de duas amostras a partir de arrays ordenados.
+
+    `n_ref`/`n_cur` permitem informar o tamanho real quando os arrays são
+    quantis resumidos (baseline compacto, sketches) em vez das amostras brutas.
+    """
+    n1, n2 = len(ref), len(cur)
+    if n1 == 0 or n2 == 0:
+        return float("nan"), float("nan")
+    grid = np.concatenate([ref, cur])
+    cdf1 = np.searchsorted(ref, grid, side="right") / n1
+    cdf2 = np.searchsorted(cur, grid, side="right") / n2
+    d = float(np.max(np.abs(cdf1 - cdf2)))
+    m, n = (n_ref or n1), (n_cur or n2)
+    en = m * n / (m + n)
+    p = float(stats.kstwo.sf(d, np.round(en))) if en >= 1 else 1.0
+    return d, min(max(p, 0.0), 1.0)
+
+
+def psi_sorted(ref: np.ndarray, cur: np.ndarray, bins: int = 10, eps: float = 1e-4) -> float:
+    """Population Stability Index com bins nos quantis da referência."""
+    if len(ref) == 0 or len(cur) == 0:
+        return float("nan")
+    edges = np.unique(ref[np.linspace(0, len(ref) - 1, bins + 1).astype(int)[1:-1]])
+    # contagens por bin via searchsorted (arrays já ordenados)
+    r = np.diff(np.concatenate([[0], np.searchsorted(ref, edges, side="right"), [len(ref)]]))
+    c = np.diff(np.concatenate([[0], np.searchsorted(cur, edges, side="right"), [len(cur)]]))
+    pr = np.maximum(r / len(ref), eps)
+    pc = np.maximum(c / len(cur), eps)
+    return float(np.sum((pc - pr) * np.log(pc / pr)))
+
+
+def wasserstein_sorted(ref: np.ndarray, cur: np.ndarray) -> float:
+    """Distância Wasserstein-1 (área entre as CDFs empíricas)."""
+    if len(ref) == 0 or len(cur) == 0:
+        return float("nan")
+    grid = np.concatenate([ref, cur])
+    grid.sort(kind="mergesort")
+    deltas = np.diff(grid)
+    cdf1 = np.searchsorted(ref, grid[:-1], side="right") / len(ref)
+    cdf2 = np.searchsorted(cur, grid[:-1], side="right") / len(cur)
+    return float(np.sum(np.abs(cdf1 - cdf2) * deltas))
+
+
+def chi2_test(ref_counts: pd.Series, cur_counts: pd.Series) -> tuple[float, float]:
+    """Qui-quadrado de homogeneidade entre duas distribuições categóricas."""
+    cats = ref_counts.index.union(cur_counts.index)
+    table = np.vstack(
+        [ref_counts.reindex(cats, fill_value=0).to_numpy(),
+         cur_counts.reindex(cats, fill_value=0).to_numpy()]
+    ).astype(float)
+    table = table[:, table.sum(axis=0) > 0]
+    if table.shape[1] < 2 or (table.sum(axis=1) == 0).any():
+        return 0.0, 1.0
+    chi2, p, _, _ = stats.chi2_contingency(table, correction=False)
+    return float(chi2), float(p)
+
+
+def numeric_drift(
+    ref_sorted: np.ndarray,
+    cur_sorted: np.ndarray,
+    alpha: float = DEFAULT_ALPHA,
+    n_ref: Optional[int] = None,
+    n_cur: Optional[int] = None,
+) -> dict:
+    d, p = ks_2samp_sorted(ref_sorted, cur_sorted, n_ref=n_ref, n_cur=n_cur)
+    w = wasserstein_sorted(ref_sorted, cur_sorted)
+    std = float(np.std(ref_sorted)) if len(ref_sorted) else 0.0
+    return {
+        "test": "ks",
+        "statistic": d,
+        "p_value": p,
+        "psi": psi_sorted(ref_sorted, cur_sorted),
+        "wasserstein": w,
+        "wasserstein_norm": w / std if std > 0 else float("nan"),
+        "drift_detected": bool(p < alpha) if np.isfinite(p) else False,
+    }
+
+
+def categorical_drift(ref: pd.Series, cur: pd.Series, alpha: float = DEFAULT_ALPHA) -> dict:
+    chi2, p = chi2_test(ref.value_counts(), cur.value_counts())
+    return {"test": "chi2", "statistic": chi2, "p_value": p, "drift_detected": bool(p < alpha)}
+
+
+def compute_drift(
+    ref: pd.DataFrame,
+    cur: pd.DataFrame,
+    features: Iterable[str],
+    alpha: float = DEFAULT_ALPHA,
+    ref_sorted: Optional[Dict[str, np.ndarray]] = None,
+    ref_n: Optional[Dict[str, int]] = None,
+) -> Dict[str, dict]:
+    """Drift por feature; features sem dados em algum lado são omitidas.
+
+    `ref_sorted` pode trazer a referência já ordenada (cache entre ciclos) e
+    `ref_n` o tamanho real dela, quando `ref_sorted` traz quantis resumidos.
+    """
+    out: Dict[str, dict] = {}
+    for col in features:
+        if col not in ref or col not in cur:
+            continue
+        if ref[col].dtype == object or cur[col].dtype == object:
+            r, c = ref[col].dropna(), cur[col].dropna()
+            if len(r) and len(c):
+                out[col] = categorical_drift(r, c, alpha)
+            continue
+        rs = ref_sorted[col] if ref_sorted and col in ref_sorted else sorted_values(ref[col])
+        cs = sorted_values(cur[col])
+        if len(rs) == 0 or len(cs) == 0:
+            continue
+        out[col] = numeric_drift(rs, cs, alpha, n_ref=(ref_n or {}).get(col))
+    return out
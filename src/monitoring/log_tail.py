@@ -0,0 +1,113 @@
+# src/monitoring/log_tail.py
+"""Leitura incremental do requests_log.csv (estilo `tail -f`).
+
+Guarda o offset em bytes e a identidade do arquivo (device/inode). A cada
+ciclo lê só os bytes novos (até a última linha completa) e os empurra para um
+ring buffer com as últimas `max_rows` linhas. Rotação (inode novo) ou
+truncamento (tamanho < offset) reiniciam a leitura do novo arquivo; o buffer
+é mantido, pois continua representando as linhas mais recentes.
+
+O custo de cada ciclo depende só dos bytes novos (limitados a uma janela
+proporcional a `max_rows`), não do tamanho total do log.
+"""
+from __future__ import annotations
+
+import io
+import os
+from collections import deque
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+DEFAULT_COLUMNS = ["ts", "endpoint", "cv_len", "job_len", "score"]
+
+
+class LogTail:
+    def __init__(self, path: Path, max_rows: int = 5000, max_row_bytes: int = 256):
+        self.path = Path(path)
+        self.max_rows = int(max_rows)
+        # acima disso, bytes antigos são pulados: não cabem na janela mesmo
+        self.max_read_bytes = self.max_rows * int(max_row_bytes)
+        self.columns: List[str] = list(DEFAULT_COLUMNS)
+        self._rows: deque = deque(maxlen=self.max_rows)
+        self._ident: Optional[Tuple[int, int]] = None
+        self._offset = 0
+        self.total_rows = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _open_new(self, f):
+        """Arquivo novo/rotacionado: lê o header; refresh() pula direto para o fim."""
+        header = f.readline()
+        if header.endswith(b"\n"):
+            cols = header.decode("utf-8", errors="replace").strip().split(",")
+            if cols and cols[0] and cols != self.columns:
+                # layout mudou: linhas antigas não cabem nas colunas novas
+                self.columns = cols
+                self._rows.clear()
+            self._offset = f.tell()
+        else:
+            # header ainda incompleto: tenta de novo no próximo ciclo
+            self._ident = None
+            self._offset = 0
+
+    def refresh(self) -> int:
+        """Incorpora as linhas novas ao buffer; retorna quantas foram lidas."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        ident = (st.st_dev, st.st_ino)
+        with open(self.path, "rb") as f:
+            if ident != self._ident or st.st_size < self._offset:
+                self._ident = ident
+                self._open_new(f)
+                if self._offset == 0:
+                    return 0
+
+            pending = st.st_size - self._offset
+            if pending <= 0:
+                return 0
+            at_line_start = True
+            if pending > self.max_read_bytes:
+                self._offset = st.st_size - self.max_read_bytes
+                pending = self.max_read_bytes
+                # o byte anterior diz se o salto caiu no início de uma linha
+                f.seek(self._offset - 1)
+                at_line_start = f.read(1) == b"\n"
+            f.seek(self._offset)
+            chunk = f.read(pending)
+
+        if not at_line_start:
+            # caiu no meio de uma linha: descarta até o próximo \n
+            nl = chunk.find(b"\n")
+            if nl < 0:
+                return 0
+            self._offset += nl + 1
+            chunk = chunk[nl + 1:]
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return 0
+        self._offset += end + 1
+        return self._ingest(chunk[: end + 1])
+
+    def _ingest(self, data: bytes) -> int:
+        if not data.strip():
+            return 0
+        new = pd.read_csv(
+            io.BytesIO(data),
+            header=None,
+            names=self.columns,
+            dtype=str,
+            on_bad_lines="skip",
+            skip_blank_lines=True,
+        )
+        self._rows.extend(new.itertuples(index=False, name=None))
+        self.total_rows += len(new)
+        return len(new)
+
+    def frame(self) -> pd.DataFrame:
+        """Janela atual (até max_rows linhas), como strings; o chamador converte."""
+        return pd.DataFrame(list(self._rows), columns=self.columns)
@@ -0,0 +1,138 @@
+# src/monitoring/report_worker.py
+"""Renderização dos relatórios HTML do Evidently fora do ciclo de drift.
+
+- `ReportWorker`: processo separado (spawn) que recebe (referência, janela)
+  por uma fila de tamanho 1. `submit()` nunca bloqueia: se já houver um
+  pedido pendente, o novo é descartado (o próximo ciclo manda outro).
+- `ReportPolicy`: só pede relatório quando o status de drift muda ou quando
+  passa a cadência configurada.
+- `enforce_retention`: mantém no máximo N arquivos e M bytes em `drift_reports`.
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import queue
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+import pandas as pd
+
+REPORT_GLOB = "drift_*.html"
+
+
+def enforce_retention(reports_dir: Path, keep: int, max_bytes: int) -> int:
+    """Apaga os relatórios mais antigos até caber em `keep` arquivos e `max_bytes`."""
+    try:
+        files = sorted(
+            ((p.stat().st_mtime, p.stat().st_size, p) for p in Path(reports_dir).glob(REPORT_GLOB)),
+            reverse=True,
+        )
+    except OSError:
+        return 0
+    removed, total = 0, 0
+    for i, (_, size, p) in enumerate(files):
+        total += size
+        if (keep > 0 and i >= keep) or (max_bytes > 0 and total > max_bytes):
+            try:
+                p.unlink()
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def render_report(ref: pd.DataFrame, cur: pd.DataFrame, out: Path):
+    """Roda o DataDriftPreset e grava o HTML de forma atômica."""
+    from evidently.report import Report
+    from evidently.metric_preset import DataDriftPreset
+
+    report = Report(metrics=[DataDriftPreset()])
+    report.run(reference_data=ref, current_data=cur)
+    tmp = out.with_name(f".{out.name}.tmp")
+    report.save_html(str(tmp))
+    os.replace(tmp, out)
+
+
+def _worker_main(q, reports_dir: str, keep: int, max_bytes: int):
+    reports = Path(reports_dir)
+    while True:
+        job = q.get()
+        if job is None:
+            return
+        ref, cur, ts = job
+        try:
+            reports.mkdir(parents=True, exist_ok=True)
+            render_report(ref, cur, reports / f"drift_{int(ts)}.html")
+        except Exception:
+            # sem evidently ou falha no render: segue esperando o próximo
+            pass
+        enforce_retention(reports, keep, max_bytes)
+
+
+class ReportWorker:
+    def __init__(self, reports_dir: Path, keep: int = 20, max_bytes: int = 200 * 1024 * 1024):
+        self.reports_dir = Path(reports_dir)
+        self.keep = int(keep)
+        self.max_bytes = int(max_bytes)
+        self._ctx = mp.get_context("spawn")
+        self._queue = None
+        self._proc = None
+
+    def start(self):
+        self._queue = self._ctx.Queue(maxsize=1)
+        self._proc = self._ctx.Process(
+            target=_worker_main,
+            args=(self._queue, str(self.reports_dir), self.keep, self.max_bytes),
+            name="drift-report-worker",
+            daemon=True,
+        )
+        self._proc.start()
+
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    def submit(self, ref: pd.DataFrame, cur: pd.DataFrame, ts: Optional[float] = None) -> bool:
+        """Enfileira um relatório sem esperar; False se descartado."""
+        if not self.alive():
+            self.start()
+        try:
+            self._queue.put_nowait((ref, cur, time.time() if ts is None else ts))
+            return True
+        except queue.Full:
+            return False
+
+    def stop(self, timeout: float = 5.0):
+        if self._proc is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._proc.join(timeout)
+        if self._proc.is_alive():
+            self._proc.terminate()
+            self._proc.join(1.0)
+        self._proc = None
+        self._queue = None
+
+
+class ReportPolicy:
+    """Relatório quando o status (features com drift) muda ou a cada `every_seconds`."""
+
+    def __init__(self, every_seconds: float = 3600.0):
+        self.every_seconds = float(every_seconds)
+        self._status: Optional[Tuple] = None
+        self._last: Optional[float] = None
+
+    def should_render(self, status: Tuple, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        if self._last is None or status != self._status:
+            return True
+        return self.every_seconds > 0 and now - self._last >= self.every_seconds
+
+    def mark(self, status: Tuple, now: Optional[float] = None):
+        """Registra que o relatório deste status foi enfileirado."""
+        self._status = status
+        self._last = time.time() if now is None else now
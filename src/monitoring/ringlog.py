@@ -0,0 +1,254 @@
+# src/monitoring/ringlog.py
+"""Ring buffer binário (mmap) para o log de requisições API -> drift service.
+
+Layout do arquivo:
+    header (64 bytes): magic, versão, tamanho do registro, capacidade, seq
+    capacidade x registro (RECORD_DTYPE, tamanho fixo; a versão do modelo vai
+    como digest, ver `version_digest`)
+
+`seq` é o total de registros já escritos (monotônico); o registro de número
+`s` fica no slot `s % capacidade`. O escritor grava os dados e só depois
+avança `seq`, sob lock (thread + fcntl entre processos/workers). O leitor
+mapeia o arquivo em modo leitura e vê os registros como array estruturado do
+NumPy, sem parse; registros que o escritor pode ter sobrescrito durante a
+leitura (volta completa no anel) são descartados comparando `seq` antes/depois.
+
+CLI (exporta para CSV legível):
+    python -m src.monitoring.ringlog export /monitoring/requests.ring --out log.csv [--last 10000]
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:  # lock entre processos (POSIX); no Windows fica só o lock de thread
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+MAGIC = b"DMRING01"
+VERSION = 2
+HEADER_SIZE = 64
+_HEADER = struct.Struct("<8sIIQQ")  # magic, versão, tamanho do registro, capacidade, seq
+_SEQ_OFFSET = 24
+
+RECORD_DTYPE = np.dtype([
+    ("ts", "<f8"),
+    ("endpoint", "<u2"),
+    ("cv_len", "<u4"),
+    ("job_len", "<u4"),
+    ("score", "<f4"),
+    ("model_version", "S16"),
+    ("word_nnz", "<f4"),
+    ("char_nnz", "<f4"),
+    ("oov_rate", "<f4"),
+])
+TEXT_FIELDS = ["word_nnz", "char_nnz", "oov_rate"]
+
+ENDPOINT_CODES: Dict[str, int] = {"/score": 1, "/rank-candidates": 2, "/score-batch": 3}
+ENDPOINT_NAMES: Dict[int, str] = {v: k for k, v in ENDPOINT_CODES.items()}
+
+
+def version_digest(model_version: str) -> bytes:
+    """Identificador de tamanho fixo da versão (16 hex do blake2b), gravado no registro.
+
+    Cortar a versão em 16 bytes fazia versões com o mesmo prefixo colidirem;
+    para filtrar por versão compare com `version_digest(v)`.
+    """
+    return hashlib.blake2b(model_version.encode("utf-8"), digest_size=8).hexdigest().encode("ascii")
+
+
+def make_records(rows, model_version: str = "") -> np.ndarray:
+    """Linhas [ts, endpoint, cv_len, job_len, score, (word_nnz, char_nnz, oov_rate)] -> array estruturado.
+
+    Campos de texto ausentes ou vazios ("") viram NaN.
+    """
+    rec = np.zeros(len(rows), dtype=RECORD_DTYPE)
+    if not len(rows):
+        return rec
+    cols = list(zip(*rows))
+    ts, endpoint, cv, job, score = cols[:5]
+    for i, name in enumerate(TEXT_FIELDS, start=5):
+        rec[name] = [np.nan if v == "" else v for v in cols[i]] if i < len(cols) else np.nan
+    rec["ts"] = ts
+    rec["endpoint"] = [ENDPOINT_CODES.get(e, 0) for e in endpoint]
+    rec["cv_len"] = cv
+    rec["job_len"] = job
+    rec["score"] = score
+    rec["model_version"] = version_digest(model_version)
+    return rec
+
+
+def _create(path: Path, capacity: int):
+    """Cria o arquivo já inicializado; `os.link` garante que só um processo vence."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, capacity, 0).ljust(HEADER_SIZE, b"\0"))
+        f.truncate(HEADER_SIZE + capacity * RECORD_DTYPE.itemsize)
+    try:
+        os.link(tmp, path)
+    except FileExistsError:
+        pass
+    finally:
+        tmp.unlink()
+
+
+def _read_header(buf) -> Tuple[int, int]:
+    magic, version, rec_size, capacity, _ = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION or rec_size != RECORD_DTYPE.itemsize:
+        raise ValueError("arquivo não é um ring log compatível")
+    return capacity, rec_size
+
+
+def _compatible(path: Path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            _read_header(f.read(HEADER_SIZE).ljust(_HEADER.size, b"\0"))
+        return True
+    except (OSError, ValueError, struct.error):
+        return False
+
+
+class RingWriter:
+    def __init__(self, path: Path, capacity: int = 1_000_000):
+        self.path = Path(path)
+        if self.path.exists() and not _compatible(self.path):
+            # layout antigo (outra versão de registro): guarda e recomeça
+            os.replace(self.path, self.path.with_name(self.path.name + ".old"))
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            _create(self.path, int(capacity))
+        self._fh = open(self.path, "r+b")
+        self._mm = mmap.mmap(self._fh.fileno(), 0)
+        # capacidade de quem criou o arquivo prevalece
+        self.capacity, _ = _read_header(self._mm)
+        self._records = np.ndarray(
+            (self.capacity,), dtype=RECORD_DTYPE, buffer=self._mm, offset=HEADER_SIZE
+        )
+        self._lock = threading.Lock()
+
+    def _seq(self) -> int:
+        return struct.unpack_from("<Q", self._mm, _SEQ_OFFSET)[0]
+
+    def append(self, records: np.ndarray) -> int:
+        """Grava os registros (os mais recentes, se exceder a capacidade); devolve o novo seq."""
+        records = records[-self.capacity:]
+        n = len(records)
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._fh, fcntl.LOCK_EX)
+            try:
+                seq = self._seq()
+                start = seq % self.capacity
+                first = min(n, self.capacity - start)
+                self._records[start:start + first] = records[:first]
+                if first < n:
+                    self._records[: n - first] = records[first:]
+                struct.pack_into("<Q", self._mm, _SEQ_OFFSET, seq + n)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fh, fcntl.LOCK_UN)
+        return seq + n
+
+    def close(self):
+        self._records = None
+        self._mm.close()
+        self._fh.close()
+
+
+class RingReader:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fh = open(self.path, "rb")
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self.capacity, _ = _read_header(self._mm)
+        self._records = np.ndarray(
+            (self.capacity,), dtype=RECORD_DTYPE, buffer=self._mm, offset=HEADER_SIZE
+        )
+
+    @property
+    def seq(self) -> int:
+        return struct.unpack_from("<Q", self._mm, _SEQ_OFFSET)[0]
+
+    def _slice(self, lo: int, hi: int) -> np.ndarray:
+        """Registros [lo, hi) por número de sequência (view do mmap se não der a volta no anel)."""
+        if hi <= lo:
+            return self._records[:0]
+        a, b = lo % self.capacity, hi % self.capacity
+        if a < b or b == 0:
+            return self._records[a:b or self.capacity]
+        return np.concatenate([self._records[a:], self._records[:b]])
+
+    def read(self, since: int = 0, limit: Optional[int] = None) -> Tuple[np.ndarray, int]:
+        """Registros com seq em [since, head), no máximo os `limit` mais recentes.
+
+        Devolve (registros, head); passe `head` como `since` na próxima chamada.
+        """
+        head = self.seq
+        lo = max(since, head - self.capacity)
+        if limit is not None:
+            lo = max(lo, head - int(limit))
+        # copia antes de conferir: uma view do mmap ainda poderia ser sobrescrita
+        out = self._slice(lo, head).copy()
+        # o escritor pode ter dado a volta no anel enquanto copiávamos
+        overwritten = self.seq - self.capacity - lo
+        if overwritten > 0:
+            out = out[overwritten:] if overwritten < len(out) else out[:0]
+        return out, head
+
+    def latest(self, n: int) -> np.ndarray:
+        return self.read(0, limit=n)[0]
+
+    def close(self):
+        self._records = None
+        self._mm.close()
+        self._fh.close()
+
+
+def export_csv(ring_path: Path, out_path: Path, last: Optional[int] = None) -> int:
+    reader = RingReader(ring_path)
+    try:
+        recs, _ = reader.read(0, limit=last)
+        with open(out_path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            # o ring guarda só o digest da versão (ver `version_digest`)
+            w.writerow(
+                ["ts", "endpoint", "cv_len", "job_len", "score", "model_version_digest"] + TEXT_FIELDS
+            )
+            for r in recs:
+                w.writerow([
+                    f"{r['ts']:.3f}",
+                    ENDPOINT_NAMES.get(int(r["endpoint"]), "unknown"),
+                    int(r["cv_len"]),
+                    int(r["job_len"]),
+                    f"{float(r['score']):.6f}",
+                    r["model_version"].decode("utf-8", errors="replace"),
+                ] + ["" if np.isnan(r[c]) else f"{float(r[c]):.4f}" for c in TEXT_FIELDS])
+        return len(recs)
+    finally:
+        reader.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Ferramentas do ring log de monitoramento")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ex = sub.add_parser("export", help="exporta o ring para CSV")
+    ex.add_argument("ring", type=Path)
+    ex.add_argument("--out", type=Path, required=True)
+    ex.add_argument("--last", type=int, default=None, help="só os N registros mais recentes")
+    args = ap.parse_args(argv)
+    n = export_csv(args.ring, args.out, args.last)
+    print(f"[Ring] {n} registros exportados para {args.out}")
+
+
+if __name__ == "__main__":
+    main()
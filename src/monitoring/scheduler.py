@@ -0,0 +1,97 @@
+# src/monitoring/scheduler.py
+"""Agendador do ciclo de drift: dispara por volume ("N linhas novas") ou por
+tempo ("T segundos"), nunca com ciclos sobrepostos.
+
+- `probe()` é barato e devolve quantas linhas novas chegaram desde a última
+  chamada (ex.: LogTail.refresh()); o acumulado decide o disparo.
+- Passados T segundos sem nenhuma linha nova, o ciclo é pulado (`on_skip`).
+- Um único thread executa `job(rows)`; `trigger()` só antecipa o próximo ciclo,
+  então um ciclo lento atrasa o seguinte em vez de empilhar execuções.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class DriftScheduler:
+    def __init__(
+        self,
+        job: Callable[[int], object],
+        probe: Callable[[], int],
+        min_rows: int = 200,
+        max_interval: float = 60.0,
+        poll_seconds: float = 1.0,
+        on_skip: Optional[Callable[[], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.job = job
+        self.probe = probe
+        self.min_rows = int(min_rows)
+        self.max_interval = float(max_interval)
+        self.poll_seconds = float(poll_seconds)
+        self.on_skip = on_skip
+        self._clock = clock
+        self.pending_rows = 0
+        self._last_cycle = clock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._forced = False
+        self._thread: Optional[threading.Thread] = None
+
+    def due(self) -> bool:
+        """Atualiza o acumulado e diz se um ciclo deve rodar agora."""
+        try:
+            self.pending_rows += max(0, int(self.probe() or 0))
+        except Exception:
+            pass
+        if self._forced:
+            return True
+        if self.pending_rows >= self.min_rows:
+            return True
+        if self._clock() - self._last_cycle >= self.max_interval:
+            if self.pending_rows > 0:
+                return True
+            # nada novo: pula o ciclo e recomeça a contagem de tempo
+            self._last_cycle = self._clock()
+            if self.on_skip is not None:
+                self.on_skip()
+        return False
+
+    def step(self) -> bool:
+        """Um passo do loop; retorna True se o job rodou."""
+        if not self.due():
+            return False
+        rows, self.pending_rows, self._forced = self.pending_rows, 0, False
+        try:
+            self.job(rows)
+        except Exception:
+            # o job já registra a falha; o agendador segue vivo
+            pass
+        finally:
+            self._last_cycle = self._clock()
+        return True
+
+    def trigger(self):
+        """Pede um ciclo o quanto antes (sem sobrepor um que esteja rodando)."""
+        self._forced = True
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.step()
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="drift-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
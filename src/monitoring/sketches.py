@@ -0,0 +1,394 @@
+# src/monitoring/sketches.py
+"""Sketches de streaming (mergeáveis) para drift por janela sem linhas brutas.
+
+- `KLLSketch`: quantis aproximados (KLL, erro ~1/k no rank), memória O(k log n).
+- `FeatureSketch`: KLL + histograma de bins fixos de uma feature.
+- `SketchRecorder`: usado pela API; acumula por minuto e grava, de tempos em
+  tempos (thread própria após `start()`), `<dir>/<minuto>-<pid>.json` (escrita
+  atômica). Cada processo/worker grava o próprio arquivo, então não há disputa
+  de escrita.
+- `SketchStore`: usado pelo drift service; lê (com cache por mtime) e funde os
+  arquivos de uma janela arbitrária (5m, 1h, 1d...), com roll-ups por hora
+  fechada, além de aplicar a retenção.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+FEATURES = ["cv_len", "job_len", "score", "word_nnz", "char_nnz", "oov_rate"]
+
+# bins fixos (iguais em todos os processos, para os histogramas serem somáveis)
+_LEN_EDGES = np.concatenate([[0.0], np.geomspace(16, 65536, 25)])
+HIST_EDGES: Dict[str, np.ndarray] = {
+    "cv_len": _LEN_EDGES,
+    "job_len": _LEN_EDGES,
+    "score": np.linspace(0.0, 1.0, 21),
+    "word_nnz": np.concatenate([[0.0], np.geomspace(4, 8192, 23)]),
+    "char_nnz": np.concatenate([[0.0], np.geomspace(16, 32768, 23)]),
+    "oov_rate": np.linspace(0.0, 1.0, 21),
+}
+
+
+# =========================
+# KLL
+# =========================
+class KLLSketch:
+    def __init__(self, k: int = 200, c: float = 2.0 / 3.0, seed: Optional[int] = None):
+        self.k = int(k)
+        self.c = float(c)
+        self.n = 0
+        self.levels: List[List[float]] = [[]]
+        self._rng = random.Random(seed)
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - h - 1
+        return max(2, int(math.ceil(self.k * self.c ** depth)))
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def _size(self) -> int:
+        return sum(len(lv) for lv in self.levels)
+
+    def _compress(self):
+        while self._size() >= self._max_size():
+            for h, lv in enumerate(self.levels):
+                if len(lv) >= self._capacity(h):
+                    if h + 1 == len(self.levels):
+                        self.levels.append([])
+                    lv.sort()
+                    # sobe metade dos itens (peso dobra); sobra ímpar fica no nível
+                    keep = [lv.pop()] if len(lv) % 2 else []
+                    off = self._rng.randint(0, 1)
+                    self.levels[h + 1].extend(lv[off::2])
+                    self.levels[h] = keep
+                    break
+
+    def update(self, x: float):
+        self.levels[0].append(float(x))
+        self.n += 1
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def update_many(self, xs: Iterable[float]):
+        """Insere o lote de uma vez e compacta no fim (sem laço por valor)."""
+        vals = np.asarray(xs, dtype=float).ravel().tolist()
+        if not vals:
+            return
+        self.levels[0].extend(vals)
+        self.n += len(vals)
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, lv in enumerate(other.levels):
+            self.levels[h].extend(lv)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def weighted(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Itens ordenados e seus pesos (2^nível)."""
+        vals, ws = [], []
+        for h, lv in enumerate(self.levels):
+            vals.extend(lv)
+            ws.extend([1 << h] * len(lv))
+        v = np.asarray(vals, dtype=float)
+        w = np.asarray(ws, dtype=float)
+        order = np.argsort(v, kind="mergesort")
+        return v[order], w[order]
+
+    def quantiles(self, qs) -> np.ndarray:
+        v, w = self.weighted()
+        qs = np.asarray(qs, dtype=float)
+        if len(v) == 0:
+            return np.full(qs.shape, np.nan)
+        cum = np.cumsum(w)
+        idx = np.searchsorted(cum, qs * cum[-1], side="left")
+        return v[np.clip(idx, 0, len(v) - 1)]
+
+    def to_dict(self) -> dict:
+        return {"k": self.k, "n": self.n, "levels": self.levels}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "KLLSketch":
+        sk = cls(k=d.get("k", 200))
+        sk.n = int(d["n"])
+        sk.levels = [list(map(float, lv)) for lv in d["levels"]] or [[]]
+        return sk
+
+
+# =========================
+# Feature sketch
+# =========================
+class FeatureSketch:
+    def __init__(self, feature: str, k: int = 200):
+        self.feature = feature
+        self.edges = HIST_EDGES.get(feature, HIST_EDGES["score"])
+        self.kll = KLLSketch(k=k)
+        # bins internos + 2 de transbordo (abaixo/acima das bordas)
+        self.hist = np.zeros(len(self.edges) + 1, dtype=np.int64)
+
+    @property
+    def n(self) -> int:
+        return self.kll.n
+
+    def update_many(self, xs):
+        a = np.asarray(xs, dtype=float)
+        a = a[np.isfinite(a)]
+        if not len(a):
+            return
+        self.kll.update_many(a)
+        self.hist += histogram(self.feature, a)
+
+    def merge(self, other: "FeatureSketch") -> "FeatureSketch":
+        self.kll.merge(other.kll)
+        self.hist += other.hist
+        return self
+
+    def sample(self, max_points: int = 1000) -> np.ndarray:
+        """Quantis equiespaçados, como "amostra" ordenada para KS/Wasserstein."""
+        m = min(self.n, max_points)
+        if m == 0:
+            return np.array([], dtype=float)
+        return self.kll.quantiles((np.arange(m) + 0.5) / m)
+
+    def to_dict(self) -> dict:
+        return {"kll": self.kll.to_dict(), "hist": self.hist.tolist()}
+
+    @classmethod
+    def from_dict(cls, feature: str, d: dict) -> "FeatureSketch":
+        fs = cls(feature)
+        fs.kll = KLLSketch.from_dict(d["kll"])
+        fs.hist = np.asarray(d["hist"], dtype=np.int64)
+        return fs
+
+
+def histogram(feature: str, values) -> np.ndarray:
+    """Contagens nos bins fixos da feature (inclui transbordos nas pontas)."""
+    edges = HIST_EDGES.get(feature, HIST_EDGES["score"])
+    idx = np.searchsorted(edges, np.asarray(values, dtype=float), side="right")
+    return np.bincount(idx, minlength=len(edges) + 1)[: len(edges) + 1]
+
+
+def histogram_psi(ref_counts, cur_counts, eps: float = 1e-4) -> float:
+    r = np.asarray(ref_counts, dtype=float)
+    c = np.asarray(cur_counts, dtype=float)
+    if r.sum() == 0 or c.sum() == 0:
+        return float("nan")
+    pr = np.maximum(r / r.sum(), eps)
+    pc = np.maximum(c / c.sum(), eps)
+    return float(np.sum((pc - pr) * np.log(pc / pr)))
+
+
+# =========================
+# Gravação (API)
+# =========================
+def _atomic_write_json(path: Path, obj: dict):
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(obj, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class SketchRecorder:
+    """Acumula sketches por minuto e grava a cada `flush_seconds` (thread-safe).
+
+    Com `start()` a gravação roda numa thread daemon e `update` não faz IO;
+    sem ela, `update` grava quando o intervalo vence.
+    """
+
+    def __init__(
+        self,
+        out_dir: Path,
+        flush_seconds: float = 10.0,
+        k: int = 200,
+        features: Iterable[str] = FEATURES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.out_dir = Path(out_dir)
+        self.flush_seconds = float(flush_seconds)
+        self.k = k
+        self.features = list(features)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: Dict[int, Dict[str, FeatureSketch]] = {}
+        self._dirty: set = set()
+        self._last_flush = clock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def update(self, columns: Dict[str, Iterable[float]], ts: Optional[float] = None):
+        now = self._clock()
+        minute = int((ts if ts is not None else now) // 60) * 60
+        with self._lock:
+            bucket = self._buckets.get(minute)
+            if bucket is None:
+                bucket = self._buckets[minute] = {f: FeatureSketch(f, self.k) for f in self.features}
+            for f in self.features:
+                if f in columns:
+                    bucket[f].update_many(columns[f])
+            self._dirty.add(minute)
+        if self._thread is None and now - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sketch-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Para a thread de gravação e grava o que faltar."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_seconds + 1)
+        self.flush()
+
+    def flush(self):
+        """Grava os minutos alterados; minutos já encerrados saem da memória."""
+        now = self._clock()
+        current = int(now // 60) * 60
+        with self._lock:
+            self._last_flush = now
+            todo = {m: {f: s.to_dict() for f, s in self._buckets[m].items()} for m in self._dirty}
+            self._dirty.clear()
+            for m in [m for m in self._buckets if m < current]:
+                del self._buckets[m]
+        if not todo:
+            return
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            for minute, feats in todo.items():
+                _atomic_write_json(
+                    self.out_dir / f"{minute}-{os.getpid()}.json",
+                    {"minute": minute, "pid": os.getpid(), "features": feats},
+                )
+        except Exception:
+            # monitoramento nunca derruba a API
+            pass
+
+
+# =========================
+# Leitura/merge (drift service)
+# =========================
+_FILE_RE = re.compile(r"^(\d+)-(\d+)\.json$")
+_WINDOW_RE = re.compile(r"^(\d+)([smhd])$")
+_UNIT = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_window(spec: str) -> int:
+    """'5m' -> 300, '1h' -> 3600, '1d' -> 86400."""
+    m = _WINDOW_RE.match(spec.strip().lower())
+    if not m:
+        raise ValueError(f"janela inválida: {spec!r}")
+    return int(m.group(1)) * _UNIT[m.group(2)]
+
+
+# hora fechada há mais que isso não recebe mais gravações (flush da API é de segundos)
+_ROLLUP_GRACE = 300
+
+
+def _merge_into(merged: Dict[str, FeatureSketch], sk: Dict[str, FeatureSketch]):
+    for f, s in sk.items():
+        if f not in merged:
+            merged[f] = FeatureSketch(f, s.kll.k)
+        merged[f].merge(s)
+
+
+class SketchStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._cache: Dict[str, Tuple[int, Dict[str, FeatureSketch]]] = {}
+        # roll-up por hora fechada: hora -> (arquivos fundidos, sketches)
+        self._hours: Dict[int, Tuple[frozenset, Dict[str, FeatureSketch]]] = {}
+
+    def _files(self) -> List[Tuple[int, Path]]:
+        if not self.root.exists():
+            return []
+        out = []
+        for p in self.root.iterdir():
+            m = _FILE_RE.match(p.name)
+            if m:
+                out.append((int(m.group(1)), p))
+        return out
+
+    def _read(self, path: Path) -> Optional[Dict[str, FeatureSketch]]:
+        try:
+            mtime = path.stat().st_mtime_ns
+            hit = self._cache.get(path.name)
+            if hit and hit[0] == mtime:
+                return hit[1]
+            d = json.loads(path.read_text(encoding="utf-8"))
+            sk = {f: FeatureSketch.from_dict(f, v) for f, v in d["features"].items()}
+            self._cache[path.name] = (mtime, sk)
+            return sk
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _hour(self, hour: int, paths: List[Path]) -> Dict[str, FeatureSketch]:
+        """Roll-up de uma hora fechada; refeito só se o conjunto de arquivos mudar."""
+        names = frozenset(p.name for p in paths)
+        hit = self._hours.get(hour)
+        if hit and hit[0] == names:
+            return hit[1]
+        merged: Dict[str, FeatureSketch] = {}
+        for path in sorted(paths):
+            sk = self._read(path)
+            if sk:
+                _merge_into(merged, sk)
+        self._hours[hour] = (names, merged)
+        return merged
+
+    def window(self, seconds: int, now: Optional[float] = None) -> Dict[str, FeatureSketch]:
+        """Funde os minutos em [now - seconds, now]; não altera os sketches em cache.
+
+        Horas inteiras dentro da janela e já fechadas entram pelo roll-up em cache
+        (uma janela de 1d funde ~24 roll-ups, não ~1440 x workers arquivos).
+        """
+        now = time.time() if now is None else now
+        start = now - seconds
+        merged: Dict[str, FeatureSketch] = {}
+        hours: Dict[int, List[Path]] = {}
+        for minute, path in sorted(self._files()):
+            # minuto parcialmente dentro da janela conta inteiro
+            if minute + 60 <= start or minute > now:
+                continue
+            hour = minute - minute % 3600
+            if hour + 60 > start and hour + 3600 + _ROLLUP_GRACE <= now:
+                hours.setdefault(hour, []).append(path)
+                continue
+            sk = self._read(path)
+            if sk:
+                _merge_into(merged, sk)
+        for hour, paths in sorted(hours.items()):
+            _merge_into(merged, self._hour(hour, paths))
+        return merged
+
+    def prune(self, retention_seconds: int, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        removed = 0
+        for minute, path in self._files():
+            if minute + 60 <= now - retention_seconds:
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+                self._cache.pop(path.name, None)
+        for hour in [h for h in self._hours if h + 3600 <= now - retention_seconds]:
+            del self._hours[hour]
+        return removed
@@ -0,0 +1,168 @@
+# src/monitoring/text_stats.py
+"""Estatísticas de vocabulário por linha, como subproduto da vetorização.
+
+- nnz por vetorizador (word/char): sai de graça da matriz CSR já calculada
+  (contagem de índices por faixa de colunas, via indptr).
+- taxa de OOV: fração dos tokens (unigramas) fora do `vocabulary_` do TF-IDF
+  de palavras; exige re-tokenizar o texto, por isso é amostrada.
+- tokens não vistos mais frequentes: contados por documento (um CV conta uma
+  vez por token) e só publicados a partir de `min_docs` documentos, para não
+  expor termos raros/pessoais (ex.: nomes).
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+TEXT_FEATURES = ["word_nnz", "char_nnz", "oov_rate"]
+OOV_FILE_PREFIX = "oov_tokens"
+
+
+def staged_parts(model) -> Optional[Tuple[object, object, object]]:
+    """(concat, vectorize, clf) se o modelo for a pipeline do projeto; senão None."""
+    steps = getattr(model, "named_steps", None)
+    if not steps or len(steps) != 3 or "concat" not in steps or "vectorize" not in steps:
+        return None
+    if not hasattr(steps["vectorize"], "output_indices_"):
+        return None
+    return steps["concat"], steps["vectorize"], model[-1]
+
+
+def _word_vectorizer(ct):
+    for name, trans, _ in getattr(ct, "transformers_", []):
+        if name == "tfidf_word" and hasattr(trans, "vocabulary_"):
+            return trans
+    return None
+
+
+def nnz_by_vectorizer(X, ct) -> Dict[str, np.ndarray]:
+    """nnz por linha em cada faixa de colunas do ColumnTransformer (word/char)."""
+    X = sp.csr_matrix(X)
+    out = {}
+    for name, sl in ct.output_indices_.items():
+        if sl.stop <= sl.start:
+            continue
+        inside = (X.indices >= sl.start) & (X.indices < sl.stop)
+        csum = np.concatenate([[0], np.cumsum(inside, dtype=np.int64)])
+        out[name] = csum[X.indptr[1:]] - csum[X.indptr[:-1]]
+    return out
+
+
+def oov_rates(texts: Iterable[str], vect) -> Tuple[np.ndarray, List[set]]:
+    """Fração de unigramas fora do vocabulário e o conjunto de tokens não vistos por linha."""
+    tokenize = vect.build_tokenizer()
+    vocab = vect.vocabulary_
+    rates, unseen = [], []
+    for t in texts:
+        toks = tokenize(t)
+        miss = [w for w in toks if w not in vocab]
+        rates.append(len(miss) / len(toks) if toks else np.nan)
+        unseen.append(set(miss))
+    return np.asarray(rates, dtype=float), unseen
+
+
+def text_stats(
+    ct, X, texts: Optional[pd.Series] = None, index=None, max_rows: Optional[int] = None
+) -> Tuple[pd.DataFrame, List[set]]:
+    """DataFrame (word_nnz, char_nnz, oov_rate) alinhado a `index`.
+
+    Sem `texts`, a taxa de OOV fica NaN (linha não amostrada). Com `max_rows`,
+    só até `max_rows` linhas igualmente espaçadas passam pela re-tokenização.
+    """
+    nnz = nnz_by_vectorizer(X, ct)
+    n = X.shape[0]
+    df = pd.DataFrame(
+        {
+            "word_nnz": nnz.get("tfidf_word", np.full(n, np.nan)),
+            "char_nnz": nnz.get("tfidf_char", np.full(n, np.nan)),
+            "oov_rate": np.nan,
+        },
+        index=index,
+    ).astype(float)
+    unseen: List[set] = []
+    vect = _word_vectorizer(ct)
+    if texts is not None and vect is not None:
+        pos = np.arange(n)
+        if max_rows is not None and n > max_rows:
+            pos = np.unique(np.linspace(0, n - 1, max(int(max_rows), 1)).astype(np.int64))
+        rates, unseen = oov_rates((texts.iloc[i] for i in pos), vect)
+        df.iloc[pos, df.columns.get_loc("oov_rate")] = rates
+    return df, unseen
+
+
+class OOVTracker:
+    """Contagem (por documento) de tokens fora do vocabulário, com memória limitada."""
+
+    def __init__(
+        self,
+        out_dir: Path,
+        capacity: int = 5000,
+        flush_seconds: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.out_dir = Path(out_dir)
+        self.capacity = int(capacity)
+        self.flush_seconds = float(flush_seconds)
+        self._clock = clock
+        self._counts: Counter = Counter()
+        self._docs = 0
+        self._lock = threading.Lock()
+        self._last_flush = clock()
+
+    def update(self, unseen: Iterable[set]):
+        with self._lock:
+            for toks in unseen:
+                self._docs += 1
+                self._counts.update(toks)
+            if len(self._counts) > 2 * self.capacity:
+                # poda: mantém só os mais frequentes
+                self._counts = Counter(dict(self._counts.most_common(self.capacity)))
+        if self._clock() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Grava `oov_tokens-<pid>.json` (acumulado do processo) de forma atômica."""
+        with self._lock:
+            self._last_flush = self._clock()
+            payload = {
+                "pid": os.getpid(),
+                "ts": self._last_flush,
+                "docs": self._docs,
+                "tokens": dict(self._counts.most_common(self.capacity)),
+            }
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            path = self.out_dir / f"{OOV_FILE_PREFIX}-{os.getpid()}.json"
+            tmp = path.with_name(f".{path.name}.tmp")
+            tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except Exception:
+            pass
+
+
+def merge_oov_files(root: Path, top: int = 50, min_docs: int = 5) -> dict:
+    """Soma os arquivos de todos os processos e devolve os tokens mais frequentes."""
+    counts: Counter = Counter()
+    docs = 0
+    for p in Path(root).glob(f"{OOV_FILE_PREFIX}-*.json"):
+        try:
+            d = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        docs += int(d.get("docs", 0))
+        counts.update(d.get("tokens", {}))
+    tokens = [
+        {"token": t, "docs": c, "doc_rate": c / docs if docs else 0.0}
+        for t, c in counts.most_common()
+        if c >= min_docs
+    ][:top]
+    return {"sampled_docs": docs, "tokens": tokens}
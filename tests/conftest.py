@@ -0,0 +1,20 @@
+# tests/conftest.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modeling.pipeline import TEXT_COLS, build_pipeline
+
+
+def _fit(n=200, vocab=10, seed=0):
+    rng = np.random.default_rng(seed)
+    words = [f"w{i}" for i in range(vocab)]
+    df = pd.DataFrame({c: [" ".join(rng.choice(words, 6)) for _ in range(n)] for c in TEXT_COLS})
+    y = (np.arange(n) % 2).astype(int)
+    return build_pipeline().fit(df, y), df
+
+
+@pytest.fixture
+def fit_pipeline():
+    """Pipeline pequena treinada (vocabulário w0..w{vocab-1}): fit_pipeline(n, vocab, seed) -> (pipe, df)."""
+    return _fit
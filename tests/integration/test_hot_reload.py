@@ -0,0 +1,95 @@
+# tests/integration/test_hot_reload.py
+import json
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.dummy import DummyClassifier
+from sklearn.pipeline import Pipeline
+
+import src.api.main as m
+from src.api.reload import ArtifactWatcher
+
+SCORE_PAYLOAD = {"cv_pt": "python", "titulo_vaga": "backend"}
+
+
+def _write_artifacts(tmp_path, version: str, positive_rate: float, thr: float):
+    n = 10
+    y = np.array([1] * int(n * positive_rate) + [0] * (n - int(n * positive_rate)))
+    pipe = Pipeline([("clf", DummyClassifier(strategy="prior"))]).fit(np.zeros((n, 1)), y)
+    joblib.dump(pipe, tmp_path / "model.joblib")
+    (tmp_path / "metadata.json").write_text(
+        json.dumps({"model_version": version, "ranking": {"threshold_topk": thr, "target_k": 4}}),
+        encoding="utf-8",
+    )
+
+
+@pytest.fixture()
+def artifacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(m, "MODEL_PATH", tmp_path / "model.joblib")
+    monkeypatch.setattr(m, "META_PATH", tmp_path / "metadata.json")
+    monkeypatch.setattr(m, "STAGE1_PATH", tmp_path / "model_stage1.joblib")
+    monkeypatch.delenv("THRESHOLD_TOPK", raising=False)
+    monkeypatch.delenv("TARGET_K", raising=False)
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    before = m._snapshot()
+    yield tmp_path
+    m._swap_state(*before)
+
+
+def test_admin_reload_swaps_model_and_reports_version(artifacts):
+    _write_artifacts(artifacts, "v1", 0.2, 0.3)
+    m.load_model()
+    client = TestClient(m.app)
+
+    r = client.post("/score", json=SCORE_PAYLOAD)
+    assert r.headers["X-Model-Version"] == "v1"
+    assert r.json()["score"] == pytest.approx(0.2)
+
+    _write_artifacts(artifacts, "v2", 0.7, 0.5)
+    # serve o modelo antigo até o reload
+    assert client.post("/score", json=SCORE_PAYLOAD).headers["X-Model-Version"] == "v1"
+
+    r = client.post("/admin/reload?wait=true", headers={"X-Admin-Token": "s3cret"})
+    assert r.status_code == 202
+    assert r.json()["model_version"] == "v2"
+
+    h = client.get("/health").json()
+    assert h["model_version"] == "v2" and h["threshold_topk"] == 0.5
+    r = client.post("/score", json=SCORE_PAYLOAD)
+    assert r.headers["X-Model-Version"] == "v2"
+    assert r.json()["score"] == pytest.approx(0.7)
+
+
+def test_admin_reload_requires_token(artifacts, monkeypatch):
+    client = TestClient(m.app)
+    assert client.post("/admin/reload").status_code == 401
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "x"}).status_code == 401
+    monkeypatch.delenv("ADMIN_TOKEN")
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "s3cret"}).status_code == 403
+
+
+def test_failed_reload_keeps_serving_old_model(artifacts):
+    _write_artifacts(artifacts, "v1", 0.2, 0.3)
+    m.load_model()
+    (artifacts / "model.joblib").write_bytes(b"corrompido")
+    assert m.reload_model() is False
+    assert m._snapshot().version == "v1"
+
+
+def test_watcher_waits_for_stable_change(tmp_path):
+    f = tmp_path / "model.joblib"
+    f.write_bytes(b"a")
+    calls = []
+    w = ArtifactWatcher([f], 0.01, lambda: calls.append(1) or True)
+
+    w.poll()
+    assert calls == []
+    f.write_bytes(b"abc")
+    w.poll()           # 1ª leitura da mudança: ainda pode estar sendo copiado
+    assert calls == []
+    w.poll()           # estável -> dispara
+    assert calls == [1]
+    w.poll()
+    assert calls == [1]
@@ -0,0 +1,41 @@
+# tests/unit/test_accounting.py
+import numpy as np
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+import src.api.main as m
+from src.api.accounting import account, server_timing
+
+
+def test_account_measures_cpu_and_peak_allocation():
+    with account(alloc=True) as usage:
+        buf = np.ones(4 * 2**20 // 8)  # 4 MiB
+        sum(range(200_000))
+        del buf
+    assert usage.cpu_seconds > 0
+    assert usage.peak_bytes >= 4 * 2**20
+
+    with account(alloc=False) as usage:
+        pass
+    assert usage.peak_bytes is None
+    header = server_timing(0.0123, usage)
+    assert header.startswith("app;dur=12.3, cpu;dur=")
+
+
+def test_endpoint_exports_histograms_and_server_timing(monkeypatch):
+    monkeypatch.setattr(m, "_alloc_sample", 1.0)
+
+    def count(name):
+        return REGISTRY.get_sample_value(name, {"endpoint": "/score-batch"}) or 0.0
+
+    cpu0 = count("dm_api_request_cpu_seconds_count")
+    alloc0 = count("dm_api_request_alloc_peak_bytes_count")
+    r = TestClient(m.app).post("/score-batch", json=[{"cv_pt": "python"}, {"cv_pt": "sql"}])
+    assert r.status_code == 200
+    timing = r.headers["server-timing"]
+    assert "app;dur=" in timing and "cpu;dur=" in timing and 'alloc;desc="peak' in timing
+    assert count("dm_api_request_cpu_seconds_count") == cpu0 + 1
+    assert count("dm_api_request_alloc_peak_bytes_count") == alloc0 + 1
+
+    # rotas sem contabilidade não recebem o header
+    assert "server-timing" not in TestClient(m.app).get("/health").headers
@@ -0,0 +1,98 @@
+# tests/unit/test_baseline_profile.py
+import csv
+import os
+from importlib import reload
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from src.monitoring.baseline import (
+    build_profile, load_profile, profile_counts, profile_sample, profile_sorted, profile_to_frame,
+    save_profile,
+)
+
+
+def _frame(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "cv_len": rng.integers(100, 3000, n),
+        "job_len": rng.integers(200, 1500, n),
+        "score": rng.beta(2, 5, n),
+    })
+
+
+def test_profile_roundtrip_is_compact(tmp_path):
+    df = _frame()
+    df.loc[:10, "score"] = np.nan  # linhas sem score out-of-fold
+    path = tmp_path / "baseline_profile.json"
+    save_profile(build_profile(df, ["cv_len", "job_len", "score"]), path)
+
+    prof = load_profile(path)
+    assert profile_counts(prof) == {"cv_len": 5000, "job_len": 5000, "score": 4989}
+    q = profile_sorted(prof)["cv_len"]
+    assert np.all(np.diff(q) >= 0) and q[0] == df["cv_len"].min()
+    assert sum(prof["features"]["score"]["hist"]) == 4989
+    # tamanho constante, independente do nº de linhas do treino
+    assert path.stat().st_size < 120_000
+
+
+def test_profile_skips_features_without_data():
+    df = _frame(100).assign(score=np.nan)
+    prof = build_profile(df, ["cv_len", "job_len", "score"])
+    assert "score" not in prof["features"]
+    frame = profile_to_frame(prof, ["cv_len", "job_len", "score"])
+    assert frame["score"].isna().all() and len(frame) == 1001
+
+
+def test_profile_keeps_real_sample_for_evidently():
+    df = _frame(5000)
+    df.loc[:99, "score"] = np.nan
+    prof = build_profile(df, ["cv_len", "job_len", "score"], sample_rows=300)
+    sample = profile_sample(prof, ["cv_len", "job_len", "score"])
+    # linhas reais e completas do treino, não os quantis
+    assert len(sample) == 300 and sample.notna().all().all()
+    rows = set(map(tuple, df.dropna().astype(float).to_numpy()))
+    assert all(tuple(r) in rows for r in sample.to_numpy())
+
+    # perfil antigo sem amostra: quantis como fallback
+    del prof["sample"]
+    assert len(profile_sample(prof, ["cv_len"])) == 1001
+
+
+def test_drift_service_prefers_profile_and_caches_by_mtime(tmp_path, monkeypatch):
+    monkeypatch.setenv("MONITORING_DIR", str(tmp_path / "monitoring"))
+    monkeypatch.setenv("DRIFT_ENGINE", "native")
+    import src.monitoring.drift_service as drift_service
+    reload(drift_service)
+
+    profile = tmp_path / "baseline_profile.json"
+    save_profile(build_profile(_frame(), ["cv_len", "job_len", "score"]), profile)
+    drift_service.BASELINE_PROFILE = profile
+    drift_service.BASELINE = tmp_path / "nao_existe.csv"
+
+    ref = drift_service._reference()
+    assert ref.n["score"] == 5000
+    assert len(ref.frame) == 2000 and len(ref.sorted["score"]) == 1001
+    assert drift_service._reference() is ref  # cache: sem reler o arquivo
+
+    # score fora da distribuição de referência -> drift no score
+    log_file = tmp_path / "monitoring" / "requests_log.csv"
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(1)
+    with log_file.open("w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["ts", "endpoint", "cv_len", "job_len", "score"])
+        for i in range(400):
+            w.writerow([i, "/score", rng.integers(100, 3000), rng.integers(200, 1500), 0.9 + rng.random() / 10])
+    drift_service.LOG_FILE = log_file
+    drift_service.compute_and_export()
+    text = TestClient(drift_service.app).get("/metrics").text
+    assert 'dm_drift_detected{feature="score"} 1.0' in text
+    assert 'dm_drift_detected{feature="cv_len"} 0.0' in text
+
+    # arquivo novo (mtime diferente) -> recarrega
+    save_profile(build_profile(_frame(100, seed=3), ["cv_len", "job_len", "score"]), profile)
+    st = profile.stat()
+    os.utime(profile, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert drift_service._reference().n["score"] == 100
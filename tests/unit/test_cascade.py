@@ -0,0 +1,99 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+import src.api.main as m
+from src.modeling.cascade import cascade_by_group, merge_cascade_scores, shortlist
+
+
+class LenModel:
+    """Pipeline fake: score proporcional ao tamanho do cv; registra linhas vistas."""
+    def __init__(self, scale):
+        self.scale = scale
+        self.rows_seen = []
+    def __getitem__(self, idx):
+        return self
+    def predict_proba(self, X):
+        self.rows_seen.append(len(X))
+        p = np.clip(X["cv_pt"].str.len().to_numpy() * self.scale, 0, 1)
+        return np.c_[1 - p, p]
+
+
+def test_merge_keeps_shortlist_on_top():
+    s1 = np.array([0.9, 0.1, 0.8, 0.7])
+    idx = shortlist(s1, 2)
+    assert sorted(idx) == [0, 2]
+    out = merge_cascade_scores(s1, idx, np.array([0.3, 0.2]))
+    assert set(np.argsort(-out)[:2]) == {0, 2}
+    assert out[3] < out[[0, 2]].min()
+
+
+def test_merge_keeps_stage1_order_in_tail():
+    # cauda com 1º estágio acima do piso: a ordem entre eles não pode virar empate
+    s1 = np.array([0.95, 0.9, 0.85, 0.8, 0.1])
+    idx = shortlist(s1, 1)
+    out = merge_cascade_scores(s1, idx, np.array([0.2]))
+    assert list(np.argsort(-out)) == [0, 1, 2, 3, 4]
+    assert len(set(out[1:])) == 4
+    assert out[1:].max() < 0.2 and out[1:].min() > 0
+
+
+def test_cascade_by_group_is_per_job():
+    s1 = np.array([0.9, 0.1, 0.5, 0.2, 0.8])
+    full = np.array([0.4, 0.9, 0.6, 0.7, 0.3])
+    g = np.array(["a", "a", "a", "b", "b"])
+    out = cascade_by_group(s1, full, g, 1)
+    # por vaga, só o melhor do 1º estágio recebe o score completo
+    assert out[0] == 0.4 and out[4] == 0.3
+    assert out[1] < 0.4 and out[2] < 0.4 and out[3] < 0.3
+    # ordem do 1º estágio preservada na cauda da vaga "a" (0.5 > 0.1)
+    assert out[2] > out[1]
+
+
+def test_rank_uses_full_model_only_on_shortlist(monkeypatch):
+    full, stage1 = LenModel(0.05), LenModel(0.1)
+    monkeypatch.setattr(m, "_model", full)
+    monkeypatch.setattr(m, "_stage1_model", stage1)
+    monkeypatch.setattr(m, "_cascade_top_m", 2)
+    monkeypatch.setattr(m, "_result_cache", m.ResultCache(0, 0))
+
+    payload = {
+        "titulo_vaga": "x",
+        "candidates": [{"id": str(i), "cv_pt": "a" * i} for i in range(1, 6)],
+        "k": 3,
+        "use_threshold": False,
+    }
+    r = TestClient(m.app).post("/rank-candidates", json=payload)
+    assert r.status_code == 200
+    assert stage1.rows_seen == [5] and full.rows_seen == [2]
+    # k=3 > M=2: só a shortlist volta
+    assert [it["id"] for it in r.json()["items"]] == ["5", "4"]
+
+
+def test_cascade_tail_keeps_order_and_skips_threshold(monkeypatch):
+    # 1º estágio: score cresce com o tamanho; completo: constante baixo (piso 0.1)
+    class ConstModel(LenModel):
+        def predict_proba(self, X):
+            self.rows_seen.append(len(X))
+            p = np.full(len(X), 0.1)
+            return np.c_[1 - p, p]
+
+    monkeypatch.setattr(m, "_model", ConstModel(0))
+    monkeypatch.setattr(m, "_stage1_model", LenModel(0.1))
+    monkeypatch.setattr(m, "_cascade_top_m", 1)
+    monkeypatch.setattr(m, "_threshold_topk", 0.01)
+    monkeypatch.setattr(m, "_result_cache", m.ResultCache(0, 0))
+    logged = []
+    monkeypatch.setattr(m, "_append_monitor_rows", lambda rows: logged.extend(rows))
+
+    cands = [{"id": str(i), "cv_pt": "a" * i} for i in range(1, 7)]
+    client = TestClient(m.app)
+    # k > M: a resposta para na shortlist (a cauda não tem score do modelo)
+    payload = {"titulo_vaga": "x", "candidates": cands, "k": 6, "use_threshold": False}
+    r = client.post("/rank-candidates", json=payload)
+    assert [it["id"] for it in r.json()["items"]] == ["6"]
+    assert r.json()["used_k"] == 1 and r.json()["items"][0]["score"] == 0.1
+    # com threshold só passa quem teve score da pipeline completa
+    r = client.post("/rank-candidates", json={"titulo_vaga": "x", "candidates": cands, "k": 6})
+    assert [it["id"] for it in r.json()["items"]] == ["6"]
+    # log de drift só com scores do modelo completo
+    assert len(logged) == 2 and all(row[4] == 0.1 for row in logged)
@@ -0,0 +1,178 @@
+# tests/unit/test_codecs.py
+import msgspec
+import numpy as np
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api.main as m
+from src.api import codecs
+
+client = TestClient(m.app)
+
+JOB = {
+    "titulo_vaga": "backend",
+    "principais_atividades": "apis",
+    "competencias": "w1",
+    "observacoes": "",
+}
+CANDS = [
+    {
+        "id": str(i),
+        "name": f"c{i}",
+        "cv_pt": f"w{i % 5} w{(i * 3) % 7} w2",
+        "competencias": "w3" if i % 2 else "",
+        "observacoes": "",
+    }
+    for i in range(12)
+]
+
+
+@pytest.fixture
+def fitted(monkeypatch, fit_pipeline):
+    pipe, _ = fit_pipeline()
+    monkeypatch.setattr(m, "_model", pipe)
+    monkeypatch.setattr(m, "_stage1_model", None)
+    monkeypatch.setattr(m, "_model_version", "codecs-test")
+    monkeypatch.setattr(m, "_threshold_topk", 0.0)
+
+
+def _arrow(rows, meta=None) -> bytes:
+    table = pa.Table.from_pylist(rows)
+    if meta:
+        table = table.replace_schema_metadata({k: str(v) for k, v in meta.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _read_arrow(content: bytes):
+    return pa.ipc.open_stream(pa.BufferReader(content)).read_all()
+
+
+def test_negotiation():
+    assert codecs.request_format(None) == codecs.JSON
+    assert codecs.request_format("application/json; charset=utf-8") == codecs.JSON
+    assert codecs.request_format("application/x-msgpack") == codecs.MSGPACK
+    accept = "text/html, application/vnd.apache.arrow.stream;q=0.9"
+    assert codecs.response_format(accept) == codecs.ARROW
+    assert codecs.response_format("*/*") == codecs.JSON
+
+
+def test_score_batch_same_scores_in_every_encoding(fitted):
+    rows = [{**JOB, "cv_pt": c["cv_pt"]} for c in CANDS]
+    ref = [x["score"] for x in client.post("/score-batch", json=rows).json()]
+
+    r = client.post(
+        "/score-batch",
+        content=msgspec.msgpack.encode(rows),
+        headers={"Content-Type": codecs.MSGPACK, "Accept": codecs.MSGPACK},
+    )
+    assert r.status_code == 200 and r.headers["content-type"] == codecs.MSGPACK
+    assert [x["score"] for x in msgspec.msgpack.decode(r.content)] == pytest.approx(ref)
+
+    r = client.post(
+        "/score-batch",
+        content=_arrow(rows),
+        headers={"Content-Type": codecs.ARROW, "Accept": codecs.ARROW},
+    )
+    assert r.status_code == 200
+    table = _read_arrow(r.content)
+    assert table.column_names == ["score", "pass_by_threshold", "threshold_used"]
+    assert table.column("score").to_pylist() == pytest.approx(ref)
+
+
+def test_rank_same_items_in_every_encoding(fitted):
+    payload = {**JOB, "k": 5, "candidates": CANDS}
+    ref = client.post("/rank-candidates", json=payload).json()
+    assert ref["used_k"] == 5
+
+    r = client.post(
+        "/rank-candidates",
+        content=msgspec.msgpack.encode(payload),
+        headers={"Content-Type": codecs.MSGPACK, "Accept": codecs.MSGPACK},
+    )
+    assert msgspec.msgpack.decode(r.content) == ref
+
+    r = client.post(
+        "/rank-candidates",
+        content=_arrow(CANDS, meta={**JOB, "k": 5, "use_threshold": "true"}),
+        headers={"Content-Type": codecs.ARROW, "Accept": codecs.ARROW},
+    )
+    table = _read_arrow(r.content)
+    assert table.column("id").to_pylist() == [it["id"] for it in ref["items"]]
+    assert np.allclose(table.column("score").to_numpy(), [it["score"] for it in ref["items"]])
+    assert table.schema.metadata[b"used_k"] == b"5"
+
+    # corpo binário, resposta JSON (sem Accept)
+    r = client.post(
+        "/rank-candidates",
+        content=msgspec.msgpack.encode(payload),
+        headers={"Content-Type": codecs.MSGPACK},
+    )
+    assert r.json() == ref
+
+
+def test_arrow_nulls_and_empty_batch(fitted):
+    rows = [{"id": None, "name": None, "cv_pt": "w1 w2", "competencias": None, "observacoes": None}]
+    r = client.post(
+        "/rank-candidates",
+        content=_arrow(rows, meta={"titulo_vaga": "x"}),
+        headers={"Content-Type": codecs.ARROW},
+    )
+    assert r.status_code == 200
+    # null vira "" como no JSON (_coerce_str); coluna ausente continua None
+    assert r.json()["items"][0]["id"] == ""
+    rows = [{"cv_pt": "w1 w2", "name": None}]
+    payload = {"titulo_vaga": "x", "candidates": rows}
+    ref = client.post("/rank-candidates", json=payload).json()["items"][0]
+    assert (ref["id"], ref["name"]) == (None, "")
+    bodies = (
+        (codecs.MSGPACK, msgspec.msgpack.encode(payload)),
+        (codecs.ARROW, _arrow(rows, meta={"titulo_vaga": "x"})),
+    )
+    for fmt, body in bodies:
+        r = client.post("/rank-candidates", content=body, headers={"Content-Type": fmt})
+        item = r.json()["items"][0]
+        assert (item["id"], item["name"]) == (None, "")
+
+    empty = pa.table({"cv_pt": pa.array([], type=pa.string())})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, empty.schema) as w:
+        w.write_table(empty)
+    r = client.post(
+        "/score-batch",
+        content=sink.getvalue().to_pybytes(),
+        headers={"Content-Type": codecs.ARROW, "Accept": codecs.ARROW},
+    )
+    table = _read_arrow(r.content)
+    assert r.status_code == 200 and table.num_rows == 0
+    assert [str(t) for t in table.schema.types] == ["double", "bool", "double"]
+
+
+def test_errors():
+    r = client.post("/score-batch", content=b"x", headers={"Content-Type": "text/csv"})
+    assert r.status_code == 415
+    bad = [{"cv_pt": 3}]
+    r = client.post(
+        "/score-batch",
+        content=msgspec.msgpack.encode(bad),
+        headers={"Content-Type": codecs.MSGPACK},
+    )
+    assert r.status_code == 422
+    r = client.post("/score-batch", content=_arrow(bad), headers={"Content-Type": codecs.ARROW})
+    assert r.status_code == 422 and "cv_pt" in r.json()["detail"]
+    r = client.post("/score-batch", content=b"not arrow", headers={"Content-Type": codecs.ARROW})
+    assert r.status_code == 422
+    # JSON mantém o formato de erro do FastAPI
+    r = client.post("/rank-candidates", json={"titulo_vaga": "x"})
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["loc"] == ["body", "candidates"]
+
+
+def test_openapi_documents_binary_bodies():
+    spec = client.get("/openapi.json").json()
+    content = spec["paths"]["/rank-candidates"]["post"]["requestBody"]["content"]
+    assert set(content) == {codecs.JSON, codecs.MSGPACK, codecs.ARROW}
+    assert "candidates" in content[codecs.JSON]["schema"]["properties"]
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.modeling.compact import compact_pipeline, compaction_report
+from src.modeling.pipeline import build_pipeline, TEXT_COLS
+
+
+def _data(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    words = "python java sql docker fastapi spring react aws dados etl kotlin".split()
+    df = pd.DataFrame({c: [" ".join(rng.choice(words, 5)) for _ in range(n)] for c in TEXT_COLS})
+    y = (df["cv_pt"].str.contains("python") & df["titulo_vaga"].str.contains("python")).astype(int)
+    return df, y.to_numpy(), np.repeat(np.arange(n // 10), 10)
+
+
+def test_compact_prunes_and_uses_float32():
+    df, y, g = _data()
+    full = build_pipeline().fit(df, y)
+    comp = compact_pipeline(full, tol=0.05)
+
+    n_full, n_comp = full[-1].coef_.shape[1], comp[-1].coef_.shape[1]
+    assert n_comp < n_full
+    assert comp[-1].coef_.dtype == np.float32
+    # vocabulários remapeados continuam contíguos e batem com o coef_
+    ct = comp.named_steps["vectorize"]
+    sizes = [len(t.vocabulary_) for _, t, _ in ct.transformers_ if hasattr(t, "vocabulary_")]
+    assert sum(sizes) == n_comp
+    for _, t, _ in ct.transformers_:
+        if hasattr(t, "vocabulary_"):
+            assert sorted(t.vocabulary_.values()) == list(range(len(t.vocabulary_)))
+            assert not hasattr(t, "stop_words_")
+
+    X = ct.transform(comp[0].transform(df))
+    assert X.dtype == np.float32 and X.shape[1] == n_comp
+    # original intacto (compactação trabalha numa cópia)
+    assert full[-1].coef_.shape[1] == n_full
+
+    report = compaction_report(full, comp, df, y, g)
+    assert report["artifact_bytes"]["compact"] < report["artifact_bytes"]["full"]
+    assert report["score_abs_diff"]["max"] < 0.25
+    assert "delta" in report["NDCG@5"]
+
+
+def test_compact_with_zero_tol_keeps_scores():
+    df, y, _ = _data(seed=1)
+    full = build_pipeline().fit(df, y)
+    comp = compact_pipeline(full, tol=0.0)
+    assert np.allclose(full.predict_proba(df), comp.predict_proba(df), atol=1e-5)
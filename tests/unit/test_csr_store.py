@@ -0,0 +1,108 @@
+import threading
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.features.csr_store import (
+    HEADER_FILE,
+    CSRStore,
+    VocabularyMismatchError,
+    _write_json_atomic,
+    open_for_model,
+    vocabulary_hash,
+)
+
+
+def _vect(docs):
+    return TfidfVectorizer().fit(docs)
+
+
+def test_append_memmap_and_compact(tmp_path):
+    vect = _vect(["python fastapi docker", "sql dados etl", "python sql"])
+    X = vect.transform(["python docker", "sql etl", "dados"])
+    root = tmp_path / "pool"
+    store = CSRStore.create(root, X.shape[1], "v1", vocabulary_hash(vect))
+
+    store.append(X[:2], ["a", "b"])
+    store.append(X[2:], ["c"])
+    assert len(store.segments()) == 2
+    assert list(store.ids()) == ["a", "b", "c"]
+    assert np.allclose(store.to_csr().toarray(), X.toarray(), atol=1e-6)
+
+    # após compactar: um segmento só, e a matriz aponta direto para o memmap
+    store.compact_in_background().join()
+    seg, = store.segments()
+    assert isinstance(seg.data, np.memmap)
+    M = seg.to_csr(store.n_cols)
+    assert np.shares_memory(M.data, seg.data)
+    assert np.shares_memory(M.indices, seg.indices)
+    assert np.allclose(M.toarray(), X.toarray(), atol=1e-6)
+    assert not (root / "seg-000001").exists()
+
+
+def test_open_refuses_other_vocabulary(tmp_path):
+    vect = _vect(["python fastapi", "sql dados"])
+    other = _vect(["java spring", "kotlin android"])
+    root = tmp_path / "pool"
+    CSRStore.create(root, len(vect.vocabulary_), "v1", vocabulary_hash(vect))
+
+    assert open_for_model(root, vect).header["model_version"] == "v1"
+    with pytest.raises(VocabularyMismatchError):
+        open_for_model(root, other)
+
+
+def test_append_checks_shape(tmp_path):
+    store = CSRStore.create(tmp_path / "pool", 4, "v1", "h")
+    with pytest.raises(ValueError):
+        store.append(sp.csr_matrix(np.ones((2, 3))), ["a", "b"])
+    with pytest.raises(ValueError):
+        store.append(sp.csr_matrix(np.ones((2, 4))), ["a"])
+    assert store.to_csr().shape == (0, 4)
+
+
+def test_concurrent_compactions_do_not_duplicate_rows(tmp_path, monkeypatch):
+    X = sp.random(12, 6, density=0.5, format="csr", random_state=0, dtype=np.float32)
+    store = CSRStore.create(tmp_path / "pool", 6, "v1", "h")
+    for i in range(0, 12, 3):
+        store.append(X[i:i + 3], [str(j) for j in range(i, i + 3)])
+
+    # segura a fusão para as duas compactações se sobreporem
+    load = store._load_segment
+    barrier = threading.Event()
+
+    def slow_load(name):
+        barrier.wait(0.2)
+        return load(name)
+
+    monkeypatch.setattr(store, "_load_segment", slow_load)
+    threads = [store.compact_in_background() for _ in range(2)]
+    barrier.set()
+    for t in threads:
+        t.join()
+    monkeypatch.undo()
+
+    assert len(store.segments()) == 1
+    assert list(store.ids()) == [str(i) for i in range(12)]
+    assert np.allclose(store.to_csr().toarray(), X.toarray(), atol=1e-6)
+
+
+def test_compact_aborts_when_segments_changed(tmp_path, monkeypatch):
+    X = sp.random(4, 3, density=0.7, format="csr", random_state=1, dtype=np.float32)
+    store = CSRStore.create(tmp_path / "pool", 3, "v1", "h")
+    store.append(X[:2], ["a", "b"])
+    store.append(X[2:], ["c", "d"])
+    write = store._write_segment
+
+    def write_and_drop(name, matrix, ids, dtype):
+        write(name, matrix, ids, dtype)
+        # outro escritor republica o header sem um dos segmentos fundidos
+        header = store.header
+        header["segments"] = header["segments"][1:]
+        _write_json_atomic(store.root / HEADER_FILE, header)
+
+    monkeypatch.setattr(store, "_write_segment", write_and_drop)
+    assert store.compact() is None
+    assert list(store.ids()) == ["c", "d"]
+    assert not (store.root / "seg-000003").exists()
@@ -0,0 +1,165 @@
+# tests/unit/test_drift_scheduler.py
+import threading
+import time
+from importlib import reload
+
+from fastapi.testclient import TestClient
+
+from src.monitoring.scheduler import DriftScheduler
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def _make(new_rows, **kw):
+    clock = _Clock()
+    runs, skips = [], []
+    sched = DriftScheduler(
+        job=runs.append,
+        probe=lambda: new_rows.pop(0) if new_rows else 0,
+        min_rows=100,
+        max_interval=60,
+        on_skip=lambda: skips.append(clock.t),
+        clock=clock,
+        **kw,
+    )
+    return sched, clock, runs, skips
+
+
+def test_triggers_on_row_volume():
+    sched, _, runs, _ = _make([40, 40, 40])
+    assert not sched.step() and not sched.step()
+    assert sched.step()          # 120 >= 100
+    assert runs == [120] and sched.pending_rows == 0
+
+
+def test_triggers_on_time_only_with_new_rows():
+    sched, clock, runs, skips = _make([5])
+    sched.step()
+    clock.t = 61
+    assert sched.step()
+    assert runs == [5]
+    clock.t = 130
+    assert not sched.step()      # nada novo em 60s -> ciclo pulado
+    assert skips == [130] and runs == [5]
+
+
+def test_trigger_forces_cycle_and_failures_do_not_kill_loop():
+    calls = []
+
+    def job(rows):
+        calls.append(rows)
+        raise RuntimeError("boom")
+
+    sched = DriftScheduler(job=job, probe=lambda: 0, min_rows=100, max_interval=60)
+    sched.trigger()
+    assert sched.step() and calls == [0]
+    assert not sched.step()
+
+
+def test_cycles_never_overlap():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow_job(rows):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    sched = DriftScheduler(job=slow_job, probe=lambda: 1000, min_rows=1, poll_seconds=0.001)
+    sched.start()
+    for _ in range(20):
+        sched.trigger()
+        time.sleep(0.005)
+    sched.stop()
+    assert peak[0] == 1
+
+
+def test_run_cycle_exports_cost_metrics(tmp_path, monkeypatch):
+    monkeypatch.setenv("MONITORING_DIR", str(tmp_path))
+    import src.monitoring.drift_service as drift_service
+    reload(drift_service)
+    drift_service.BASELINE = tmp_path / "nao_existe.csv"
+    drift_service.BASELINE_PROFILE = tmp_path / "nao_existe.json"
+
+    assert drift_service.run_cycle(rows=7) is None
+    text = TestClient(drift_service.app).get("/metrics").text
+    assert 'dm_drift_cycles_total{result="no_data"} 1.0' in text
+    assert "dm_drift_rows_processed_total 7.0" in text
+    assert "dm_drift_cycle_seconds_count 1.0" in text
+
+
+def test_scheduler_starts_with_lifespan(tmp_path, monkeypatch):
+    monkeypatch.setenv("MONITORING_DIR", str(tmp_path))
+    monkeypatch.setenv("DRIFT_REPORTS", "false")
+    import src.monitoring.drift_service as drift_service
+    reload(drift_service)
+    # sem lifespan (import/TestClient simples) nada roda em background
+    assert drift_service._scheduler is None
+    with TestClient(drift_service.app) as client:
+        assert client.get("/health").json()["scheduler_running"] is True
+    assert drift_service._scheduler is None
+
+
+def test_log_tail_is_read_under_lock(tmp_path, monkeypatch):
+    monkeypatch.setenv("MONITORING_DIR", str(tmp_path))
+    import src.monitoring.drift_service as drift_service
+    from src.monitoring.log_tail import LogTail
+    reload(drift_service)
+    drift_service.LOG_FILE.write_text("ts,endpoint,cv_len,job_len,score\n1,/score,10,20,0.5\n", encoding="utf-8")
+
+    # agendador e /report usam o mesmo LogTail: toda leitura segura o lock
+    held = []
+    refresh, frame = LogTail.refresh, LogTail.frame
+    monkeypatch.setattr(LogTail, "refresh", lambda self: held.append(drift_service._tail_lock.locked()) or refresh(self))
+    monkeypatch.setattr(LogTail, "frame", lambda self: held.append(drift_service._tail_lock.locked()) or frame(self))
+    assert drift_service._probe_new_rows() == 1
+    assert len(drift_service._recent_frame(10)) == 1
+    assert held and all(held)
+
+
+def test_ring_reader_shared_between_threads(tmp_path, monkeypatch):
+    monkeypatch.setenv("MONITORING_DIR", str(tmp_path))
+    import src.monitoring.drift_service as drift_service
+    from src.monitoring.ringlog import RingWriter, make_records
+    reload(drift_service)
+    rows = [[1.7e9 + i, "/score", 100, 200, 0.5] for i in range(50)]
+
+    def recreate():
+        # arquivo novo (inode novo): o próximo _get_ring fecha o leitor anterior
+        tmp = tmp_path / "novo.ring"
+        w = RingWriter(tmp, capacity=100)
+        w.append(make_records(rows))
+        w.close()
+        tmp.replace(drift_service.RING_FILE)
+
+    recreate()
+    errors, stop = [], time.perf_counter() + 0.5
+
+    def loop(fn):
+        while time.perf_counter() < stop:
+            try:
+                fn()
+            except Exception as e:  # pragma: no cover - só em caso de corrida
+                errors.append(e)
+
+    # agendador (probe + janela) x /report (janela) x rotação do arquivo
+    threads = [
+        threading.Thread(target=loop, args=(drift_service._probe_new_rows,)),
+        threading.Thread(target=loop, args=(lambda: drift_service._recent_frame(50),)),
+        threading.Thread(target=loop, args=(recreate,)),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(drift_service._recent_frame(50)) == 50
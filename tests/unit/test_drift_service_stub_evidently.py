@@ -82,12 +82,29 @@ def test_drift_compute_with_mocked_evidently(tmp_path, monkeypatch):
     _seed_baseline(baseline)
     _seed_requests_log(log_file, n=230)
 
+    # Worker de relatórios falso: o ciclo só enfileira, sem renderizar HTML
+    class FakeWorker:
+        def __init__(self):
+            self.jobs = []
+        def submit(self, ref, cur, ts=None):
+            self.jobs.append((ref, cur))
+            return True
+
+    worker = FakeWorker()
+    drift_service._report_worker = worker
+
     # Executa o cálculo (vai usar FakeReport/FakePreset)
-    drift_service.compute_and_export()
+    assert drift_service.compute_and_export() is True
 
-    # Verifica que salvou pelo menos um HTML
-    htmls = sorted(reports_dir.glob("drift_*.html"))
-    assert len(htmls) >= 1
+    # HTML não é gerado no ciclo; pedido vai para o worker
+    assert not list(reports_dir.glob("drift_*.html"))
+    assert len(worker.jobs) == 1
+    assert list(worker.jobs[0][1].columns) == ["cv_len", "job_len", "score"]
+
+    # mesmo status de drift -> sem novo relatório até a cadência vencer
+    drift_service.compute_and_export()
+    assert len(worker.jobs) == 1
+    drift_service._report_worker = None
 
     # Verifica que as métricas foram publicadas no /metrics do registry próprio
     client = TestClient(drift_service.app)
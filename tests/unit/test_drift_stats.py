@@ -0,0 +1,75 @@
+# tests/unit/test_drift_stats.py
+import csv
+from importlib import reload
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from scipy import stats
+
+from src.monitoring import drift_stats as ds
+
+
+def test_ks_and_wasserstein_match_scipy():
+    rng = np.random.default_rng(0)
+    a, b = rng.normal(0, 1, 3000), rng.normal(0.1, 1.2, 700)
+    d, p = ds.ks_2samp_sorted(np.sort(a), np.sort(b))
+    ref = stats.ks_2samp(a, b, method="asymp")
+    assert d == pytest.approx(ref.statistic)
+    assert p == pytest.approx(ref.pvalue, rel=1e-6)
+    assert ds.wasserstein_sorted(np.sort(a), np.sort(b)) == pytest.approx(
+        stats.wasserstein_distance(a, b)
+    )
+
+
+def test_psi_zero_for_same_distribution_and_large_for_shift():
+    rng = np.random.default_rng(1)
+    ref = ds.sorted_values(rng.normal(0, 1, 5000))
+    assert ds.psi_sorted(ref, ref) == pytest.approx(0.0, abs=1e-9)
+    assert ds.psi_sorted(ref, ds.sorted_values(rng.normal(2, 1, 5000))) > 1.0
+
+
+def test_compute_drift_numeric_categorical_and_empty():
+    ref = pd.DataFrame({"x": np.arange(500.0), "cat": ["a", "b"] * 250, "vazio": np.nan})
+    cur = pd.DataFrame({"x": np.arange(500.0) + 400, "cat": ["a"] * 500, "vazio": 1.0})
+    out = ds.compute_drift(ref, cur, ["x", "cat", "vazio", "ausente"])
+    assert out["x"]["drift_detected"] and out["x"]["test"] == "ks"
+    assert out["cat"]["drift_detected"] and out["cat"]["test"] == "chi2"
+    # referência toda NaN ou coluna ausente: sem resultado
+    assert "vazio" not in out and "ausente" not in out
+
+
+def test_native_engine_exports_gauges(tmp_path, monkeypatch):
+    monkeypatch.setenv("MONITORING_DIR", str(tmp_path / "monitoring"))
+    monkeypatch.setenv("DRIFT_ENGINE", "native")
+    import src.monitoring.drift_service as drift_service
+    reload(drift_service)
+
+    baseline = tmp_path / "artifacts" / "baseline_features.csv"
+    baseline.parent.mkdir(parents=True)
+    rng = np.random.default_rng(2)
+    pd.DataFrame({
+        "cv_len": rng.integers(50, 60, 1000),
+        "job_len": rng.integers(200, 220, 1000),
+        "score": rng.random(1000),
+    }).to_csv(baseline, index=False)
+    log_file = tmp_path / "monitoring" / "requests_log.csv"
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    with log_file.open("w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["ts", "endpoint", "cv_len", "job_len", "score"])
+        for i in range(300):
+            # cv_len deslocado; job_len na mesma faixa da referência
+            w.writerow([i, "/score", 500 + i % 7, 200 + i % 20, (i % 10) / 10.0])
+
+    drift_service.BASELINE = baseline
+    drift_service.LOG_FILE = log_file
+    drift_service.compute_and_export()
+
+    text = TestClient(drift_service.app).get("/metrics").text
+    assert 'dm_drift_detected{feature="cv_len"} 1.0' in text
+    assert 'dm_drift_detected{feature="job_len"} 0.0' in text
+    assert 'dm_drift_psi{feature="cv_len"}' in text
+    # motor nativo não gera HTML a cada ciclo
+    assert not list(drift_service.REPORTS_DIR.glob("drift_*.html"))
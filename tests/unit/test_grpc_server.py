@@ -0,0 +1,133 @@
+# tests/unit/test_grpc_server.py
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+grpc = pytest.importorskip("grpc")
+pytest.importorskip("google.protobuf")
+
+import src.api.main as m
+from src.api import grpc_server as gs
+
+JOB = {
+    "titulo_vaga": "backend",
+    "principais_atividades": "apis",
+    "competencias": "w1",
+    "observacoes": "",
+}
+CANDS = [
+    {
+        "id": str(i),
+        "name": f"c{i}",
+        "cv_pt": f"w{i % 5} w{(i * 3) % 7} w2",
+        "competencias": "w3" if i % 2 else "",
+        "observacoes": "",
+    }
+    for i in range(10)
+]
+
+
+@pytest.fixture
+def stub(monkeypatch, fit_pipeline):
+    pipe, _ = fit_pipeline()
+    monkeypatch.setattr(m, "_model", pipe)
+    monkeypatch.setattr(m, "_stage1_model", None)
+    monkeypatch.setattr(m, "_model_version", "grpc-test")
+    monkeypatch.setattr(m, "_threshold_topk", 0.4)
+    monkeypatch.setenv("GRPC_STREAM_CHUNK", "3")
+    server, port = gs.start_server(0, host="127.0.0.1", max_workers=2)
+    ch = gs.channel(f"127.0.0.1:{port}")
+    yield gs.ScoringStub(ch)
+    ch.close()
+    server.stop(None)
+
+
+def _rank_request(**kw):
+    M = gs.MESSAGES
+    return M["RankRequest"](**JOB, candidates=[M["Candidate"](**c) for c in CANDS], **kw)
+
+
+def test_proto_file_matches_descriptor():
+    assert gs.PROTO_PATH.read_text(encoding="utf-8") == gs.render_proto()
+
+
+def test_score_and_batch_match_http(stub):
+    http = TestClient(m.app)
+    rows = [{**JOB, "cv_pt": c["cv_pt"]} for c in CANDS]
+    ref = http.post("/score-batch", json=rows).json()
+
+    one = stub.Score(gs.MESSAGES["ScoreRequest"](**rows[0]))
+    assert one.score == pytest.approx(ref[0]["score"])
+    assert one.threshold_used == pytest.approx(0.4)
+
+    items = [gs.MESSAGES["ScoreRequest"](**r) for r in rows]
+    batch = stub.ScoreBatch(gs.MESSAGES["ScoreBatchRequest"](items=items))
+    assert [x.score for x in batch.items] == pytest.approx([x["score"] for x in ref])
+    assert [x.pass_by_threshold for x in batch.items] == [x["pass_by_threshold"] for x in ref]
+    assert len(stub.ScoreBatch(gs.MESSAGES["ScoreBatchRequest"]()).items) == 0
+
+
+def test_rank_matches_http_and_stream(stub):
+    body = {**JOB, "k": 4, "candidates": CANDS}
+    ref = TestClient(m.app).post("/rank-candidates", json=body).json()
+    resp, call = stub.RankCandidates.with_call(_rank_request(k=4))
+    assert [it.id for it in resp.items] == [it["id"] for it in ref["items"]]
+    assert resp.used_k == ref["used_k"]
+    assert dict(call.trailing_metadata())["x-model-version"] == "grpc-test"
+
+    # sem k: ranking completo em lotes de GRPC_STREAM_CHUNK
+    chunks = list(stub.RankCandidatesStream(_rank_request(use_threshold=False)))
+    assert [c.offset for c in chunks] == [0, 3, 6, 9]
+    ids = [it.id for c in chunks for it in c.items]
+    assert len(ids) == len(CANDS)
+    top = stub.RankCandidates(_rank_request(k=4, use_threshold=False))
+    assert ids[:4] == [it.id for it in top.items]
+    scores = [it.score for c in chunks for it in c.items]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_rank_threshold_default_and_metrics(stub):
+    path = f"/{gs.SERVICE}/RankCandidates"
+    labels = {"method": "RankCandidates", "code": "OK"}
+    before = REGISTRY.get_sample_value("dm_grpc_requests_total", labels) or 0
+    # use_threshold ausente = true: só itens >= threshold
+    resp = stub.RankCandidates(_rank_request(k=100))
+    assert all(it.score >= 0.4 for it in resp.items)
+    assert REGISTRY.get_sample_value("dm_grpc_requests_total", labels) == before + 1
+    latency = {"method": "RankCandidates"}
+    assert REGISTRY.get_sample_value("dm_grpc_latency_seconds_count", latency) >= 1
+    # séries HTTP ficam só com requisições HTTP
+    http = {"endpoint": path, "method": "GRPC", "status": "OK"}
+    assert REGISTRY.get_sample_value("dm_api_requests_total", http) is None
+    candidates = REGISTRY.get_sample_value("dm_api_candidates_per_request_sum", {"endpoint": path})
+    assert candidates >= len(CANDS)
+
+
+def test_stream_stops_at_cascade_shortlist(stub, monkeypatch):
+    # 1º estágio = modelo completo: o stream traz só a shortlist, na mesma ordem
+    full = stub.RankCandidatesStream(_rank_request(use_threshold=False))
+    ref = [it.id for c in full for it in c.items]
+    monkeypatch.setattr(m, "_stage1_model", m._model)
+    monkeypatch.setattr(m, "_cascade_top_m", 4)
+    monkeypatch.setattr(m._result_cache, "max_bytes", 0)
+    chunks = list(stub.RankCandidatesStream(_rank_request(use_threshold=False)))
+    assert [it.id for c in chunks for it in c.items] == ref[:4]
+    scores = [it.score for c in chunks for it in c.items]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_invalid_input_maps_to_invalid_argument(stub, monkeypatch):
+    def bad(*args, **kwargs):
+        raise ValueError("entrada inválida")
+
+    monkeypatch.setattr(m, "_score_single", bad)
+    with pytest.raises(grpc.RpcError) as err:
+        stub.Score(gs.MESSAGES["ScoreRequest"](**JOB, cv_pt="x"))
+    assert err.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+    labels = {"method": "Score", "code": "INVALID_ARGUMENT"}
+    assert REGISTRY.get_sample_value("dm_grpc_requests_total", labels) >= 1
+
+    monkeypatch.setattr(m, "_score_single", lambda *a: 1 / 0)
+    with pytest.raises(grpc.RpcError) as err:
+        stub.Score(gs.MESSAGES["ScoreRequest"](**JOB, cv_pt="x"))
+    assert err.value.code() == grpc.StatusCode.INTERNAL
@@ -0,0 +1,74 @@
+import os
+
+from src.monitoring.log_tail import LogTail
+
+HEADER = "ts,endpoint,cv_len,job_len,score\n"
+
+
+def _rows(start, n):
+    return "".join(f"{i},/score,{i},{100 + i},0.5\n" for i in range(start, start + n))
+
+
+def test_reads_only_new_bytes_and_keeps_window(tmp_path):
+    log = tmp_path / "requests_log.csv"
+    log.write_text(HEADER + _rows(0, 10), encoding="utf-8")
+    tail = LogTail(log, max_rows=15)
+
+    assert tail.refresh() == 10
+    assert tail.refresh() == 0
+
+    # linha parcial (escrita em andamento) só entra quando completa
+    with log.open("a", encoding="utf-8") as f:
+        f.write(_rows(10, 10) + "20,/score,2")
+    assert tail.refresh() == 10
+    with log.open("a", encoding="utf-8") as f:
+        f.write("0,120,0.5\n")
+    assert tail.refresh() == 1
+
+    df = tail.frame()
+    assert len(df) == 15  # ring buffer: só as últimas max_rows
+    assert df["ts"].tolist() == [str(i) for i in range(6, 21)]
+    assert df["cv_len"].iloc[-1] == "20"
+
+
+def test_rotation_and_truncation(tmp_path):
+    log = tmp_path / "requests_log.csv"
+    log.write_text(HEADER + _rows(0, 5), encoding="utf-8")
+    tail = LogTail(log, max_rows=100)
+    assert tail.refresh() == 5
+
+    # rotação: arquivo novo (inode novo) no mesmo caminho
+    os.replace(log, tmp_path / "requests_log.1.csv")
+    log.write_text(HEADER + _rows(5, 3), encoding="utf-8")
+    assert tail.refresh() == 3
+
+    # truncamento in-place
+    with log.open("w", encoding="utf-8") as f:
+        f.write(HEADER + _rows(8, 2))
+    assert tail.refresh() == 2
+    assert tail.frame()["ts"].tolist() == [str(i) for i in range(10)]
+
+
+def test_cold_start_on_large_log_reads_only_the_tail(tmp_path):
+    log = tmp_path / "requests_log.csv"
+    log.write_text(HEADER + _rows(0, 50_000), encoding="utf-8")
+    tail = LogTail(log, max_rows=100, max_row_bytes=64)
+
+    n = tail.refresh()
+    assert 100 <= n < 50_000 // 10
+    assert tail.frame()["ts"].iloc[-1] == "49999"
+    assert len(tail) == 100
+
+
+def test_skip_landing_on_line_start_keeps_first_line(tmp_path):
+    log = tmp_path / "requests_log.csv"
+    log.write_text(HEADER, encoding="utf-8")
+    # linhas de tamanho fixo: o salto para os últimos 4 * width bytes cai num início de linha
+    row = "{},/score,1,100,0.5\n"
+    width = len(row.format(0))
+    tail = LogTail(log, max_rows=4, max_row_bytes=width)
+    assert tail.refresh() == 0
+    with log.open("a", encoding="utf-8") as f:
+        f.write("".join(row.format(i) for i in range(10)))
+    assert tail.refresh() == 4
+    assert tail.frame()["ts"].tolist() == ["6", "7", "8", "9"]
@@ -0,0 +1,55 @@
+# tests/unit/test_metrics_multiproc.py
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from src.api.serve import prepare_multiproc_dir
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# o modo multiprocess é decidido no import do prometheus_client: roda em subprocesso
+_WORKER = textwrap.dedent("""
+    import sys
+    from src.api.metrics import REQUESTS, CACHE_BYTES
+    REQUESTS.labels(endpoint="/score", method="POST", status="200").inc(int(sys.argv[1]))
+    CACHE_BYTES.set(100)
+""")
+
+_SCRAPE = textwrap.dedent("""
+    from src.api.metrics import metrics_payload
+    print(metrics_payload().decode())
+""")
+
+
+def _run(code, env, *args):
+    return subprocess.run(
+        [sys.executable, "-c", code, *args], cwd=ROOT, env=env, check=True,
+        capture_output=True, text=True,
+    ).stdout
+
+
+def test_metrics_are_aggregated_across_processes(tmp_path):
+    mp_dir = tmp_path / "prom"
+    prepare_multiproc_dir(mp_dir)
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(mp_dir))
+    _run(_WORKER, env, "2")
+    _run(_WORKER, env, "3")
+
+    text = _run(_SCRAPE, env)
+    assert 'dm_api_requests_total{endpoint="/score",method="POST",status="200"} 5.0' in text
+    # os dois "workers" já saíram: gauges live deles foram descartados no scrape
+    assert "dm_api_result_cache_bytes 100.0" not in text
+    # sobra só o arquivo do próprio processo que fez o scrape
+    assert len(list(mp_dir.glob("gauge_live*"))) == 1
+    assert list(mp_dir.glob("counter_*.db"))
+
+
+def test_prepare_multiproc_dir_wipes_only_db_files(tmp_path):
+    mp_dir = tmp_path / "prom"
+    mp_dir.mkdir()
+    (mp_dir / "counter_1.db").write_bytes(b"x")
+    (mp_dir / "keep.txt").write_text("x")
+    prepare_multiproc_dir(mp_dir)
+    assert [p.name for p in mp_dir.iterdir()] == ["keep.txt"]
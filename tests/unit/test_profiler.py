@@ -0,0 +1,70 @@
+# tests/unit/test_profiler.py
+import threading
+
+from fastapi.testclient import TestClient
+
+from src.api import profiler
+from src.api.main import app
+
+client = TestClient(app)
+
+
+def _hot_loop(stop):
+    x = 0
+    while not stop.is_set():
+        x += sum(range(200))
+
+
+def _with_busy_thread(fn):
+    stop = threading.Event()
+    t = threading.Thread(target=_hot_loop, args=(stop,), name="busy")
+    t.start()
+    try:
+        return fn()
+    finally:
+        stop.set()
+        t.join()
+
+
+def test_sampler_sees_other_threads_not_itself():
+    s = _with_busy_thread(lambda: profiler.profile(0.2, interval=0.002))
+    assert s.samples > 10
+    collapsed = s.collapsed()
+    assert any(line.startswith("busy;") and "_hot_loop (test_profiler.py" in line
+               for line in collapsed.splitlines())
+    assert "StackSampler" not in collapsed
+    table = s.pstats()
+    assert "_hot_loop" in table and "own%" in table
+
+
+def test_profile_endpoint_requires_admin_and_is_exclusive(monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.get("/debug/profile?seconds=0.1").status_code == 403
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    headers = {"X-Admin-Token": "s3cret"}
+    assert client.get("/debug/profile?seconds=0.1", headers={"X-Admin-Token": "x"}).status_code == 401
+    assert client.get("/debug/profile?seconds=999", headers=headers).status_code == 400
+    assert client.get("/debug/profile?seconds=1&format=svg", headers=headers).status_code == 400
+
+    r = _with_busy_thread(
+        lambda: client.get("/debug/profile?seconds=0.2&format=pstats", headers=headers)
+    )
+    assert r.status_code == 200 and "_hot_loop" in r.text
+
+    with profiler._busy:
+        assert client.get("/debug/profile?seconds=0.1", headers=headers).status_code == 409
+
+
+def test_profile_endpoint_samples_on_dedicated_thread(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    ran_on = []
+
+    def fake_profile(seconds, interval=0.005, exclude=None):
+        ran_on.append(threading.current_thread().name)
+        return profiler.StackSampler(interval)
+
+    monkeypatch.setattr(profiler, "profile", fake_profile)
+    r = client.get("/debug/profile?seconds=0.1", headers={"X-Admin-Token": "s3cret"})
+    assert r.status_code == 200
+    # nem o event loop nem o threadpool dos endpoints síncronos ficam presos
+    assert ran_on == ["debug-profile"]
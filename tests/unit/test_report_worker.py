@@ -0,0 +1,50 @@
+# tests/unit/test_report_worker.py
+import os
+import time
+
+from src.monitoring.report_worker import ReportPolicy, ReportWorker, enforce_retention
+
+
+def _touch(path, size, mtime):
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+
+
+def test_retention_by_count_and_size(tmp_path):
+    for i in range(5):
+        _touch(tmp_path / f"drift_{i}.html", 100, 1000 + i)
+    (tmp_path / "outro.txt").write_text("fica")
+
+    assert enforce_retention(tmp_path, keep=3, max_bytes=0) == 2
+    assert sorted(p.name for p in tmp_path.glob("drift_*.html")) == [
+        "drift_2.html", "drift_3.html", "drift_4.html"
+    ]
+    # 250 bytes comportam só os 2 mais novos
+    assert enforce_retention(tmp_path, keep=0, max_bytes=250) == 1
+    assert sorted(p.name for p in tmp_path.glob("drift_*.html")) == ["drift_3.html", "drift_4.html"]
+    assert (tmp_path / "outro.txt").exists()
+
+
+def test_policy_on_status_change_or_cadence():
+    pol = ReportPolicy(every_seconds=100)
+    assert pol.should_render(("cv_len",), now=0)
+    pol.mark(("cv_len",), now=0)
+    assert not pol.should_render(("cv_len",), now=50)
+    assert pol.should_render((), now=50)              # status mudou
+    assert pol.should_render(("cv_len",), now=101)    # cadência venceu
+    pol0 = ReportPolicy(every_seconds=0)
+    pol0.mark((), now=0)
+    assert not pol0.should_render((), now=10**9)      # 0 = só em mudança
+
+
+def test_worker_submit_never_blocks_and_stops(tmp_path):
+    w = ReportWorker(tmp_path, keep=2, max_bytes=0)
+    w.start()
+    try:
+        t0 = time.perf_counter()
+        results = [w.submit(None, None, ts=i) for i in range(5)]
+        assert time.perf_counter() - t0 < 0.5
+        assert results[0] is True
+    finally:
+        w.stop()
+    assert not w.alive()
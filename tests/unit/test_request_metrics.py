@@ -0,0 +1,42 @@
+# tests/unit/test_request_metrics.py
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from src.api.main import app
+
+client = TestClient(app)
+
+
+def _value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_unknown_paths_share_one_label():
+    before = _value("dm_api_requests_total", endpoint="unmatched", method="GET", status="404")
+    client.get("/nao-existe/123")
+    client.get("/outra/rota")
+    after = _value("dm_api_requests_total", endpoint="unmatched", method="GET", status="404")
+    assert after == before + 2
+    assert _value("dm_api_requests_total", endpoint="/nao-existe/123", method="GET", status="404") == 0
+
+
+def test_payload_size_histograms():
+    payload = {
+        "titulo_vaga": "Backend",
+        "candidates": [{"id": str(i), "cv_pt": "python sql"} for i in range(7)],
+    }
+    n = _value("dm_api_candidates_per_request_count", endpoint="/rank-candidates")
+    rows = _value("dm_api_candidates_per_request_sum", endpoint="/rank-candidates")
+    chars = _value("dm_api_text_chars_sum", endpoint="/rank-candidates")
+    body = _value("dm_api_request_body_bytes_count", endpoint="/rank-candidates")
+
+    assert client.post("/rank-candidates", json=payload).status_code == 200
+    assert _value("dm_api_candidates_per_request_count", endpoint="/rank-candidates") == n + 1
+    assert _value("dm_api_candidates_per_request_sum", endpoint="/rank-candidates") == rows + 7
+    # "python sql" + "Backend" por candidato
+    assert _value("dm_api_text_chars_sum", endpoint="/rank-candidates") == chars + 7 * (10 + 7)
+    assert _value("dm_api_request_body_bytes_count", endpoint="/rank-candidates") == body + 1
+    # bucket fino na faixa de 1–50 ms
+    assert REGISTRY.get_sample_value(
+        "dm_api_latency_seconds_bucket", {"endpoint": "/rank-candidates", "le": "0.0075"}
+    ) is not None
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import src.api.main as m
+from src.api.cache import ResultCache, result_key
+
+
+def test_cache_ttl_and_memory_bound():
+    now = [0.0]
+    cache = ResultCache(max_bytes=3000, ttl_seconds=10, clock=lambda: now[0])
+
+    cache.put("a", np.zeros(100))  # ~1.1 KB cada
+    cache.put("b", np.zeros(100))
+    assert cache.get("a") is not None  # "a" vira o mais recente
+    cache.put("c", np.zeros(100))      # estoura o limite -> sai "b" (LRU)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.nbytes <= 3000
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_result_key_depends_on_texts_and_version():
+    df = pd.DataFrame({"cv_pt": ["python"], "titulo_vaga": ["backend"]})
+    k1 = result_key("/rank-candidates", "v1", df)
+    assert k1 == result_key("/rank-candidates", "v1", df.copy())
+    assert k1 != result_key("/rank-candidates", "v2", df)
+    assert k1 != result_key("/rank-candidates", "v1", df.assign(cv_pt=["java"]))
+
+
+def test_rank_reuses_scores_when_only_k_changes(monkeypatch):
+    calls = []
+
+    def fake_score(df, model=None):
+        calls.append(len(df))
+        return np.linspace(0.9, 0.1, len(df))
+
+    monkeypatch.setattr(m, "_score_df", fake_score)
+    monkeypatch.setattr(m, "_result_cache", ResultCache(1 << 20, 60))
+    client = TestClient(m.app)
+
+    payload = {
+        "titulo_vaga": "Backend Python",
+        "candidates": [{"id": str(i), "cv_pt": f"cv {i}"} for i in range(4)],
+        "k": 1,
+        "use_threshold": True,
+    }
+    r1 = client.post("/rank-candidates", json=payload)
+    r2 = client.post("/rank-candidates", json={**payload, "k": 3, "use_threshold": False})
+    assert r1.status_code == r2.status_code == 200
+    assert calls == [4]
+    assert [it["id"] for it in r2.json()["items"]] == ["0", "1", "2"]
+
+    text = client.get("/metrics").text
+    assert 'dm_api_result_cache_hits_total{endpoint="/rank-candidates"}' in text
@@ -0,0 +1,166 @@
+# tests/unit/test_ringlog.py
+import csv
+from importlib import reload
+
+import numpy as np
+import pytest
+
+from src.monitoring.ringlog import RingReader, RingWriter, export_csv, make_records, version_digest
+
+
+def _rows(start, n, endpoint="/score"):
+    return [[1.7e9 + i, endpoint, 100 + i, 200 + i, (i % 10) / 10] for i in range(start, start + n)]
+
+
+def test_write_read_and_wraparound(tmp_path):
+    path = tmp_path / "requests.ring"
+    w = RingWriter(path, capacity=8)
+    r = RingReader(path)
+    w.append(make_records(_rows(0, 5), "v1"))
+    recs, head = r.read(0)
+    assert head == 5 and list(recs["cv_len"]) == [100, 101, 102, 103, 104]
+    assert recs["model_version"][0] == version_digest("v1") and recs["endpoint"][0] == 1
+
+    # passa da capacidade: só os 8 mais recentes continuam disponíveis
+    w.append(make_records(_rows(5, 6, "/rank-candidates"), "v2"))
+    recs, head = r.read(0)
+    assert head == 11 and list(recs["cv_len"]) == list(range(103, 111))
+    new, head2 = r.read(head)
+    assert len(new) == 0 and head2 == 11
+    assert list(r.latest(3)["job_len"]) == [208, 209, 210]
+    w.close()
+    r.close()
+
+
+def test_read_returns_copy_and_drops_overwritten(tmp_path, monkeypatch):
+    path = tmp_path / "requests.ring"
+    w = RingWriter(path, capacity=8)
+    r = RingReader(path)
+    w.append(make_records(_rows(0, 4)))
+    recs, _ = r.read(0)
+    # o escritor dá a volta depois da leitura: o resultado não muda
+    w.append(make_records(_rows(4, 8)))
+    assert list(recs["cv_len"]) == [100, 101, 102, 103]
+
+    # volta no anel durante a cópia: os dois registros sobrescritos são descartados
+    slice_ = r._slice
+
+    def slice_then_write(lo, hi):
+        out = slice_(lo, hi)
+        w.append(make_records(_rows(12, 2)))
+        return out
+
+    monkeypatch.setattr(r, "_slice", slice_then_write)
+    recs, head = r.read(0)
+    assert head == 12 and list(recs["cv_len"]) == list(range(106, 112))
+    w.close()
+    r.close()
+
+
+def test_second_writer_reuses_existing_capacity(tmp_path):
+    path = tmp_path / "requests.ring"
+    RingWriter(path, capacity=4).append(make_records(_rows(0, 3)))
+    w2 = RingWriter(path, capacity=1000)
+    assert w2.capacity == 4
+    assert w2.append(make_records(_rows(3, 1))) == 4
+
+
+def test_incompatible_file_is_rejected(tmp_path):
+    path = tmp_path / "requests.ring"
+    path.write_bytes(b"\0" * 256)
+    with pytest.raises(ValueError):
+        RingReader(path)
+    # o escritor guarda o arquivo antigo e recomeça
+    RingWriter(path, capacity=4).append(make_records(_rows(0, 1)))
+    assert (tmp_path / "requests.ring.old").exists()
+    assert len(RingReader(path).latest(4)) == 1
+
+
+def test_export_csv(tmp_path):
+    path = tmp_path / "requests.ring"
+    RingWriter(path, capacity=16).append(make_records(_rows(0, 4, "/score-batch"), "20250101T000000Z"))
+    out = tmp_path / "out.csv"
+    assert export_csv(path, out, last=2) == 2
+    rows = list(csv.reader(out.open(encoding="utf-8")))
+    assert rows[0] == [
+        "ts", "endpoint", "cv_len", "job_len", "score", "model_version_digest",
+        "word_nnz", "char_nnz", "oov_rate",
+    ]
+    assert rows[1][1:4] == ["/score-batch", "102", "202"]
+    assert rows[2][5] == version_digest("20250101T000000Z").decode()
+    assert rows[2][6:] == ["", "", ""]  # sem estatísticas de texto
+
+
+def test_long_versions_do_not_collide():
+    a, b = "20250101T000000Z-abc123", "20250101T000000Z-def456"
+    ra, rb = make_records(_rows(0, 1), a), make_records(_rows(0, 1), b)
+    assert len(version_digest(a)) == 16
+    assert ra["model_version"][0] == version_digest(a) != rb["model_version"][0]
+
+
+def test_drift_service_reads_ring_window(tmp_path, monkeypatch):
+    monkeypatch.setenv("MONITORING_DIR", str(tmp_path))
+    import src.monitoring.drift_service as drift_service
+    reload(drift_service)
+    assert drift_service._load_current_window() is None
+
+    w = RingWriter(drift_service.RING_FILE, capacity=1000)
+    w.append(make_records(_rows(0, 250)))
+    assert drift_service._probe_new_rows() == 250
+    assert drift_service._probe_new_rows() == 0
+    cur = drift_service._load_current_window()
+    assert len(cur) == 250 and cur["cv_len"].iloc[-1] == 349
+
+
+def test_drift_service_ignores_stale_ring(tmp_path, monkeypatch):
+    import os
+
+    import src.monitoring.drift_service as drift_service
+    monkeypatch.setenv("MONITORING_DIR", str(tmp_path))
+    monkeypatch.delenv("MONITOR_SINK", raising=False)
+    reload(drift_service)
+    RingWriter(drift_service.RING_FILE, capacity=100).append(make_records(_rows(0, 3)))
+    os.utime(drift_service.RING_FILE, (1e9, 1e9))
+    with open(drift_service.LOG_FILE, "w", encoding="utf-8") as f:
+        f.write("ts,endpoint,cv_len,job_len,score\n")
+        f.writelines(f"{1.7e9 + i},/score,{500 + i},600,0.5\n" for i in range(5))
+    # sem MONITOR_SINK vale o mais recente: o CSV, já que o ring parou
+    assert list(drift_service._recent_frame(10)["cv_len"]) == [500, 501, 502, 503, 504]
+
+    monkeypatch.setenv("MONITOR_SINK", "ring")
+    reload(drift_service)
+    assert list(drift_service._recent_frame(10)["cv_len"]) == [100, 101, 102]
+
+
+def test_api_ring_sink(tmp_path, monkeypatch):
+    import src.api.main as m
+    monkeypatch.setattr(m, "RING_FILE", str(tmp_path / "requests.ring"))
+    monkeypatch.setattr(m, "LOG_FILE", str(tmp_path / "requests_log.csv"))
+    monkeypatch.setattr(m, "_ring", None)
+    monkeypatch.setattr(m, "_ring_failed", False)
+    monkeypatch.setenv("MONITOR_SINK", "ring")
+    m._append_monitor_rows(_rows(0, 3))
+    recs = RingReader(tmp_path / "requests.ring").latest(10)
+    assert len(recs) == 3 and np.allclose(recs["score"], [0.0, 0.1, 0.2])
+    assert not (tmp_path / "requests_log.csv").exists()
+    m._ring.close()
+
+
+def test_api_ring_open_failure_is_counted(tmp_path, monkeypatch, caplog):
+    import src.api.main as m
+    from prometheus_client import REGISTRY
+    labels = {"sink": "ring", "stage": "open"}
+    before = REGISTRY.get_sample_value("dm_api_monitor_sink_errors_total", labels) or 0
+
+    def broken(*args, **kwargs):
+        raise PermissionError("sem permissão")
+
+    monkeypatch.setattr(m, "RingWriter", broken)
+    monkeypatch.setattr(m, "_ring", None)
+    monkeypatch.setattr(m, "_ring_failed", False)
+    monkeypatch.setenv("MONITOR_SINK", "ring")
+    m._append_monitor_rows(_rows(0, 2))
+    m._append_monitor_rows(_rows(2, 2))
+    # conta e avisa uma vez; depois o sink fica desligado neste worker
+    assert REGISTRY.get_sample_value("dm_api_monitor_sink_errors_total", labels) == before + 1
+    assert "sink ring desativado" in caplog.text
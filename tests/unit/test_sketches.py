@@ -0,0 +1,157 @@
+# tests/unit/test_sketches.py
+import os
+import time
+from importlib import reload
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.monitoring.sketches import (
+    FeatureSketch, KLLSketch, SketchRecorder, SketchStore, parse_window,
+)
+
+
+def _rank_error(sk: KLLSketch, x: np.ndarray) -> float:
+    xs = np.sort(x)
+    qs = np.array([0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99])
+    ranks = np.searchsorted(xs, sk.quantiles(qs)) / len(xs)
+    return float(np.max(np.abs(ranks - qs)))
+
+
+def test_kll_quantiles_and_merge_are_accurate():
+    rng = np.random.default_rng(0)
+    x = rng.lognormal(6, 1, 50_000)
+    whole = KLLSketch(k=200, seed=1)
+    whole.update_many(x.tolist())
+    merged = KLLSketch(k=200, seed=2)
+    for part in np.array_split(x, 50):
+        s = KLLSketch(k=200, seed=3)
+        s.update_many(part.tolist())
+        merged.merge(s)
+    assert whole.n == merged.n == len(x)
+    assert _rank_error(whole, x) < 0.02
+    assert _rank_error(merged, x) < 0.02
+    # memória sublinear
+    assert sum(len(lv) for lv in merged.levels) < 1500
+
+
+def test_kll_small_batches_stay_bounded():
+    # lotes pequenos, como uma requisição por vez
+    rng = np.random.default_rng(5)
+    x = rng.random(20_000)
+    sk = KLLSketch(k=200, seed=1)
+    for part in np.array_split(x, 4000):
+        sk.update_many(part)
+    assert sk.n == len(x)
+    assert _rank_error(sk, x) < 0.02
+    assert sum(len(lv) for lv in sk.levels) < 1500
+
+
+def test_recorder_background_flush(tmp_path):
+    rec = SketchRecorder(tmp_path, flush_seconds=0.05)
+    rec.start()
+    try:
+        rec.update({"score": [0.5] * 10})
+        for _ in range(100):
+            if list(tmp_path.glob("*.json")):
+                break
+            time.sleep(0.02)
+        assert list(tmp_path.glob("*.json"))
+    finally:
+        rec.stop()
+    assert not rec._thread.is_alive()
+
+
+def test_feature_sketch_roundtrip_and_histogram():
+    fs = FeatureSketch("score")
+    fs.update_many([0.0, 0.5, 0.99, np.nan, 2.0])
+    back = FeatureSketch.from_dict("score", fs.to_dict())
+    assert back.n == 4 and back.hist.sum() == 4
+    assert back.hist[-1] == 1  # 2.0 cai no transbordo superior
+
+
+def test_recorder_flush_and_store_windows(tmp_path):
+    now = [60 * 1000 + 5.0]
+    rec = SketchRecorder(tmp_path, flush_seconds=10, clock=lambda: now[0])
+    rec.update({"cv_len": [100] * 50, "job_len": [200] * 50, "score": [0.5] * 50}, ts=now[0] - 3600)
+    rec.update({"cv_len": [300] * 10, "job_len": [200] * 10, "score": [0.1] * 10})
+    assert not list(tmp_path.glob("*.json"))  # ainda dentro do intervalo de flush
+    now[0] += 11
+    rec.update({"cv_len": [300] * 10, "job_len": [200] * 10, "score": [0.1] * 10})
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+    store = SketchStore(tmp_path)
+    assert store.window(parse_window("5m"), now=now[0])["cv_len"].n == 20
+    assert store.window(parse_window("1d"), now=now[0])["cv_len"].n == 70
+    assert store.prune(parse_window("30m"), now=now[0]) == 1
+    assert store.window(parse_window("1d"), now=now[0])["cv_len"].n == 20
+
+
+def test_store_reuses_hourly_rollups(tmp_path):
+    hour = 3600 * 1000
+    for minute in range(0, 3 * 3600, 60):
+        for pid in (1, 2):
+            rec = SketchRecorder(tmp_path, clock=lambda: hour + minute + 1.0)
+            rec.update({"cv_len": [minute + pid], "score": [0.5]})
+            rec.flush()
+            # pid no nome do arquivo: um por "worker"
+            (tmp_path / f"{hour + minute}-{os.getpid()}.json").rename(
+                tmp_path / f"{hour + minute}-{pid}.json"
+            )
+    now = hour + 3 * 3600 - 1.0
+    store = SketchStore(tmp_path)
+    reads = []
+    read = store._read
+    store._read = lambda path: reads.append(path.name) or read(path)
+
+    assert store.window(parse_window("1d"), now=now)["cv_len"].n == 3 * 60 * 2
+    assert len(reads) == 3 * 60 * 2
+    # 2º ciclo: as duas horas fechadas vêm do roll-up; só a hora corrente é relida
+    reads.clear()
+    assert store.window(parse_window("1d"), now=now)["cv_len"].n == 3 * 60 * 2
+    assert len(reads) == 60 * 2
+    # arquivo novo numa hora fechada (worker atrasado) refaz só aquele roll-up
+    (tmp_path / f"{hour}-3.json").write_text((tmp_path / f"{hour}-1.json").read_text())
+    reads.clear()
+    assert store.window(parse_window("1d"), now=now)["cv_len"].n == 3 * 60 * 2 + 1
+    assert len(reads) == 60 * 2 + (60 * 2 + 1)
+    # janela que começa no meio de uma hora não usa o roll-up dela
+    assert store.window(parse_window("90m"), now=now)["cv_len"].n == 91 * 2
+
+
+def test_parse_window_rejects_garbage():
+    assert parse_window("1h") == 3600
+    with pytest.raises(ValueError):
+        parse_window("uma hora")
+
+
+def test_drift_service_exports_sketch_gauges(tmp_path, monkeypatch):
+    monkeypatch.setenv("MONITORING_DIR", str(tmp_path / "monitoring"))
+    import src.monitoring.drift_service as drift_service
+    reload(drift_service)
+
+    baseline = tmp_path / "baseline_features.csv"
+    rng = np.random.default_rng(4)
+    pd.DataFrame({
+        "cv_len": rng.integers(100, 200, 2000),
+        "job_len": rng.integers(100, 200, 2000),
+        "score": rng.random(2000),
+    }).to_csv(baseline, index=False)
+    drift_service.BASELINE = baseline
+    drift_service.SKETCH_DIR = tmp_path / "sketches"
+
+    now = 60 * 5000.0
+    rec = SketchRecorder(drift_service.SKETCH_DIR, flush_seconds=0, clock=lambda: now)
+    rec.update({
+        "cv_len": rng.integers(100, 200, 500),   # mesma distribuição
+        "job_len": rng.integers(900, 1000, 500),  # deslocada
+        "score": rng.random(500),
+    })
+    drift_service.compute_sketch_drift(now=now)
+
+    text = TestClient(drift_service.app).get("/metrics").text
+    assert 'dm_sketch_drift_detected{feature="job_len",window="5m"} 1.0' in text
+    assert 'dm_sketch_drift_detected{feature="cv_len",window="1h"} 0.0' in text
+    assert 'dm_sketch_rows{window="1d"} 500.0' in text
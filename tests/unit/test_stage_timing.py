@@ -0,0 +1,48 @@
+# tests/unit/test_stage_timing.py
+import numpy as np
+import scipy.sparse as sp
+from prometheus_client import REGISTRY
+
+import src.api.main as m
+from src.api.stages import StageTimer, rows_label, start_timer, timed_column_transform
+from src.monitoring.text_stats import staged_parts
+
+
+def _count(stage, rows):
+    v = REGISTRY.get_sample_value("dm_api_stage_seconds_count", {"stage": stage, "rows": rows})
+    return v or 0.0
+
+
+def test_timed_transform_matches_column_transformer(fit_pipeline):
+    # vocabulário pequeno -> saída densa; grande -> esparsa
+    for vocab in (10, 3000):
+        pipe, df = fit_pipeline(vocab=vocab)
+        concat, ct, _ = staged_parts(pipe)
+        text = concat.transform(df.head(20))
+        timer = StageTimer(20)
+        got = timed_column_transform(ct, text, timer)
+        ref = ct.transform(text)
+        assert sp.issparse(got) == sp.issparse(ref)
+        diff = (sp.csr_matrix(got) - sp.csr_matrix(ref))
+        assert abs(diff).max() < 1e-12
+        assert [s for s, _ in timer.stages] == ["tfidf_word", "tfidf_char"]
+
+
+def test_score_df_records_stage_histograms(monkeypatch, fit_pipeline):
+    pipe, df = fit_pipeline()
+    monkeypatch.setattr(m, "_stage_sample", 1.0)
+    before = {s: _count(s, "11-50") for s in ("concat", "tfidf_word", "tfidf_char", "predict")}
+    expected = pipe.predict_proba(df.head(30))[:, 1]
+    assert np.allclose(m._score_df(df.head(30), pipe), expected)
+    for s, n in before.items():
+        assert _count(s, "11-50") == n + 1
+
+    monkeypatch.setattr(m, "_stage_sample", 0.0)
+    m._score_df(df.head(30), pipe)
+    assert _count("concat", "11-50") == before["concat"] + 1
+
+
+def test_sampling_and_row_labels():
+    assert start_timer(5, 0.0) is None
+    assert start_timer(5, 1.0).rows == "2-10"
+    assert [rows_label(n) for n in (1, 50, 51, 5000)] == ["1", "11-50", "51-200", ">1000"]
@@ -0,0 +1,109 @@
+# tests/unit/test_text_stats.py
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+import src.api.main as m
+from src.modeling.pipeline import TEXT_COLS, build_pipeline
+from src.monitoring.text_stats import (
+    OOVTracker, merge_oov_files, nnz_by_vectorizer, staged_parts, text_stats,
+)
+
+
+def _fitted(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    words = "python java sql docker fastapi spring react aws dados etl".split()
+    df = pd.DataFrame({c: [" ".join(rng.choice(words, 6)) for _ in range(n)] for c in TEXT_COLS})
+    y = df["cv_pt"].str.contains("python").astype(int).to_numpy()
+    return build_pipeline().fit(df, y), df
+
+
+def test_nnz_matches_column_slices_and_oov_rate():
+    pipe, df = _fitted()
+    concat, ct, _ = staged_parts(pipe)
+    sample = df.head(3).copy()
+    sample.loc[sample.index[0], "cv_pt"] = "kubernetes terraform golang"
+    text = concat.transform(sample)
+    X = ct.transform(text)
+
+    nnz = nnz_by_vectorizer(X, ct)
+    Xc = sp.csr_matrix(X)  # com vocabulário pequeno o ColumnTransformer devolve denso
+    for name in ("tfidf_word", "tfidf_char"):
+        sl = ct.output_indices_[name]
+        assert list(nnz[name]) == list(np.diff(Xc[:, sl].indptr))
+
+    stats, unseen = text_stats(ct, X, text["text_concat"], index=sample.index)
+    assert stats.loc[sample.index[0], "oov_rate"] > 0
+    assert stats.loc[sample.index[1], "oov_rate"] == 0
+    assert {"kubernetes", "terraform", "golang"} <= unseen[0]
+    # sem textos: OOV não amostrado
+    assert text_stats(ct, X)[0]["oov_rate"].isna().all()
+
+
+def test_staged_parts_rejects_other_models():
+    from sklearn.dummy import DummyClassifier
+    from sklearn.pipeline import Pipeline
+    assert staged_parts(Pipeline([("clf", DummyClassifier())])) is None
+    assert staged_parts(object()) is None
+
+
+def test_oov_tracker_publishes_only_frequent_tokens(tmp_path):
+    tr = OOVTracker(tmp_path, flush_seconds=3600)
+    tr.update([{"kubernetes", "joao"}] + [{"kubernetes"}] * 5)
+    tr.flush()
+    out = merge_oov_files(tmp_path, min_docs=5)
+    assert out["sampled_docs"] == 6
+    assert [t["token"] for t in out["tokens"]] == ["kubernetes"]
+
+
+def test_score_df_records_stats_in_request_context():
+    pipe, df = _fitted()
+    ctx = {"oov_sampled": True}
+    token = m._request_ctx.set(ctx)
+    try:
+        scores = m._score_df(df.head(4), pipe)
+        rows = m._text_stats_rows(df.head(4).index)
+    finally:
+        m._request_ctx.reset(token)
+    assert np.allclose(scores, pipe.predict_proba(df.head(4))[:, 1])
+    assert len(rows) == 4 and all(r[0] > 0 and r[1] > 0 and r[2] == 0 for r in rows)
+
+
+def test_stage1_scoring_skips_oov(monkeypatch):
+    pipe, df = _fitted()
+    calls = []
+    monkeypatch.setattr(m, "_oov_tracker", lambda: calls.append(1))
+    monkeypatch.setattr(m, "_oov_sample", 1.0)
+    ctx = {}
+    token = m._request_ctx.set(ctx)
+    try:
+        m._score_df(df.head(4), pipe, oov=False)
+        assert "oov_sampled" not in ctx
+        assert ctx["text_stats"]["oov_rate"].isna().all()
+        assert (ctx["text_stats"]["word_nnz"] > 0).all()
+        m._score_df(df.head(4), pipe)
+    finally:
+        m._request_ctx.reset(token)
+    assert ctx["oov_sampled"] and ctx["text_stats"]["oov_rate"].notna().all()
+
+
+def test_oov_limited_to_row_subsample():
+    pipe, df = _fitted()
+    concat, ct, _ = staged_parts(pipe)
+    text = concat.transform(df.head(10))
+    stats, unseen = text_stats(ct, ct.transform(text), text["text_concat"], max_rows=3)
+    # primeira, do meio e última linha; as demais ficam sem OOV
+    assert list(np.flatnonzero(stats["oov_rate"].notna())) == [0, 4, 9]
+    assert len(unseen) == 3 and stats["word_nnz"].notna().all()
+
+
+def test_warmup_scoring_records_no_stats(monkeypatch):
+    pipe, _ = _fitted()
+    monkeypatch.setattr(m, "_oov_sample", 1.0)
+    ctx = {}
+    token = m._request_ctx.set(ctx)
+    try:
+        m._score_df(m._WARMUP_DF, pipe, stats=False)
+    finally:
+        m._request_ctx.reset(token)
+    assert "text_stats" not in ctx and "oov_sampled" not in ctx
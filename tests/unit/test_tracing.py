@@ -0,0 +1,62 @@
+# tests/unit/test_tracing.py
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+pytest.importorskip("opentelemetry.sdk")
+
+import src.api.main as m
+from src.api import tracing
+
+
+@pytest.fixture
+def memory_tracing(monkeypatch, fit_pipeline):
+    pipe, _ = fit_pipeline()
+    monkeypatch.setattr(m, "_model", pipe)
+    monkeypatch.setattr(m, "_stage1_model", None)
+    # versão própria: o cache de resultados não devolve scores de outro teste
+    monkeypatch.setattr(m, "_model_version", "tracing-test")
+    monkeypatch.setattr(m, "_stage_sample", 0.0)
+    assert tracing.setup("memory") == "memory"
+    yield
+    tracing.setup("off")
+
+
+def test_rank_request_produces_stage_spans(memory_tracing):
+    payload = {
+        "titulo_vaga": "backend",
+        "candidates": [{"id": str(i), "cv_pt": "w1 w2 w3"} for i in range(4)],
+    }
+    r = TestClient(m.app).post("/rank-candidates", json=payload)
+    assert r.status_code == 200
+    spans = {s["name"]: s for s in tracing.finished_spans()}
+
+    root = spans["POST /rank-candidates"]
+    assert root["attributes"]["http.status_code"] == 200
+    for name in ("request.parse", "features.build", "model.concat", "model.tfidf_word",
+                 "model.tfidf_char", "model.predict", "rank.topk"):
+        assert spans[name]["trace_id"] == root["trace_id"], name
+    assert spans["features.build"]["attributes"]["rows"] == 4
+    assert spans["features.build"]["attributes"]["text_chars"] > 0
+    assert spans["model.tfidf_char"]["attributes"]["rows"] == 4
+    assert spans["rank.topk"]["attributes"]["candidates"] == 4
+    assert spans["features.build"]["parent_id"] == root["span_id"]
+
+
+def test_jsonl_exporter_and_off_mode(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    assert tracing.setup("jsonl", path=path) == "jsonl"
+    with tracing.span("outer", rows=3):
+        with tracing.span("inner"):
+            pass
+    tracing.flush()
+    lines = [json.loads(x) for x in path.read_text(encoding="utf-8").splitlines()]
+    by_name = {d["name"]: d for d in lines}
+    assert by_name["inner"]["parent_id"] == by_name["outer"]["span_id"]
+    assert by_name["outer"]["attributes"] == {"rows": 3}
+
+    assert tracing.setup("off") == "off"
+    with tracing.span("ignored") as s:
+        assert s is None
+    assert not tracing.enabled()
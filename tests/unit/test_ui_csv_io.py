@@ -0,0 +1,34 @@
+# tests/unit/test_ui_csv_io.py
+from pathlib import Path
+
+from ui.csv_io import build_candidates, read_candidates, read_robust, sniff_delimiter
+
+SAMPLE = Path(__file__).resolve().parents[2] / "ui" / "candidates_sample.csv"
+
+
+def test_fast_path_matches_robust_reader_on_clean_csv():
+    raw = SAMPLE.read_bytes()
+    fast, engine = read_candidates(raw)
+    assert engine in ("pyarrow", "pandas")
+    text = raw.decode("utf-8-sig")
+    robust = read_robust(text, sniff_delimiter(text[:20000]))
+    assert fast.equals(robust.astype(str))
+
+
+def test_irregular_rows_fall_back_to_robust_reader():
+    raw = b"codigo;nome;cv\n007;Ana;python sql\n8;Bia;java;campo extra\n"
+    df, engine = read_candidates(raw)
+    assert engine == "robust"
+    assert df["id"].tolist() == ["007", "8"]
+    assert df.loc[1, "cv_pt"] == "java campo extra"
+
+
+def test_cp1252_quoted_newlines_and_generated_ids():
+    raw = 'nome,currículo\nJosé,"linha1\nlinha2"\n'.encode("cp1252")
+    df, engine = read_candidates(raw)
+    assert engine == "pandas"
+    assert df.loc[0, "name"] == "José" and df.loc[0, "cv_pt"] == "linha1\nlinha2"
+    assert df["id"].tolist() == ["0"]
+    assert build_candidates(df) == [
+        {"id": "0", "name": "José", "cv_pt": "linha1\nlinha2", "competencias": "", "observacoes": ""}
+    ]
@@ -0,0 +1,59 @@
+# tests/unit/test_ui_ranking_client.py
+import threading
+
+import pytest
+
+from ui.ranking_client import RankingError, chunks, rank_chunked
+
+
+class _Resp:
+    def __init__(self, status, body):
+        self.status_code = status
+        self.ok = status < 400
+        self._body = body
+        self.text = str(body)
+
+    def json(self):
+        return self._body
+
+
+class _FakeSession:
+    """Imita o /rank-candidates: score = int(id) / 1000, top-k por lote."""
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+        self._lock = threading.Lock()
+
+    def post(self, url, json, timeout):
+        with self._lock:
+            self.calls.append(len(json["candidates"]))
+        ids = [c["id"] for c in json["candidates"]]
+        if self.fail_on in ids:
+            return _Resp(500, {"detail": "boom"})
+        items = sorted(
+            ({"id": i, "name": None, "score": int(i) / 1000, "pass_by_threshold": True} for i in ids),
+            key=lambda it: -it["score"],
+        )[: json["k"]]
+        return _Resp(200, {"items": items, "used_k": len(items), "threshold_used": 0.5})
+
+
+def test_chunked_ranking_matches_global_topk():
+    cands = [{"id": str(i), "cv_pt": "x"} for i in range(0, 1000, 7)]
+    sess = _FakeSession()
+    progress = []
+    out = rank_chunked(
+        "http://api/rank-candidates", {"titulo_vaga": "t"}, cands, k=5,
+        chunk_size=30, max_workers=3, session=sess, on_progress=lambda d, t: progress.append((d, t)),
+    )
+    assert [it["id"] for it in out["items"]] == ["994", "987", "980", "973", "966"]
+    assert out["used_k"] == 5 and out["threshold_used"] == 0.5
+    assert sorted(sess.calls) == sorted(len(c) for c in chunks(cands, 30))
+    assert progress[-1] == (5, 5)
+
+
+def test_chunk_failure_raises():
+    cands = [{"id": str(i)} for i in range(100)]
+    with pytest.raises(RankingError, match="500"):
+        rank_chunked("u", {}, cands, k=3, chunk_size=10, session=_FakeSession(fail_on="42"))
+    assert rank_chunked("u", {}, [], k=3, session=_FakeSession())["items"] == []
@@ -0,0 +1,93 @@
+# tests/unit/test_window_drift.py
+from importlib import reload
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from src.monitoring.ringlog import RingWriter, make_records
+
+
+def _service(tmp_path, monkeypatch):
+    monkeypatch.setenv("MONITORING_DIR", str(tmp_path / "monitoring"))
+    monkeypatch.setenv("DRIFT_WINDOWS", "5m,1h")
+    monkeypatch.setenv("DRIFT_WINDOW_MIN_ROWS", "100")
+    import src.monitoring.drift_service as drift_service
+    reload(drift_service)
+    rng = np.random.default_rng(7)
+    baseline = tmp_path / "baseline_features.csv"
+    pd.DataFrame({
+        "cv_len": rng.integers(100, 200, 2000),
+        "job_len": rng.integers(100, 200, 2000),
+        "score": rng.random(2000),
+    }).to_csv(baseline, index=False)
+    drift_service.BASELINE = baseline
+    drift_service.BASELINE_PROFILE = tmp_path / "missing.json"
+    drift_service.RING_FILE = tmp_path / "requests.ring"
+    return drift_service, rng
+
+
+def test_window_drift_per_endpoint_from_ring(tmp_path, monkeypatch):
+    drift_service, rng = _service(tmp_path, monkeypatch)
+    now = 1.7e9
+    w = RingWriter(drift_service.RING_FILE, capacity=10_000)
+    # há 30 min: /score normal; últimos 2 min: /rank-candidates com job_len deslocado
+    old = [[now - 1800 + i * 0.1, "/score", int(rng.integers(100, 200)), int(rng.integers(100, 200)),
+            float(rng.random())] for i in range(400)]
+    new = [[now - 120 + i * 0.1, "/rank-candidates", int(rng.integers(100, 200)),
+            int(rng.integers(900, 1000)), float(rng.random())] for i in range(300)]
+    w.append(make_records(old + new))
+
+    res = drift_service.compute_window_drift(now=now)
+    assert res[("job_len", "5m", "/rank-candidates")]["drift_detected"]
+    assert not res[("job_len", "1h", "/score")]["drift_detected"]
+    # /score não tem linhas na janela de 5m
+    assert ("job_len", "5m", "/score") not in res
+
+    text = TestClient(drift_service.app).get("/metrics").text
+    assert 'dm_drift_window_rows{endpoint="all",window="1h"} 700.0' in text
+    assert 'dm_drift_window_rows{endpoint="/score",window="5m"} 0.0' in text
+    assert 'dm_drift_window_detected{endpoint="/rank-candidates",feature="job_len",window="5m"} 1.0' in text
+
+    # janelas que deixam de ter dados têm as séries removidas
+    res = drift_service.compute_window_drift(now=now + 3 * 86400)
+    assert res == {}
+    text = TestClient(drift_service.app).get("/metrics").text
+    assert "dm_drift_window_detected{" not in text
+    w.close()
+
+
+def test_window_drift_from_csv_log(tmp_path, monkeypatch):
+    drift_service, rng = _service(tmp_path, monkeypatch)
+    now = 1.7e9
+    log = tmp_path / "requests_log.csv"
+    pd.DataFrame({
+        "ts": now - 60 + np.arange(300) * 0.1,
+        "endpoint": "/score",
+        "cv_len": rng.integers(100, 200, 300),
+        "job_len": rng.integers(100, 200, 300),
+        "score": rng.random(300),
+    }).to_csv(log, index=False)
+    drift_service.LOG_FILE = log
+
+    res = drift_service.compute_window_drift(now=now)
+    assert not res[("cv_len", "5m", "all")]["drift_detected"]
+    assert ("cv_len", "5m", "/score") in res
+
+
+def test_window_coverage_when_buffer_truncates(tmp_path, monkeypatch):
+    drift_service, rng = _service(tmp_path, monkeypatch)
+    monkeypatch.setattr(drift_service, "WINDOW_ROWS", 100)
+    monkeypatch.setattr(drift_service, "DRIFT_BUFFER_ROWS", 500)
+    now = 1.7e9
+    w = RingWriter(drift_service.RING_FILE, capacity=10_000)
+    # 1000 linhas ao longo de 40 min: o buffer de 500 só cobre os últimos 20
+    rows = [[now - 2400 + i * 2.4, "/score", int(rng.integers(100, 200)), int(rng.integers(100, 200)),
+             float(rng.random())] for i in range(1000)]
+    w.append(make_records(rows))
+    drift_service.compute_window_drift(now=now)
+
+    text = TestClient(drift_service.app).get("/metrics").text
+    assert 'dm_drift_window_coverage_seconds{window="5m"} 300.0' in text
+    assert 'dm_drift_window_coverage_seconds{window="1h"} 1200.0' in text
+    w.close()
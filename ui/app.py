@@ -3,11 +3,19 @@
 import os
 import streamlit as st
 import pandas as pd
-import requests, json, csv, io
+import io
+
+from csv_io import COLUMNS, build_candidates, file_digest, read_candidates
+from ranking_client import RankingError, make_session, rank_chunked
 
 API_ROOT = os.getenv("API_URL", "http://127.0.0.1:8000")
 API = f"{API_ROOT.rstrip('/')}/rank-candidates"
 
+# Envio em lotes paralelos (CSV grande não vira uma única requisição gigante)
+CHUNK_SIZE = int(os.getenv("UI_CHUNK_SIZE", "500"))
+MAX_PARALLEL = int(os.getenv("UI_MAX_PARALLEL", "4"))
+TIMEOUT_SECONDS = float(os.getenv("UI_TIMEOUT_SECONDS", "120"))
+
 st.set_page_config(page_title="Decision Match — Ranking", layout="wide")
 st.title("Decision Match — Ranking de Candidatos por Vaga")
 
@@ -20,127 +28,62 @@ with st.sidebar:
     obs_job = st.text_input("Observações", "Postgres desejável")
     k = st.number_input("Top-K", min_value=1, max_value=50, value=5, step=1)
     use_threshold = st.checkbox("Aplicar threshold calibrado (metadata.json)", value=True)
+    with st.expander("Envio (avançado)"):
+        chunk_size = st.number_input("Candidatos por requisição", min_value=10, max_value=5000, value=CHUNK_SIZE, step=50)
+        max_parallel = st.number_input("Requisições simultâneas", min_value=1, max_value=16, value=MAX_PARALLEL, step=1)
 
 # ---------------- Helpers ----------------
+@st.cache_resource
+def _session(pool_size: int):
+    # uma Session (pool de conexões) por tamanho de paralelismo, reaproveitada entre reruns
+    return make_session(pool_size)
+
 def _s(v):
     import math
     if v is None: return ""
     if isinstance(v, float) and math.isnan(v): return ""
     return str(v)
 
-def _read_csv_robust(uploaded_file) -> pd.DataFrame:
-    """Lê CSVs 'bagunçados': detecta encoding/delimitador, trata campos extras, normaliza cabeçalhos e devolve colunas padrão."""
-    # 1) bytes -> texto (tentando encodings comuns)
-    raw = uploaded_file.getvalue()
-    text = None
-    for enc in ("utf-8-sig","utf-8","cp1252","latin-1"):
-        try:
-            text = raw.decode(enc)
-            break
-        except Exception:
-            continue
-    if text is None:
-        text = raw.decode("utf-8", errors="ignore")
-
-    # 2) detecta delimitador
-    sample = text[:20000]
-    try:
-        dialect = csv.Sniffer().sniff(sample, delimiters=[",",";","\t","|"])
-        delimiter = dialect.delimiter
-    except Exception:
-        counts = {d: sample.count(d) for d in [",",";","\t","|"]}
-        delimiter = max(counts, key=counts.get)
-
-    # 3) DictReader com captura de colunas excedentes na linha
-    buf = io.StringIO(text)
-    reader = csv.DictReader(buf, delimiter=delimiter, quotechar='"', escapechar="\\", restkey="_extra", restval="")
-
-    # 4) normaliza cabeçalhos e mapeia sinônimos
-    def norm(s):
-        return s.strip().lower().replace(" ", "_") if isinstance(s, str) else s
-
-    mapping = {}
-    if reader.fieldnames:
-        for h in reader.fieldnames:
-            n = norm(h)
-            if n in ("id","codigo_profissional","codigo","id_candidato"):
-                mapping[h] = "id"
-            elif n in ("name","nome","nome_completo","full_name"):
-                mapping[h] = "name"
-            elif n in ("cv_pt","cv","curriculo","currículo"):
-                mapping[h] = "cv_pt"
-            elif n in ("competencias","competências","skills"):
-                mapping[h] = "competencias"
-            elif n in ("observacoes","observações","obs"):
-                mapping[h] = "observacoes"
-            else:
-                mapping[h] = n
-
-    rows = []
-    for row in reader:
-        d = {mapping.get(k, norm(k)): v for k, v in row.items()}
-
-        idv = d.get("id") or ""
-        namev = d.get("name") or d.get("nome") or ""
-        cvv = d.get("cv_pt") or ""
-        compv = d.get("competencias") or ""
-        obsv = d.get("observacoes") or ""
-
-        # junta colunas excedentes ao CV (se houver)
-        extra = row.get("_extra", [])
-        if isinstance(extra, list) and extra:
-            cvv = " ".join([cvv] + [str(x) for x in extra if x is not None]).strip()
-
-        rows.append({
-            "id": _s(idv),
-            "name": _s(namev),
-            "cv_pt": _s(cvv),
-            "competencias": _s(compv),
-            "observacoes": _s(obsv),
-        })
-
-    df = pd.DataFrame(rows, columns=["id","name","cv_pt","competencias","observacoes"]).fillna("")
-    # se não tiver id, cria um
-    if df["id"].eq("").all():
-        df["id"] = df.index.astype(str)
-    return df
+# memoizados pelo hash do conteúdo: reruns não re-leem o arquivo nem remontam o payload.
+# cache_resource devolve o mesmo objeto (cache_data copiaria 100k dicts a cada rerun).
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _parse_csv(digest: str, _raw: bytes):
+    return read_candidates(_raw)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _candidates(digest: str, _df: pd.DataFrame) -> list:
+    return build_candidates(_df)
 
 def _prepare_df(uploaded_csv) -> pd.DataFrame:
-    # primeiro tenta o leitor robusto; se falhar totalmente, cai para pandas.read_csv padrão
+    # caminho rápido (pyarrow/pandas C); arquivos irregulares caem no leitor robusto
+    raw = uploaded_csv.getvalue()
+    digest = file_digest(raw)
     try:
-        df = _read_csv_robust(uploaded_csv)
-        # limpeza final e tipos
-        for c in ["id","name","cv_pt","competencias","observacoes"]:
-            if c not in df.columns: df[c] = ""
-        df[["id","name","cv_pt","competencias","observacoes"]] = df[["id","name","cv_pt","competencias","observacoes"]].fillna("").astype(str)
-        return df
+        df, _engine = _parse_csv(digest, raw)
     except Exception as e:
-        st.warning(f"Leitura robusta falhou ({e}). Tentando leitura padrão...")
-        df = pd.read_csv(uploaded_csv).fillna("")
-        # normaliza mínimos
-        need = ["id","name","cv_pt","competencias","observacoes"]
-        for c in need:
+        st.warning(f"Leitura do CSV falhou ({e}). Tentando leitura padrão...")
+        df = pd.read_csv(io.BytesIO(raw)).fillna("")
+        for c in COLUMNS:
             if c not in df.columns: df[c] = ""
-        return df[need].astype(str)
+        df = df[COLUMNS].astype(str)
+    st.session_state["cand_digest"] = digest
+    return df
 
-def _build_payload(df: pd.DataFrame) -> dict:
+def _job_context() -> dict:
     return {
         "titulo_vaga": _s(titulo),
         "principais_atividades": _s(atividades),
         "competencias": _s(comp_job),
         "observacoes": _s(obs_job),
+    }
+
+def _build_payload(df: pd.DataFrame) -> dict:
+    digest = st.session_state.get("cand_digest")
+    return {
+        **_job_context(),
         "k": int(k),
         "use_threshold": bool(use_threshold),
-        "candidates": [
-            {
-                "id": _s(r["id"]),
-                "name": _s(r["name"]),
-                "cv_pt": _s(r["cv_pt"]),
-                "competencias": _s(r["competencias"]),
-                "observacoes": _s(r["observacoes"]),
-            }
-            for _, r in df.iterrows()
-        ],
+        "candidates": _candidates(digest, df) if digest else build_candidates(df),
     }
 
 # ---------------- Main: File upload + Run button ----------------
@@ -148,7 +91,7 @@ st.subheader("Candidatos (CSV com colunas: id, name, cv_pt, competencias, observ
 up = st.file_uploader("Carregue um CSV", type=["csv"], key="file_uploader")
 
 # Persistência na sessão
-for key, default in [("cand_df", None), ("result_df", None), ("last_threshold", None), ("last_used_k", None)]:
+for key, default in [("cand_df", None), ("cand_digest", None), ("result_df", None), ("last_threshold", None), ("last_used_k", None)]:
     if key not in st.session_state: st.session_state[key] = default
 
 # Atualiza DataFrame da sessão ao subir novo arquivo
@@ -178,34 +121,46 @@ if clear_clicked:
 
 if run_clicked and st.session_state["cand_df"] is not None:
     payload = _build_payload(st.session_state["cand_df"])
+    progress = st.progress(0.0, text="Enviando candidatos...")
     try:
-        r = requests.post(API, headers={"Content-Type":"application/json; charset=utf-8"}, data=json.dumps(payload))
-        if r.ok:
-            out = r.json()
-            items = pd.DataFrame(out.get("items", []))
-            st.session_state["last_threshold"] = out.get("threshold_used", None)
-            st.session_state["last_used_k"] = out.get("used_k", None)
-
-            if items.empty:
-                st.session_state["result_df"] = None
-                st.warning("Nenhum candidato retornado. Tente desmarcar 'Aplicar threshold' ou ajuste o contexto da vaga.")
-            else:
-                base = st.session_state["cand_df"][["id","name"]].drop_duplicates("id")
-                if "name" not in items.columns:
-                    items["name"] = ""
-                items = items.merge(base, how="left", on="id", suffixes=("_api", ""))
-                if "name_api" in items.columns:
-                    items["name"] = items.apply(lambda r: r["name_api"] if r.get("name_api") not in [None, "", "nan"] else r["name"], axis=1)
-                    items = items.drop(columns=["name_api"])
-                show = items[["name","id","score","pass_by_threshold"]].sort_values("score", ascending=False)
-                show["score"] = show["score"].map(lambda x: round(float(x), 4))
-                st.session_state["result_df"] = show
-        else:
+        out = rank_chunked(
+            API,
+            _job_context(),
+            payload["candidates"],
+            k=int(k),
+            use_threshold=bool(use_threshold),
+            chunk_size=int(chunk_size),
+            max_workers=int(max_parallel),
+            timeout=TIMEOUT_SECONDS,
+            session=_session(int(max_parallel)),
+            on_progress=lambda done, total: progress.progress(done / total, text=f"Lotes processados: {done}/{total}"),
+        )
+        items = pd.DataFrame(out.get("items", []))
+        st.session_state["last_threshold"] = out.get("threshold_used", None)
+        st.session_state["last_used_k"] = out.get("used_k", None)
+
+        if items.empty:
             st.session_state["result_df"] = None
-            st.error(f"Erro {r.status_code}: {r.text}")
+            st.warning("Nenhum candidato retornado. Tente desmarcar 'Aplicar threshold' ou ajuste o contexto da vaga.")
+        else:
+            base = st.session_state["cand_df"][["id","name"]].drop_duplicates("id")
+            if "name" not in items.columns:
+                items["name"] = ""
+            items = items.merge(base, how="left", on="id", suffixes=("_api", ""))
+            if "name_api" in items.columns:
+                items["name"] = items.apply(lambda r: r["name_api"] if r.get("name_api") not in [None, "", "nan"] else r["name"], axis=1)
+                items = items.drop(columns=["name_api"])
+            show = items[["name","id","score","pass_by_threshold"]].sort_values("score", ascending=False)
+            show["score"] = show["score"].map(lambda x: round(float(x), 4))
+            st.session_state["result_df"] = show
+    except RankingError as e:
+        st.session_state["result_df"] = None
+        st.error(str(e))
     except Exception as e:
         st.session_state["result_df"] = None
         st.error(f"Falha ao chamar API: {e}")
+    finally:
+        progress.empty()
 
 # Render do resultado
 if st.session_state["result_df"] is not None:
@@ -0,0 +1,161 @@
+# ui/csv_io.py
+"""Leitura do CSV de candidatos e montagem do payload, sem depender do Streamlit.
+
+Caminho rápido: detecta encoding/delimitador e lê com pyarrow (ou o engine C
+do pandas), tudo como texto. Se o arquivo for "bagunçado" (linhas com campos
+a mais, aspas quebradas), cai no leitor robusto (csv.DictReader), que junta
+colunas excedentes ao CV. A UI memoiza o resultado pelo hash do conteúdo.
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import math
+from typing import List, Tuple
+
+import pandas as pd
+
+try:  # opcional: leitor CSV multithread
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover
+    pa = None
+
+COLUMNS = ["id", "name", "cv_pt", "competencias", "observacoes"]
+DELIMITERS = [",", ";", "\t", "|"]
+ENCODINGS = ("utf-8-sig", "utf-8", "cp1252", "latin-1")
+
+_SYNONYMS = {
+    "id": ("id", "codigo_profissional", "codigo", "id_candidato"),
+    "name": ("name", "nome", "nome_completo", "full_name"),
+    "cv_pt": ("cv_pt", "cv", "curriculo", "currículo"),
+    "competencias": ("competencias", "competências", "skills"),
+    "observacoes": ("observacoes", "observações", "obs"),
+}
+_CANONICAL = {alias: col for col, aliases in _SYNONYMS.items() for alias in aliases}
+
+
+def _s(v):
+    if v is None: return ""
+    if isinstance(v, float) and math.isnan(v): return ""
+    return str(v)
+
+
+def norm_header(h):
+    return h.strip().lower().replace(" ", "_") if isinstance(h, str) else h
+
+
+def canonical_column(h):
+    n = norm_header(h)
+    return _CANONICAL.get(n, n)
+
+
+def file_digest(raw: bytes) -> str:
+    return hashlib.sha1(raw).hexdigest()
+
+
+def detect_encoding(raw: bytes) -> Tuple[str, str]:
+    """(encoding, texto) tentando os encodings comuns em ordem."""
+    for enc in ENCODINGS:
+        try:
+            return enc, raw.decode(enc)
+        except Exception:
+            continue
+    return "utf-8", raw.decode("utf-8", errors="ignore")
+
+
+def sniff_delimiter(sample: str) -> str:
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=DELIMITERS).delimiter
+    except Exception:
+        counts = {d: sample.count(d) for d in DELIMITERS}
+        return max(counts, key=counts.get)
+
+
+def _finish(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas padrão, tudo str, id gerado se ausente."""
+    df = df.rename(columns={c: canonical_column(c) for c in df.columns})
+    df = df.loc[:, ~df.columns.duplicated()]
+    for c in COLUMNS:
+        if c not in df.columns:
+            df[c] = ""
+    df = df[COLUMNS].fillna("").astype(str).reset_index(drop=True)
+    if df["id"].eq("").all():
+        df["id"] = df.index.astype(str)
+    return df
+
+
+# =========================
+# Leitores
+# =========================
+def read_fast(raw: bytes, encoding: str, delimiter: str) -> pd.DataFrame:
+    """pyarrow (se disponível) ou engine C do pandas; erro em linhas irregulares."""
+    if pa is not None and encoding in ("utf-8", "utf-8-sig"):
+        table = pa_csv.read_csv(
+            io.BytesIO(raw),
+            read_options=pa_csv.ReadOptions(encoding="utf8"),
+            parse_options=pa_csv.ParseOptions(
+                delimiter=delimiter, quote_char='"', escape_char="\\", newlines_in_values=True
+            ),
+            # sem inferência de tipo: ids com zeros à esquerda continuam texto
+            convert_options=_all_strings(raw, encoding, delimiter),
+        )
+        return table.to_pandas()
+    return pd.read_csv(
+        io.BytesIO(raw), sep=delimiter, encoding=encoding, engine="c", dtype=str,
+        keep_default_na=False, quotechar='"', escapechar="\\",
+    )
+
+
+def _all_strings(raw: bytes, encoding: str, delimiter: str):
+    """ConvertOptions com todas as colunas do cabeçalho como string."""
+    text = raw[:65536].decode(encoding, errors="ignore")
+    header = next(csv.reader(io.StringIO(text), delimiter=delimiter), [])
+    return pa_csv.ConvertOptions(
+        column_types={h: pa.string() for h in header}, strings_can_be_null=False
+    )
+
+
+def read_robust(text: str, delimiter: str) -> pd.DataFrame:
+    """DictReader linha a linha; campos excedentes vão para o CV."""
+    reader = csv.DictReader(
+        io.StringIO(text), delimiter=delimiter, quotechar='"', escapechar="\\", restkey="_extra", restval=""
+    )
+    mapping = {h: canonical_column(h) for h in (reader.fieldnames or [])}
+    rows = []
+    for row in reader:
+        d = {mapping.get(k, norm_header(k)): v for k, v in row.items()}
+        cvv = d.get("cv_pt") or ""
+        extra = row.get("_extra", [])
+        if isinstance(extra, list) and extra:
+            cvv = " ".join([cvv] + [str(x) for x in extra if x is not None]).strip()
+        rows.append({
+            "id": _s(d.get("id") or ""),
+            "name": _s(d.get("name") or d.get("nome") or ""),
+            "cv_pt": _s(cvv),
+            "competencias": _s(d.get("competencias") or ""),
+            "observacoes": _s(d.get("observacoes") or ""),
+        })
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def read_candidates(raw: bytes) -> Tuple[pd.DataFrame, str]:
+    """DataFrame padrão (COLUMNS) e o leitor usado: "pyarrow", "pandas" ou "robust"."""
+    encoding, text = detect_encoding(raw)
+    delimiter = sniff_delimiter(text[:20000])
+    try:
+        df = read_fast(raw, encoding, delimiter)
+        engine = "pyarrow" if pa is not None and encoding in ("utf-8", "utf-8-sig") else "pandas"
+    except Exception:
+        df, engine = read_robust(text, delimiter), "robust"
+    return _finish(df), engine
+
+
+# =========================
+# Payload
+# =========================
+def build_candidates(df: pd.DataFrame) -> List[dict]:
+    """Lista de candidatos a partir das colunas (sem iterrows)."""
+    cols = [df[c].fillna("").astype(str).tolist() if c in df else [""] * len(df) for c in COLUMNS]
+    return [dict(zip(COLUMNS, vals)) for vals in zip(*cols)]
@@ -0,0 +1,90 @@
+# ui/ranking_client.py
+"""Cliente do /rank-candidates para CSVs grandes: lotes em paralelo + top-K no cliente.
+
+Os candidatos são divididos em lotes de `chunk_size`, enviados por uma
+`requests.Session` (conexões reaproveitadas) com no máximo `max_workers`
+requisições simultâneas. Cada lote pede o próprio top-K; como o top-K global
+está contido na união dos top-K de cada lote, basta juntar e cortar de novo.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class RankingError(RuntimeError):
+    """Falha em algum lote (status HTTP ou rede)."""
+
+
+def make_session(max_workers: int = 4) -> requests.Session:
+    """Session com pool do tamanho do paralelismo (sem conexões descartadas)."""
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, int(max_workers)))
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers.update({"Content-Type": "application/json; charset=utf-8"})
+    return s
+
+
+def chunks(items: List[dict], size: int) -> List[List[dict]]:
+    size = max(1, int(size))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def merge_topk(results: List[dict], k: int) -> List[dict]:
+    """Junta os itens dos lotes e devolve os K maiores scores (empate: ordem de chegada no CSV)."""
+    items = [it for r in results for it in r.get("items", [])]
+    items.sort(key=lambda it: -float(it.get("score", 0.0)))
+    return items[:k]
+
+
+def rank_chunked(
+    url: str,
+    job: Dict[str, str],
+    candidates: List[dict],
+    k: int,
+    use_threshold: bool = True,
+    chunk_size: int = 500,
+    max_workers: int = 4,
+    timeout: float = 120.0,
+    session: Optional[requests.Session] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """Ranqueia em lotes paralelos; devolve {"items", "used_k", "threshold_used"}."""
+    parts = chunks(candidates, chunk_size)
+    if not parts:
+        return {"items": [], "used_k": 0, "threshold_used": None}
+    session = session or make_session(max_workers)
+    results: List[Optional[dict]] = [None] * len(parts)
+
+    def _post(part: List[dict]) -> dict:
+        payload = {**job, "k": int(k), "use_threshold": bool(use_threshold), "candidates": part}
+        try:
+            r = session.post(url, json=payload, timeout=timeout)
+        except requests.RequestException as e:
+            raise RankingError(f"falha ao chamar a API: {e}") from e
+        if not r.ok:
+            raise RankingError(f"Erro {r.status_code}: {r.text}")
+        return r.json()
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as pool:
+        futures = {pool.submit(_post, part): i for i, part in enumerate(parts)}
+        try:
+            for fut in as_completed(futures):
+                results[futures[fut]] = fut.result()
+                done += 1
+                if on_progress is not None:
+                    on_progress(done, len(parts))
+        except Exception:
+            # não espera os lotes restantes que ainda não começaram
+            for f in futures:
+                f.cancel()
+            raise
+
+    items = merge_topk([r for r in results if r], int(k))
+    thr = next((r.get("threshold_used") for r in results if r and r.get("threshold_used") is not None), None)
+    return {"items": items, "used_k": len(items), "threshold_used": thr}